@@ -0,0 +1,97 @@
+# Copyright 2019 The Simons Foundation, Inc. - All Rights Reserved.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares two result files of the benchmark suite (`suite.py`).
+
+The median times of the benchmarks run in both files with the same parameters
+are compared. The exit status is 1 if any benchmark is slower than the baseline
+by more than the threshold.
+
+Usage:
+    python compare.py baseline.json results.json --threshold 1.1
+"""
+
+import argparse
+import json
+import sys
+
+
+def _key(result):
+    return (result["benchmark"], tuple(sorted(result["params"].items())))
+
+
+def compare(baseline, results, threshold):
+    """
+    Returns a list of (benchmark, params, baseline median, median, ratio,
+    regressed) tuples, for the benchmarks present in both results.
+    """
+    baseline_medians = {_key(r): r["median"] for r in baseline["results"]}
+    rows = []
+    for result in results["results"]:
+        key = _key(result)
+        if key not in baseline_medians:
+            continue
+        old = baseline_medians[key]
+        ratio = result["median"] / old
+        rows.append(
+            (
+                result["benchmark"],
+                result["params"],
+                old,
+                result["median"],
+                ratio,
+                ratio > threshold,
+            )
+        )
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("baseline", help="the JSON results of the reference run")
+    parser.add_argument("results", help="the JSON results to compare")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.1,
+        help="the ratio of the median times above which a benchmark has regressed",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as infile:
+        baseline = json.load(infile)
+    with open(args.results) as infile:
+        results = json.load(infile)
+
+    rows = compare(baseline, results, args.threshold)
+    for name, params, old, new, ratio, regressed in rows:
+        print(
+            "{:<14} {:<50} {:>11.3e} s {:>11.3e} s {:>7.2f}x{}".format(
+                name,
+                json.dumps(params),
+                old,
+                new,
+                ratio,
+                "  REGRESSION" if regressed else "",
+            )
+        )
+
+    n_regressed = sum(row[-1] for row in rows)
+    print("{} benchmarks compared, {} regressions".format(len(rows), n_regressed))
+    return 1 if n_regressed > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,465 @@
+# Copyright 2019 The Simons Foundation, Inc. - All Rights Reserved.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parametrized benchmark suite of NetKet.
+
+Every benchmark is run on the transverse-field Ising chain, for all the
+combinations of the parameters it depends on among:
+- `size`: the number of spins of the chain;
+- `alpha`: the density of hidden units of the RBM-like machine;
+- `n_chains`: the number of Markov chains of the sampler;
+- `backend`: the implementation of the machine, `cxx` (RbmSpin), `pyrbm`
+  (PyRbm), `jax` or `torch`. The backends which cannot be imported are skipped.
+
+Each benchmark is timed as timeit does: the number of calls is chosen so that
+one measurement lasts at least `--min-time` seconds, and the measurement is
+repeated `--repeat` times. All the random numbers are seeded, and the results
+are written as JSON together with the versions of the software and the hardware,
+so that runs of different releases can be compared with `compare.py`.
+
+Usage:
+    python suite.py --output results.json
+    python suite.py --benchmarks sampling local_values --backends cxx pyrbm
+    python suite.py --sizes 10 20 40 --alphas 1 2 --n-chains 16 64
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import netket as nk
+
+SEED = 1234
+
+# Sizes of the default run, and largest size for which to_sparse is benchmarked
+DEFAULT_SIZES = (10, 20, 40)
+DEFAULT_ALPHAS = (1, 2)
+DEFAULT_N_CHAINS = (16, 64)
+MAX_SPARSE_SIZE = 16
+
+BACKENDS = {}
+BENCHMARKS = {}
+
+
+def backend(name):
+    """Registers a function constructing a machine from a Hilbert space and alpha."""
+
+    def register(build):
+        BACKENDS[name] = build
+        return build
+
+    return register
+
+
+def benchmark(name, params, unit):
+    """
+    Registers a benchmark, which depends on the given parameters and processes
+    `unit`s (e.g. samples) at every call.
+
+    The benchmark is a function taking a `System` and returning the function to
+    time and the number of units it processes.
+    """
+
+    def register(setup):
+        BENCHMARKS[name] = (setup, params, unit)
+        return setup
+
+    return register
+
+
+def _random_parameters(machine, sigma=0.01, real=False):
+    rng = np.random.RandomState(SEED)
+    parameters = sigma * rng.randn(machine.n_par)
+    if not real:
+        parameters = parameters + 1j * sigma * rng.randn(machine.n_par)
+    machine.parameters = parameters
+
+
+@backend("cxx")
+def _cxx_machine(hilbert, alpha):
+    machine = nk.machine.RbmSpin(hilbert=hilbert, alpha=alpha)
+    machine.init_random_parameters(seed=SEED, sigma=0.01)
+    return machine
+
+
+@backend("pyrbm")
+def _pyrbm_machine(hilbert, alpha):
+    machine = nk.machine.PyRbm(hilbert=hilbert, alpha=alpha)
+    _random_parameters(machine)
+    return machine
+
+
+@backend("jax")
+def _jax_machine(hilbert, alpha):
+    import jax
+    from jax.experimental import stax
+
+    # An RBM-like network, with the real and imaginary part of log(psi) as outputs
+    module = stax.serial(
+        stax.Dense(alpha * hilbert.size),
+        stax.elementwise(lambda x: jax.numpy.log(jax.numpy.cosh(x))),
+        stax.Dense(2),
+    )
+    machine = nk.machine.Jax(hilbert, module, seed=SEED)
+    _random_parameters(machine, real=True)
+    return machine
+
+
+@backend("torch")
+def _torch_machine(hilbert, alpha):
+    import torch
+
+    torch.manual_seed(SEED)
+    module = torch.nn.Sequential(
+        torch.nn.Linear(hilbert.size, alpha * hilbert.size),
+        nk.machine.TorchLogCosh(),
+        torch.nn.Linear(alpha * hilbert.size, 2),
+    )
+    machine = nk.machine.Torch(module, hilbert=hilbert)
+    _random_parameters(machine, real=True)
+    return machine
+
+
+class System:
+    """
+    The Ising chain, machine, sampler and samples of one combination of the
+    parameters. They are constructed lazily, and with fixed seeds.
+    """
+
+    def __init__(self, size, alpha=1, n_chains=16, backend="cxx", n_samples=100):
+        self.params = {
+            "size": size,
+            "alpha": alpha,
+            "n_chains": n_chains,
+            "backend": backend,
+        }
+        self.n_samples = n_samples
+
+        _seed()
+        graph = nk.graph.Hypercube(length=size, n_dim=1, pbc=True)
+        self.hilbert = nk.hilbert.Spin(s=0.5, graph=graph)
+        self.hamiltonian = nk.operator.Ising(h=1.0, hilbert=self.hilbert)
+
+        self._machine = None
+        self._samples = None
+
+    @property
+    def machine(self):
+        if self._machine is None:
+            build = BACKENDS[self.params["backend"]]
+            self._machine = build(self.hilbert, self.params["alpha"])
+        return self._machine
+
+    def sampler(self):
+        """Returns a new sampler of the machine."""
+        _seed()
+        return nk.sampler.MetropolisLocal(
+            machine=self.machine, n_chains=self.params["n_chains"]
+        )
+
+    @property
+    def samples(self):
+        """`n_samples` sweeps of all the chains, as a `(n, size)` matrix."""
+        if self._samples is None:
+            sampler = self.sampler()
+            for _ in sampler.samples(self.n_samples):
+                pass
+            samples = sampler.generate_samples(self.n_samples)
+            self._samples = np.ascontiguousarray(samples.reshape(-1, self.hilbert.size))
+        return self._samples
+
+
+def _seed():
+    nk.utils.seed(SEED)
+    nk.random.seed(SEED)
+    np.random.seed(SEED)
+
+
+@benchmark("sampling", ("size", "alpha", "n_chains", "backend"), "samples")
+def _sampling(system):
+    sampler = system.sampler()
+    n_sweeps = system.n_samples
+
+    def run():
+        for _ in sampler.samples(n_sweeps):
+            pass
+
+    return run, n_sweeps * system.params["n_chains"]
+
+
+@benchmark("local_values", ("size", "alpha", "n_chains", "backend"), "samples")
+def _local_values(system):
+    samples = system.samples
+    machine = system.machine
+    log_vals = machine.log_val(samples)
+    out = np.empty(samples.shape[0], dtype=np.complex128)
+
+    def run():
+        nk.operator.local_values(
+            system.hamiltonian, machine, samples, log_vals=log_vals, out=out
+        )
+
+    return run, samples.shape[0]
+
+
+@benchmark("der_log", ("size", "alpha", "n_chains", "backend"), "samples")
+def _der_log(system):
+    samples = system.samples
+    machine = system.machine
+
+    def run():
+        machine.der_log(samples)
+
+    return run, samples.shape[0]
+
+
+@benchmark("sr_solve", ("size", "alpha", "n_chains", "backend"), "solves")
+def _sr_solve(system):
+    machine = system.machine
+    oks = np.ascontiguousarray(machine.der_log(system.samples), dtype=np.complex128)
+    oks -= oks.mean(axis=0)
+    grad = oks.conj().T.dot(np.ones(oks.shape[0])) / oks.shape[0]
+    out = np.empty(machine.n_par, dtype=np.complex128)
+
+    sr = nk.optimizer.SR(diag_shift=0.01)
+    sr.is_holomorphic = machine.is_holomorphic
+
+    def run():
+        sr.compute_update(oks, grad, out)
+
+    return run, 1
+
+
+@benchmark("to_sparse", ("size",), "operators")
+def _to_sparse(system):
+    if system.params["size"] > MAX_SPARSE_SIZE:
+        return None
+
+    def run():
+        system.hamiltonian.to_sparse()
+
+    return run, 1
+
+
+@benchmark("vmc_step", ("size", "alpha", "n_chains", "backend"), "steps")
+def _vmc_step(system):
+    vmc = nk.Vmc(
+        hamiltonian=system.hamiltonian,
+        sampler=system.sampler(),
+        optimizer=nk.optimizer.Sgd(learning_rate=0.01),
+        n_samples=system.n_samples * system.params["n_chains"],
+        sr=nk.optimizer.SR(diag_shift=0.01),
+    )
+
+    def run():
+        vmc.advance(1)
+
+    return run, 1
+
+
+def measure(run, repeat, min_time):
+    """
+    Times `run` after one call to warm it up (e.g. to compile the jitted code).
+    Returns the number of calls of each measurement and the time per call of
+    each of the `repeat` measurements.
+    """
+    run()
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        times.append((time.perf_counter() - start) / number)
+    return number, times
+
+
+def _git_revision():
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _version(module_name):
+    try:
+        import pkg_resources
+
+        return pkg_resources.get_distribution(module_name).version
+    except Exception:
+        return None
+
+
+def metadata(args):
+    return {
+        "date": datetime.datetime.utcnow().isoformat() + "Z",
+        "netket": _version("netket"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "mpi_size": nk.MPI.size(),
+        "seed": SEED,
+        "arguments": vars(args),
+    }
+
+
+def combinations(args, params):
+    """All the combinations of the values of `params` given on the command line."""
+    values = {
+        "size": args.sizes,
+        "alpha": args.alphas,
+        "n_chains": args.n_chains,
+        "backend": args.backends,
+    }
+    for combination in itertools.product(*(values[p] for p in params)):
+        yield dict(zip(params, combination))
+
+
+def run_suite(args, log=print):
+    """
+    Runs the benchmarks selected by the command line arguments, and returns the
+    results as a dictionary which can be serialized to JSON.
+    """
+    results = []
+    skipped = []
+    unavailable = {}
+
+    for name in args.benchmarks:
+        setup, params, unit = BENCHMARKS[name]
+        for combination in combinations(args, params):
+            backend_name = combination.get("backend")
+            if backend_name in unavailable:
+                continue
+
+            system = System(n_samples=args.n_samples, **combination)
+            try:
+                case = setup(system)
+            except ImportError as error:
+                # The backend is not installed
+                unavailable[backend_name] = str(error)
+                skipped.append({"backend": backend_name, "reason": str(error)})
+                log("Skipping backend {}: {}".format(backend_name, error))
+                continue
+            if case is None:
+                continue
+            run, n_units = case
+
+            number, times = measure(run, args.repeat, args.min_time)
+            median = float(np.median(times))
+            results.append(
+                {
+                    "benchmark": name,
+                    "params": combination,
+                    "unit": unit,
+                    "units_per_call": n_units,
+                    "number": number,
+                    "times": times,
+                    "min": min(times),
+                    "median": median,
+                    "mean": float(np.mean(times)),
+                    "std": float(np.std(times)),
+                    "throughput": n_units / median,
+                }
+            )
+            log(
+                "{:<14} {:<50} {:>12.3e} s {:>12.1f} {}/s".format(
+                    name, json.dumps(combination), median, n_units / median, unit
+                )
+            )
+
+    return {"metadata": metadata(args), "results": results, "skipped": skipped}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="NetKet benchmark suite")
+    parser.add_argument(
+        "--output", "-o", default=None, help="the JSON file of the results"
+    )
+    parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        default=list(BENCHMARKS),
+        choices=list(BENCHMARKS),
+        help="the benchmarks to run (default: all)",
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--alphas", nargs="+", type=int, default=list(DEFAULT_ALPHAS))
+    parser.add_argument(
+        "--n-chains", nargs="+", type=int, default=list(DEFAULT_N_CHAINS)
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=list(BACKENDS),
+        choices=list(BACKENDS),
+        help="the backends of the machine (default: all the installed ones)",
+    )
+    parser.add_argument(
+        "--n-samples",
+        type=int,
+        default=100,
+        help="the number of sweeps of the chains used by each benchmark",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="the number of measurements"
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="the minimum duration in seconds of each measurement",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    suite = run_suite(args, log=print if nk.MPI.rank() == 0 else lambda *a: None)
+
+    if args.output is not None and nk.MPI.rank() == 0:
+        with open(args.output, "w") as outfile:
+            json.dump(suite, outfile, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
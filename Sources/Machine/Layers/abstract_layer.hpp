@@ -36,6 +36,7 @@ class AbstractLayer {
   using VectorRefType = AbstractMachine::VectorRefType;
   using VectorConstRefType = AbstractMachine::VectorConstRefType;
   using VisibleConstType = AbstractMachine::VisibleConstType;
+  using RowMatrixType = RowMatrix<Complex>;
 
   /**
   Member function returning the name of the layer.
@@ -108,6 +109,52 @@ class AbstractLayer {
                         const VectorType &dout, VectorType &din,
                         VectorRefType der) = 0;
 
+  /**
+  Member function to feedforward a batch of inputs through the layer.
+  The default implementation calls Forward on each row, layers should override
+  it with a batched implementation whenever possible.
+  @param input a constant reference to the inputs to the layer, one per row.
+  @param output reference to the outputs, it must already have the shape
+  (input.rows(), Noutput()).
+  */
+  virtual void ForwardBatch(const RowMatrixType &input,
+                            RowMatrixType &output) {
+    VectorType in(Ninput());
+    VectorType out(Noutput());
+    for (Index i = 0; i < input.rows(); ++i) {
+      in = input.row(i).transpose();
+      Forward(in, out);
+      output.row(i) = out.transpose();
+    }
+  }
+
+  /**
+  Member function to perform backpropagation on a batch of inputs.
+  The arguments are the same as in Backprop, with one sample per row.
+  The default implementation calls Backprop on each row.
+  @param der a reference to the block of the Jacobian (one row per sample)
+  corresponding to the parameters of the layer.
+  */
+  virtual void BackpropBatch(const RowMatrixType &prev_layer_output,
+                             const RowMatrixType &this_layer_output,
+                             const RowMatrixType &dout, RowMatrixType &din,
+                             Eigen::Ref<RowMatrixType> der) {
+    VectorType prev(Ninput());
+    VectorType curr(Noutput());
+    VectorType dout_i(Noutput());
+    VectorType din_i(Ninput());
+    VectorType der_i(Npar());
+    din.resize(dout.rows(), Ninput());
+    for (Index i = 0; i < dout.rows(); ++i) {
+      prev = prev_layer_output.row(i).transpose();
+      curr = this_layer_output.row(i).transpose();
+      dout_i = dout.row(i).transpose();
+      Backprop(prev, curr, dout_i, din_i, der_i);
+      din.row(i) = din_i.transpose();
+      der.row(i) = der_i.transpose();
+    }
+  }
+
   virtual void to_json(nlohmann::json &j) const = 0;
 
   virtual void from_json(const nlohmann::json &j) = 0;
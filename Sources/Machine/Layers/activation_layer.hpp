@@ -76,6 +76,29 @@ class Activation : public AbstractLayer {
     din.resize(size_);
     activation_.ApplyJacobian(prev_layer_output, this_layer_output, dout, din);
   }
+
+  // Activations act element-wise, hence the whole batch is processed as a
+  // single vector
+  void ForwardBatch(const RowMatrixType &input,
+                    RowMatrixType &output) override {
+    activation_.operator()(
+        Eigen::Map<const VectorType>(input.data(), input.size()),
+        Eigen::Map<VectorType>(output.data(), output.size()));
+  }
+
+  void BackpropBatch(const RowMatrixType &prev_layer_output,
+                     const RowMatrixType &this_layer_output,
+                     const RowMatrixType &dout, RowMatrixType &din,
+                     Eigen::Ref<RowMatrixType> /*der*/) override {
+    din.resize(dout.rows(), size_);
+    activation_.ApplyJacobian(
+        Eigen::Map<const VectorType>(prev_layer_output.data(),
+                                     prev_layer_output.size()),
+        Eigen::Map<const VectorType>(this_layer_output.data(),
+                                     this_layer_output.size()),
+        Eigen::Map<const VectorType>(dout.data(), dout.size()),
+        Eigen::Map<VectorType>(din.data(), din.size()));
+  }
 };
 }  // namespace netket
 
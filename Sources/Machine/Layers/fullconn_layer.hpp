@@ -160,6 +160,35 @@ class FullyConnected : public AbstractLayer {
     // Compute d(L) / d_in = W * [d(L) / d(z)]
     din.noalias() = weight_ * dout;
   }
+
+  void ForwardBatch(const RowMatrixType &input,
+                    RowMatrixType &output) override {
+    output.noalias() = input * weight_;
+    output.rowwise() += bias_.transpose();
+  }
+
+  void BackpropBatch(const RowMatrixType &prev_layer_output,
+                     const RowMatrixType & /*this_layer_output*/,
+                     const RowMatrixType &dout, RowMatrixType &din,
+                     Eigen::Ref<RowMatrixType> der) override {
+    int k = 0;
+
+    if (usebias_) {
+      der.leftCols(out_size_) = dout;
+      k += out_size_;
+    }
+
+    // The derivatives for the weights are stored column-major, hence the
+    // block of columns j of W holds in * [d(L) / d(z_j)] for each sample
+    for (int j = 0; j < out_size_; ++j) {
+      der.middleCols(k, in_size_).array() =
+          prev_layer_output.array().colwise() * dout.col(j).array();
+      k += in_size_;
+    }
+
+    din.resize(dout.rows(), in_size_);
+    din.noalias() = dout * weight_.transpose();
+  }
 };
 }  // namespace netket
 
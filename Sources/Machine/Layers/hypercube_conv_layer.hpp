@@ -66,6 +66,12 @@ class ConvolutionalHypercube : public AbstractLayer {
   MatrixType lowered_der_;
   MatrixType flipped_kernels_;
 
+  // Workspaces for the batched evaluation, resized only when the batch size
+  // changes
+  MatrixType lowered_batch_;
+  MatrixType lowered_der_batch_;
+  MatrixType result_batch_;
+
  public:
   /// Constructor
   ConvolutionalHypercube(const int length, const int dim,
@@ -314,6 +320,106 @@ class ConvolutionalHypercube : public AbstractLayer {
     der_in.noalias() = lowered_der_.transpose() * flipped_kernels_;
   }
 
+  void ForwardBatch(const RowMatrixType &input,
+                    RowMatrixType &output) override {
+    const Index batch_size = input.rows();
+    LowerBatch(input);
+
+    // A single GEMM for the whole batch, where the row b * nout_ + i of the
+    // result is the output at node i for the sample b
+    result_batch_.resize(batch_size * nout_, out_channels_);
+    result_batch_.noalias() = lowered_batch_ * kernels_;
+
+    for (Index b = 0; b < batch_size; ++b) {
+      for (int out = 0; out < out_channels_; ++out) {
+        output.row(b).segment(out * nout_, nout_) =
+            result_batch_.col(out).segment(b * nout_, nout_).transpose();
+        if (usebias_) {
+          output.row(b).segment(out * nout_, nout_).array() += bias_(out);
+        }
+      }
+    }
+  }
+
+  void BackpropBatch(const RowMatrixType &prev_layer_output,
+                     const RowMatrixType & /*this_layer_output*/,
+                     const RowMatrixType &dout, RowMatrixType &din,
+                     Eigen::Ref<RowMatrixType> der) override {
+    const Index batch_size = dout.rows();
+    int kd = 0;
+
+    // Derivative for bias, d(L) / d(b) = d(L) / d(z)
+    if (usebias_) {
+      for (int out = 0; out < out_channels_; ++out) {
+        der.col(kd) = dout.middleCols(out * nout_, nout_).rowwise().sum();
+        ++kd;
+      }
+    }
+
+    // Derivative for weights, d(L) / d(W) = [d(L) / d(z)] * in'
+    LowerBatch(prev_layer_output);
+    for (Index b = 0; b < batch_size; ++b) {
+      Eigen::Map<const MatrixType> dLz_reshaped(dout.row(b).data(), nout_,
+                                                out_channels_);
+      Eigen::Map<MatrixType> der_w(der.row(b).data() + kd,
+                                   in_channels_ * kernel_size_, out_channels_);
+      der_w.noalias() =
+          lowered_batch_.middleRows(b * nout_, nout_).transpose() *
+          dLz_reshaped;
+    }
+
+    // Compute d(L) / d_in = W * [d(L) / d(z)]
+    for (int out = 0; out < out_channels_; ++out) {
+      for (int in = 0; in < in_channels_; ++in) {
+        flipped_kernels_.block(out * kernel_size_, in, kernel_size_, 1) =
+            kernels_.block(in * kernel_size_, out, kernel_size_, 1);
+      }
+    }
+
+    lowered_der_batch_.resize(batch_size * nv_, kernel_size_ * out_channels_);
+    for (Index b = 0; b < batch_size; ++b) {
+      for (int i = 0; i < nv_; i++) {
+        int j = 0;
+        for (auto n : flipped_nodes_[i]) {
+          for (int out = 0; out < out_channels_; ++out) {
+            lowered_der_batch_(b * nv_ + i, out * kernel_size_ + j) =
+                n >= 0 ? dout(b, out * nout_ + n) : Complex(0.);
+          }
+          j++;
+        }
+      }
+    }
+    result_batch_.resize(batch_size * nv_, in_channels_);
+    result_batch_.noalias() = lowered_der_batch_ * flipped_kernels_;
+
+    din.resize(batch_size, in_size_);
+    for (Index b = 0; b < batch_size; ++b) {
+      for (int in = 0; in < in_channels_; ++in) {
+        din.row(b).segment(in * nv_, nv_) =
+            result_batch_.col(in).segment(b * nv_, nv_).transpose();
+      }
+    }
+  }
+
+  // im2col method on a batch of images: the row b * nout_ + i of
+  // lowered_batch_ holds the neighbourhood of node i in the image b
+  inline void LowerBatch(const RowMatrixType &images) {
+    const Index batch_size = images.rows();
+    lowered_batch_.resize(batch_size * nout_, in_channels_ * kernel_size_);
+    for (Index b = 0; b < batch_size; ++b) {
+      for (int i = 0; i < nout_; ++i) {
+        int j = 0;
+        for (auto n : neighbours_[i]) {
+          for (int in = 0; in < in_channels_; ++in) {
+            lowered_batch_(b * nout_ + i, in * kernel_size_ + j) =
+                images(b, in * nv_ + n);
+          }
+          j++;
+        }
+      }
+    }
+  }
+
   void to_json(json &pars) const override {
     json layerpar;
     layerpar["Name"] = "Convolutional";
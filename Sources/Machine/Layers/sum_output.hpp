@@ -85,6 +85,19 @@ class SumOutput : public AbstractLayer {
     din.setConstant(dout(0));
   }
 
+  void ForwardBatch(const RowMatrixType &input,
+                    RowMatrixType &output) override {
+    output.col(0) = input.rowwise().sum();
+  }
+
+  void BackpropBatch(const RowMatrixType & /*prev_layer_output*/,
+                     const RowMatrixType & /*this_layer_output*/,
+                     const RowMatrixType &dout, RowMatrixType &din,
+                     Eigen::Ref<RowMatrixType> /*der*/) override {
+    din.resize(dout.rows(), in_size_);
+    din = dout.col(0).replicate(1, in_size_);
+  }
+
   void to_json(json &pars) const override {
     json layerpar;
     layerpar["Name"] = "Sum";
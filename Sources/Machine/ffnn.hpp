@@ -46,6 +46,12 @@ class FFNN : public AbstractMachine {
 
   std::vector<VectorType> Vforward_;
 
+  // Per-layer workspaces for the batched evaluation, one sample per row.
+  // They are only reallocated when the batch size changes.
+  RowMatrix<Complex> input_batch_;
+  std::vector<RowMatrix<Complex>> forward_batch_;
+  std::vector<RowMatrix<Complex>> din_batch_;
+
  public:
   explicit FFNN(std::shared_ptr<const AbstractHilbert> hilbert,
                 std::vector<AbstractLayer *> layers)
@@ -92,6 +98,9 @@ class FFNN : public AbstractMachine {
       Vforward_.push_back(VectorXcd(layersizes_[i + 1]));
     }
 
+    forward_batch_.resize(nlayer_);
+    din_batch_.resize(depth_);
+
     changed_nodes_.resize(nlayer_);
     new_output_.resize(nlayer_);
 
@@ -182,6 +191,55 @@ class FFNN : public AbstractMachine {
     return der;
   }
 
+  /// Feedforward of a batch of visible configurations, the outputs of the
+  /// layer i are stored in forward_batch_[i].
+  void ForwardBatch(Eigen::Ref<const RowMatrix<double>> v) {
+    const Index batch_size = v.rows();
+    input_batch_ = v.cast<Complex>();
+    for (int i = 0; i < nlayer_; ++i) {
+      forward_batch_[i].resize(batch_size, layersizes_[i + 1]);
+    }
+
+    layers_[0]->ForwardBatch(input_batch_, forward_batch_[0]);
+    for (int i = 1; i < nlayer_; ++i) {
+      layers_[i]->ForwardBatch(forward_batch_[i - 1], forward_batch_[i]);
+    }
+  }
+
+  void LogVal(Eigen::Ref<const RowMatrix<double>> v, Eigen::Ref<VectorType> out,
+              const any & /*lookup*/ = any{}) override {
+    CheckShape(__FUNCTION__, "v", {v.rows(), v.cols()},
+               {std::ignore, Nvisible()});
+    CheckShape(__FUNCTION__, "out", out.size(), v.rows());
+    ForwardBatch(v);
+    out = forward_batch_[nlayer_ - 1].col(0);
+  }
+
+  /// Computes the full (batch, Npar()) Jacobian with a single batched
+  /// backward sweep through the layers.
+  void DerLog(Eigen::Ref<const RowMatrix<double>> v,
+              Eigen::Ref<RowMatrix<Complex>> out,
+              const any & /*lookup*/ = any{}) override {
+    CheckShape(__FUNCTION__, "v", {v.rows(), v.cols()},
+               {std::ignore, Nvisible()});
+    CheckShape(__FUNCTION__, "out", {out.rows(), out.cols()},
+               {v.rows(), npar_});
+    ForwardBatch(v);
+
+    din_batch_.back().resize(v.rows(), 1);
+    din_batch_.back().setOnes();
+
+    Index start_idx = npar_;
+    for (int i = nlayer_ - 1; i >= 0; --i) {
+      const Index num_of_pars = layers_[i]->Npar();
+      start_idx -= num_of_pars;
+      layers_[i]->BackpropBatch(
+          i > 0 ? forward_batch_[i - 1] : input_batch_, forward_batch_[i],
+          din_batch_[i + 1], din_batch_[i],
+          out.middleCols(start_idx, num_of_pars));
+    }
+  }
+
   void Save(std::string const &filename) const override {
     json state;
     state["Name"] = "FFNN";
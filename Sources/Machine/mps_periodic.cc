@@ -348,6 +348,102 @@ MPSPeriodic::MatrixType MPSPeriodic::mps_contraction(VisibleConstType v,
   return c;
 }
 
+RowMatrix<int> MPSPeriodic::local_indices(
+    Eigen::Ref<const RowMatrix<double>> v) {
+  RowMatrix<int> indices(v.rows(), N_);
+  for (Index b = 0; b < v.rows(); b++) {
+    for (int site = 0; site < N_; site++) {
+      indices(b, site) = confindex_[v(b, site)];
+    }
+  }
+  return indices;
+}
+
+void MPSPeriodic::batched_prod(const RowMatrix<int> &indices, int site,
+                               bool transposed, RowMatrix<Complex> &prods) {
+  const Index batch = indices.rows();
+  const auto &W = W_[site % symperiod_];
+
+  if (is_diag_) {
+    for (Index b = 0; b < batch; b++) {
+      prods.block(b * D_, 0, D_, 1).array() *= W[indices(b, site)].array();
+    }
+    return;
+  }
+
+  if (gather_.rows() < batch * D_) {
+    gather_.resize(batch * D_, D_);
+    gather_prod_.resize(batch * D_, D_);
+  }
+
+  // All the samples with the same local state are multiplied by the same
+  // matrix, so we stack them and perform a single matrix-matrix product
+  for (int spin = 0; spin < d_; spin++) {
+    Index n = 0;
+    for (Index b = 0; b < batch; b++) {
+      if (indices(b, site) == spin) {
+        gather_.block(n * D_, 0, D_, D_) = prods.block(b * D_, 0, D_, D_);
+        n++;
+      }
+    }
+    if (n == 0) {
+      continue;
+    }
+
+    if (transposed) {
+      gather_prod_.topRows(n * D_).noalias() =
+          gather_.topRows(n * D_) * W[spin].transpose();
+    } else {
+      gather_prod_.topRows(n * D_).noalias() = gather_.topRows(n * D_) * W[spin];
+    }
+
+    n = 0;
+    for (Index b = 0; b < batch; b++) {
+      if (indices(b, site) == spin) {
+        prods.block(b * D_, 0, D_, D_) = gather_prod_.block(n * D_, 0, D_, D_);
+        n++;
+      }
+    }
+  }
+}
+
+MPSPeriodic::MatrixType MPSPeriodic::environment(
+    const std::vector<MatrixType> &left_prods,
+    const std::vector<MatrixType> &right_prods, int site) const {
+  if (N_ == 1) {
+    return identity_mat_;
+  }
+  if (site == 0) {
+    return right_prods[1];
+  }
+  if (site == N_ - 1) {
+    return left_prods[N_ - 2];
+  }
+  return prod(right_prods[site + 1], left_prods[site - 1]);
+}
+
+void MPSPeriodic::LogVal(Eigen::Ref<const RowMatrix<double>> v,
+                         Eigen::Ref<VectorType> out, const any & /*unused*/) {
+  CheckShape(__FUNCTION__, "v", {v.rows(), v.cols()}, {std::ignore, N_});
+  CheckShape(__FUNCTION__, "out", out.size(), v.rows());
+
+  const Index batch = v.rows();
+  const auto indices = local_indices(v);
+
+  RowMatrix<Complex> prods(batch * D_, Dsec_);
+  for (Index b = 0; b < batch; b++) {
+    prods.block(b * D_, 0, D_, Dsec_) = W_[0][indices(b, 0)];
+  }
+  for (int site = 1; site < N_; site++) {
+    batched_prod(indices, site, false, prods);
+  }
+
+  for (Index b = 0; b < batch; b++) {
+    const auto block = prods.block(b * D_, 0, D_, Dsec_);
+    out(b) = std::log(is_diag_ ? block.sum() : block.trace());
+  }
+}
+
 Complex MPSPeriodic::LogValSingle(VisibleConstType v, const any &lt) {
   if (lt.empty()) return std::log(trace(mps_contraction(v, 0, N_)));
   return std::log(trace(any_cast_ref<LookupType>(lt)[Nleaves_ - 1]));
@@ -358,39 +454,149 @@ void MPSPeriodic::LogValDiff(VisibleConstType v,
                              const std::vector<std::vector<double>> &newconf,
                              Eigen::Ref<Eigen::VectorXcd> logvaldiffs) {
   const std::size_t nconn = tochange.size();
+  logvaldiffs = VectorType::Zero(nconn);
+
+  // Left (W_0 ... W_i) and right (W_i ... W_{N-1}) products of the current
+  // configuration. They are computed once and shared by all the connected
+  // configurations.
+  std::vector<MatrixType> left_prods(N_), right_prods(N_);
+  left_prods[0] = W_[0][confindex_[v(0)]];
+  right_prods[N_ - 1] = W_[(N_ - 1) % symperiod_][confindex_[v(N_ - 1)]];
+  for (int site = 1; site < N_; site++) {
+    left_prods[site] =
+        prod(left_prods[site - 1], W_[site % symperiod_][confindex_[v(site)]]);
+    const int rsite = N_ - 1 - site;
+    right_prods[rsite] = prod(W_[rsite % symperiod_][confindex_[v(rsite)]],
+                              right_prods[rsite + 1]);
+  }
+  const Complex current_psi = trace(left_prods[N_ - 1]);
+
+  // Environments of the sites touched by single-site changes, such that
+  // psi(v') = Tr(W'_site E_site) costs O(D^2)
+  std::map<int, MatrixType> environments;
 
   std::vector<std::size_t> sorted_ind;
-  logvaldiffs = VectorType::Zero(nconn);
-  Complex current_psi = trace(mps_contraction(v, 0, N_));
   MatrixType new_prods(D_, Dsec_);
 
   for (std::size_t k = 0; k < nconn; k++) {
     std::size_t nchange = tochange[k].size();
-    if (nchange > 0) {
-      sorted_ind = sort_indeces(tochange[k]);
-      int site = tochange[k][sorted_ind[0]];
+    if (nchange == 0) {
+      continue;
+    }
+
+    if (nchange == 1) {
+      const int site = tochange[k][0];
+      auto it = environments.find(site);
+      if (it == environments.end()) {
+        it = environments
+                 .emplace(site, environment(left_prods, right_prods, site))
+                 .first;
+      }
+      const auto &W = W_[site % symperiod_][confindex_[newconf[k][0]]];
+      const Complex new_psi =
+          is_diag_ ? W.cwiseProduct(it->second).sum()
+                   : W.cwiseProduct(it->second.transpose()).sum();
+      logvaldiffs(k) = std::log(new_psi / current_psi);
+      continue;
+    }
+
+    sorted_ind = sort_indeces(tochange[k]);
+    int site = tochange[k][sorted_ind[0]];
+
+    if (site == 0) {
+      new_prods = W_[0][confindex_[newconf[k][sorted_ind[0]]]];
+    } else {
+      new_prods =
+          prod(left_prods[site - 1],
+               W_[site % symperiod_][confindex_[newconf[k][sorted_ind[0]]]]);
+    }
 
+    for (std::size_t i = 1; i < nchange; i++) {
+      site = tochange[k][sorted_ind[i]];
+      new_prods = prod(
+          new_prods,
+          prod(mps_contraction(v, tochange[k][sorted_ind[i - 1]] + 1, site),
+               W_[site % symperiod_][confindex_[newconf[k][sorted_ind[i]]]]));
+    }
+    site = tochange[k][sorted_ind[nchange - 1]];
+    if (site < N_ - 1) {
+      new_prods = prod(new_prods, right_prods[site + 1]);
+    }
+    logvaldiffs(k) = std::log(trace(new_prods) / current_psi);
+  }
+}
+
+void MPSPeriodic::DerLog(Eigen::Ref<const RowMatrix<double>> v,
+                         Eigen::Ref<RowMatrix<Complex>> out,
+                         const any & /*unused*/) {
+  CheckShape(__FUNCTION__, "v", {v.rows(), v.cols()}, {std::ignore, N_});
+  CheckShape(__FUNCTION__, "out", {out.rows(), out.cols()},
+             {v.rows(), npar_});
+
+  if (N_ < 2) {
+    AbstractMachine::DerLog(v, out);
+    return;
+  }
+
+  const Index batch = v.rows();
+  const auto indices = local_indices(v);
+
+  // left_prods[i] holds W_0 ... W_i and right_prods[i] holds
+  // (W_i ... W_{N-1})^T (or W_i ... W_{N-1} for diagonal MPS) for all the
+  // samples in the batch
+  std::vector<RowMatrix<Complex>> left_prods(N_), right_prods(N_);
+  left_prods[0].resize(batch * D_, Dsec_);
+  right_prods[N_ - 1].resize(batch * D_, Dsec_);
+  for (Index b = 0; b < batch; b++) {
+    const auto &first = W_[0][indices(b, 0)];
+    const auto &last = W_[(N_ - 1) % symperiod_][indices(b, N_ - 1)];
+    left_prods[0].block(b * D_, 0, D_, Dsec_) = first;
+    if (is_diag_) {
+      right_prods[N_ - 1].block(b * D_, 0, D_, Dsec_) = last;
+    } else {
+      right_prods[N_ - 1].block(b * D_, 0, D_, Dsec_) = last.transpose();
+    }
+  }
+  for (int site = 1; site < N_; site++) {
+    left_prods[site] = left_prods[site - 1];
+    batched_prod(indices, site, false, left_prods[site]);
+    const int rsite = N_ - 1 - site;
+    right_prods[rsite] = right_prods[rsite + 1];
+    batched_prod(indices, rsite, true, right_prods[rsite]);
+  }
+
+  out.setZero();
+  MatrixType der_site(D_, Dsec_);
+  for (Index b = 0; b < batch; b++) {
+    auto left = [&](int site) {
+      return left_prods[site].block(b * D_, 0, D_, Dsec_);
+    };
+    auto right = [&](int site) {
+      return right_prods[site].block(b * D_, 0, D_, Dsec_);
+    };
+
+    for (int site = 0; site < N_; site++) {
+      // The derivative with respect to W_site is the transpose of its
+      // environment (W_{site+1} ... W_{N-1}) (W_0 ... W_{site-1})
       if (site == 0) {
-        new_prods = W_[0][confindex_[newconf[k][sorted_ind[0]]]];
+        der_site = right(1);
+      } else if (site == N_ - 1) {
+        der_site = is_diag_ ? MatrixType(left(N_ - 2))
+                            : MatrixType(left(N_ - 2).transpose());
+      } else if (is_diag_) {
+        der_site = right(site + 1).cwiseProduct(left(site - 1));
       } else {
-        new_prods =
-            prod(mps_contraction(v, 0, site),
-                 W_[site % symperiod_][confindex_[newconf[k][sorted_ind[0]]]]);
+        der_site.noalias() = left(site - 1).transpose() * right(site + 1);
       }
 
-      for (std::size_t i = 1; i < nchange; i++) {
-        site = tochange[k][sorted_ind[i]];
-        new_prods = prod(
-            new_prods,
-            prod(mps_contraction(v, tochange[k][sorted_ind[i - 1]] + 1, site),
-                 W_[site % symperiod_][confindex_[newconf[k][sorted_ind[i]]]]));
-      }
-      site = tochange[k][sorted_ind[nchange - 1]];
-      if (site < N_ - 1) {
-        new_prods = prod(new_prods, mps_contraction(v, site + 1, N_));
-      }
-      logvaldiffs(k) = std::log(trace(new_prods) / current_psi);
+      const Index offset =
+          (d_ * (site % symperiod_) + indices(b, site)) * Dsq_;
+      Eigen::Map<RowMatrix<Complex>>(out.row(b).data() + offset, D_, Dsec_) +=
+          der_site;
     }
+
+    const auto psi = left(N_ - 1);
+    out.row(b) /= is_diag_ ? psi.sum() : psi.trace();
   }
 }
 
@@ -60,6 +60,11 @@ class MPSPeriodic : public AbstractMachine {
 
   using LookupType = std::vector<MatrixType>;
 
+  // Workspaces for the batched contractions, used to gather the products of
+  // all samples sharing the same local state at a given site
+  RowMatrix<Complex> gather_;
+  RowMatrix<Complex> gather_prod_;
+
  public:
   MPSPeriodic(std::shared_ptr<const AbstractHilbert> hilbert, int bond_dim,
               bool diag, int symperiod = -1);
@@ -73,6 +78,12 @@ class MPSPeriodic : public AbstractMachine {
   void UpdateLookup(VisibleConstType v, const std::vector<int> &tochange,
                     const std::vector<double> &newconf, any &lt) override;
 
+  void LogVal(Eigen::Ref<const RowMatrix<double>> v,
+              Eigen::Ref<VectorType> out, const any &lt = any{}) override;
+  void DerLog(Eigen::Ref<const RowMatrix<double>> v,
+              Eigen::Ref<RowMatrix<Complex>> out,
+              const any &lt = any{}) override;
+
   Complex LogValSingle(VisibleConstType v, const any &lt) override;
   void LogValDiff(VisibleConstType v,
                   const std::vector<std::vector<int>> &tochange,
@@ -103,6 +114,19 @@ class MPSPeriodic : public AbstractMachine {
   // Auxiliary function that calculates contractions from site1 to site2
   inline MatrixType mps_contraction(VisibleConstType v, const int &site1,
                                     const int &site2);
+  // Auxiliary function that maps a batch of configurations to MPS indices
+  inline RowMatrix<int> local_indices(
+      Eigen::Ref<const RowMatrix<double>> v);
+  // Auxiliary function that multiplies on the right (or, if transposed, on
+  // the left and transposing everything) the products of a batch of samples,
+  // stored contiguously as [batch * D, Dsec], by the matrices of site
+  inline void batched_prod(const RowMatrix<int> &indices, int site,
+                           bool transposed, RowMatrix<Complex> &prods);
+  // Auxiliary function that computes, for a single configuration, the product
+  // of all matrices but the one at site (in cyclic order starting after site)
+  inline MatrixType environment(const std::vector<MatrixType> &left_prods,
+                                const std::vector<MatrixType> &right_prods,
+                                int site) const;
 };
 
 }  // namespace netket
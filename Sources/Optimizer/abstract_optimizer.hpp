@@ -18,6 +18,7 @@
 #include <Eigen/Dense>
 #include <complex>
 #include <vector>
+#include "Utils/exceptions.hpp"
 
 namespace netket {
 
@@ -30,6 +31,17 @@ class AbstractOptimizer {
 
   virtual void Reset() = 0;
 
+  /**
+   * Returns the internal state of the optimizer (e.g. the moments of the
+   * gradient), packed in a single vector, which can be restored with SetState.
+   * Stateless optimizers return an empty vector.
+   */
+  virtual Eigen::VectorXd GetState() const { return Eigen::VectorXd{}; }
+
+  virtual void SetState(const Eigen::VectorXd &state) {
+    CheckShape(__FUNCTION__, "state", state.size(), 0);
+  }
+
   void Init(int npar, bool is_holomorphic) {
     is_holomorphic_ = is_holomorphic;
 
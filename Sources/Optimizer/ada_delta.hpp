@@ -79,6 +79,18 @@ class AdaDelta : public AbstractOptimizer {
     Eg2_ = Eigen::VectorXd::Zero(npar_);
     Edx2_ = Eigen::VectorXd::Zero(npar_);
   }
+
+  Eigen::VectorXd GetState() const override {
+    Eigen::VectorXd state(2 * npar_);
+    state << Eg2_, Edx2_;
+    return state;
+  }
+
+  void SetState(const Eigen::VectorXd &state) override {
+    CheckShape(__FUNCTION__, "state", state.size(), 2 * npar_);
+    Eg2_ = state.head(npar_);
+    Edx2_ = state.tail(npar_);
+  }
 };
 
 }  // namespace netket
@@ -66,6 +66,13 @@ class AdaGrad : public AbstractOptimizer {
   }
 
   void Reset() override { Gt_ = Eigen::VectorXd::Zero(npar_); }
+
+  Eigen::VectorXd GetState() const override { return Gt_; }
+
+  void SetState(const Eigen::VectorXd &state) override {
+    CheckShape(__FUNCTION__, "state", state.size(), npar_);
+    Gt_ = state;
+  }
 };
 
 }  // namespace netket
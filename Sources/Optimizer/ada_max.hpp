@@ -96,6 +96,19 @@ class AdaMax : public AbstractOptimizer {
     niter_ = 0;
   }
 
+  Eigen::VectorXd GetState() const override {
+    Eigen::VectorXd state(2 * npar_ + 1);
+    state << mt_, ut_, niter_;
+    return state;
+  }
+
+  void SetState(const Eigen::VectorXd &state) override {
+    CheckShape(__FUNCTION__, "state", state.size(), 2 * npar_ + 1);
+    mt_ = state.head(npar_);
+    ut_ = state.segment(npar_, npar_);
+    niter_ = state(2 * npar_);
+  }
+
   void SetResetEvery(double niter_reset) { niter_reset_ = niter_reset; }
 };
 
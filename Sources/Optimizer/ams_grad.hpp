@@ -81,6 +81,18 @@ class AMSGrad : public AbstractOptimizer {
     mt_ = Eigen::VectorXd::Zero(npar_);
     vt_ = Eigen::VectorXd::Zero(npar_);
   }
+
+  Eigen::VectorXd GetState() const override {
+    Eigen::VectorXd state(2 * npar_);
+    state << mt_, vt_;
+    return state;
+  }
+
+  void SetState(const Eigen::VectorXd &state) override {
+    CheckShape(__FUNCTION__, "state", state.size(), 2 * npar_);
+    mt_ = state.head(npar_);
+    vt_ = state.tail(npar_);
+  }
 };
 
 }  // namespace netket
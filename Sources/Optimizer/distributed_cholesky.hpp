@@ -0,0 +1,230 @@
+// Copyright 2019 The Simons Foundation, Inc. - All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//    http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#ifndef NETKET_DISTRIBUTED_CHOLESKY_HPP
+#define NETKET_DISTRIBUTED_CHOLESKY_HPP
+
+#include <stdexcept>
+#include <type_traits>
+#include <vector>
+
+#include <Eigen/Dense>
+
+#include "Utils/parallel_utils.hpp"
+#include "common_types.hpp"
+
+namespace netket {
+
+/**
+ * Hermitian positive-definite matrix A = O^† O * scale + shift, where the
+ * rows of O are distributed among the MPI processes.
+ *
+ * The columns of A are split in blocks of `block_size` columns, which are
+ * assigned cyclically to the MPI processes: block k is stored on the process
+ * k % n_nodes. Each process thus stores only a fraction 1 / n_nodes of the
+ * matrix, and the Cholesky factorization and the triangular solves are
+ * distributed among the processes as well.
+ */
+template <class T>
+class DistributedCholesky {
+  static_assert(std::is_same<T, double>::value ||
+                    std::is_same<T, Complex>::value,
+                "T must be either double or Complex");
+
+ public:
+  using Matrix = Eigen::Matrix<T, Eigen::Dynamic, Eigen::Dynamic>;
+  using RowMatrixType =
+      Eigen::Matrix<T, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor>;
+  using Vector = Eigen::Matrix<T, Eigen::Dynamic, 1>;
+
+  explicit DistributedCholesky(Index block_size = 64)
+      : block_size_(block_size),
+        n_nodes_(MPIHelpers::MPISize()),
+        rank_(MPIHelpers::MPIRank()),
+        mpi_type_(std::is_same<T, double>::value ? MPI_DOUBLE
+                                                 : MPI_DOUBLE_COMPLEX) {}
+
+  /**
+   * Builds the local blocks of A = O^† O * scale + shift and computes its
+   * Cholesky factorization A = L L^†. Only the lower triangle is referenced.
+   * @param O The local rows of O.
+   */
+  void Compute(Eigen::Ref<const RowMatrixType> O, double scale, double shift) {
+    size_ = O.cols();
+    Build(O, scale, shift);
+    Factorize();
+  }
+
+  /**
+   * Solves A x = b. The vector b must be the same on all the processes, and so
+   * is the solution x.
+   */
+  void Solve(Eigen::Ref<const Vector> b, Eigen::Ref<Vector> x) const {
+    // Forward substitution, L y = b. The contributions of the blocks of L
+    // stored on each process are accumulated in partial and reduced on the
+    // owner of the diagonal block.
+    Vector y = Vector::Zero(size_);
+    Vector partial = Vector::Zero(size_);
+    for (Index k = 0; k < NBlocks(); ++k) {
+      const Index start = BlockStart(k);
+      const Index bsize = BlockSize(k);
+      const int owner = Owner(k);
+      const bool is_owner = owner == rank_;
+
+      MPI_Reduce(is_owner ? MPI_IN_PLACE : partial.data() + start,
+                 partial.data() + start, bsize, mpi_type_, MPI_SUM, owner,
+                 MPI_COMM_WORLD);
+
+      if (is_owner) {
+        const auto L = local_.block(start, LocalColumn(k), size_ - start, bsize);
+        y.segment(start, bsize) =
+            L.topRows(bsize).template triangularView<Eigen::Lower>().solve(
+                b.segment(start, bsize) - partial.segment(start, bsize));
+        partial.tail(size_ - start - bsize).noalias() +=
+            L.bottomRows(size_ - start - bsize) * y.segment(start, bsize);
+      }
+    }
+    SumOnNodes(y);
+
+    // Backward substitution, L^† x = y. Each block of x is broadcast by the
+    // process holding the corresponding column of L.
+    x.setZero();
+    for (Index k = NBlocks() - 1; k >= 0; --k) {
+      const Index start = BlockStart(k);
+      const Index bsize = BlockSize(k);
+      const int owner = Owner(k);
+
+      if (owner == rank_) {
+        const auto L = local_.block(start, LocalColumn(k), size_ - start, bsize);
+        Vector rhs = y.segment(start, bsize);
+        rhs.noalias() -= L.bottomRows(size_ - start - bsize).adjoint() *
+                         x.tail(size_ - start - bsize);
+        x.segment(start, bsize) = L.topRows(bsize)
+                                      .adjoint()
+                                      .template triangularView<Eigen::Upper>()
+                                      .solve(rhs);
+      }
+      MPI_Bcast(x.data() + start, bsize, mpi_type_, owner, MPI_COMM_WORLD);
+    }
+  }
+
+  /**
+   * Number of elements of A stored on this process.
+   */
+  Index LocalSize() const { return local_.size(); }
+
+ private:
+  Index block_size_;
+  int n_nodes_;
+  int rank_;
+  MPI_Datatype mpi_type_;
+
+  Index size_ = 0;
+  Matrix local_;  // Local blocks of columns, stored contiguously
+
+  Index NBlocks() const { return (size_ + block_size_ - 1) / block_size_; }
+  Index BlockStart(Index k) const { return k * block_size_; }
+  Index BlockSize(Index k) const {
+    return std::min(block_size_, size_ - BlockStart(k));
+  }
+  int Owner(Index k) const { return k % n_nodes_; }
+  // Only the last block can be smaller than block_size_, hence the local
+  // blocks are all full except possibly the last one
+  Index LocalColumn(Index k) const { return (k / n_nodes_) * block_size_; }
+  Index LocalColumns(int node) const {
+    Index n_cols = 0;
+    for (Index k = node; k < NBlocks(); k += n_nodes_) {
+      n_cols += BlockSize(k);
+    }
+    return n_cols;
+  }
+
+  void Build(Eigen::Ref<const RowMatrixType> O, double scale, double shift) {
+    // The contributions of the local samples to the columns of each process
+    // are computed in turn and summed on that process
+    Matrix contrib;
+    for (int node = 0; node < n_nodes_; ++node) {
+      contrib.resize(size_, LocalColumns(node));
+      for (Index k = node; k < NBlocks(); k += n_nodes_) {
+        contrib.middleCols(LocalColumn(k), BlockSize(k)).noalias() =
+            O.adjoint() * O.middleCols(BlockStart(k), BlockSize(k));
+      }
+
+      const bool is_owner = node == rank_;
+      MPI_Reduce(is_owner ? MPI_IN_PLACE : contrib.data(), contrib.data(),
+                 contrib.size(), mpi_type_, MPI_SUM, node, MPI_COMM_WORLD);
+      if (is_owner) {
+        local_.swap(contrib);
+      }
+    }
+
+    local_ *= scale;
+    for (Index k = rank_; k < NBlocks(); k += n_nodes_) {
+      local_.block(BlockStart(k), LocalColumn(k), BlockSize(k), BlockSize(k))
+          .diagonal()
+          .array() += shift;
+    }
+  }
+
+  // Right-looking blocked Cholesky factorization. At step k, the owner of
+  // the k-th block of columns factorizes it and broadcasts it, then every
+  // process updates its own trailing blocks.
+  void Factorize() {
+    Matrix panel;
+    for (Index k = 0; k < NBlocks(); ++k) {
+      const Index start = BlockStart(k);
+      const Index bsize = BlockSize(k);
+      const Index rest = size_ - start;
+      const int owner = Owner(k);
+
+      int success = 1;
+      if (owner == rank_) {
+        auto A = local_.block(start, LocalColumn(k), rest, bsize);
+        Eigen::LLT<Matrix> llt(A.topRows(bsize));
+        success = llt.info() == Eigen::Success;
+        A.topRows(bsize) = llt.matrixL();
+        A.bottomRows(rest - bsize) = llt.matrixL()
+                                         .solve(A.bottomRows(rest - bsize)
+                                                    .adjoint())
+                                         .adjoint();
+        panel = A;
+      } else {
+        panel.resize(rest, bsize);
+      }
+      // All the processes must throw, not only the owner
+      MPI_Bcast(&success, 1, MPI_INT, owner, MPI_COMM_WORLD);
+      if (!success) {
+        throw std::runtime_error{
+            "Cholesky factorization failed: the matrix is not positive "
+            "definite."};
+      }
+      MPI_Bcast(panel.data(), panel.size(), mpi_type_, owner, MPI_COMM_WORLD);
+
+      for (Index j = k + 1 + Modulo(rank_ - k - 1, n_nodes_); j < NBlocks();
+           j += n_nodes_) {
+        const Index jstart = BlockStart(j);
+        const Index jsize = BlockSize(j);
+        local_.block(jstart, LocalColumn(j), size_ - jstart, jsize).noalias() -=
+            panel.bottomRows(size_ - jstart) *
+            panel.middleRows(jstart - start, jsize).adjoint();
+      }
+    }
+  }
+
+  static Index Modulo(Index a, Index n) { return ((a % n) + n) % n; }
+};
+
+}  // namespace netket
+
+#endif
@@ -116,6 +116,70 @@ class SrMatrixComplex : public Eigen::EigenBase<netket::SrMatrixComplex> {
   double shift_;
   double scale_;
 };
+
+/**
+ * Jacobi preconditioner for SrMatrixReal and SrMatrixComplex, i.e. the
+ * inverse of the diagonal of S = scale * O^† O + shift. Since the diagonal
+ * of Re(O^† O) and O^† O coincide, the same class is used in both cases.
+ */
+template <typename _Scalar>
+class SrJacobiPreconditioner {
+ public:
+  typedef _Scalar Scalar;
+  typedef Eigen::Matrix<Scalar, Eigen::Dynamic, 1> Vector;
+
+  SrJacobiPreconditioner() : is_initialized_(false) {}
+
+  template <typename MatType>
+  explicit SrJacobiPreconditioner(const MatType &mat) {
+    compute(mat);
+  }
+
+  Index rows() const { return inv_diag_.size(); }
+  Index cols() const { return inv_diag_.size(); }
+
+  template <typename MatType>
+  SrJacobiPreconditioner &analyzePattern(const MatType &) {
+    return *this;
+  }
+
+  template <typename MatType>
+  SrJacobiPreconditioner &factorize(const MatType &mat) {
+    Eigen::VectorXd diag =
+        mat.my_matrix().cwiseAbs2().colwise().sum().transpose();
+    netket::SumOnNodes(diag);
+    diag = diag * mat.getScale() + Eigen::VectorXd::Constant(
+                                       diag.size(), mat.shift());
+
+    // Vanishing diagonal elements are left unscaled
+    for (Index i = 0; i < diag.size(); ++i) {
+      if (diag(i) <= 0) {
+        diag(i) = 1.0;
+      }
+    }
+    inv_diag_ = diag.cwiseInverse().template cast<Scalar>();
+    is_initialized_ = true;
+    return *this;
+  }
+
+  template <typename MatType>
+  SrJacobiPreconditioner &compute(const MatType &mat) {
+    return factorize(mat);
+  }
+
+  template <typename Rhs>
+  Vector solve(const Eigen::MatrixBase<Rhs> &b) const {
+    eigen_assert(is_initialized_ &&
+                 "SrJacobiPreconditioner is not initialized.");
+    return inv_diag_.cwiseProduct(b);
+  }
+
+  Eigen::ComputationInfo info() { return Eigen::Success; }
+
+ private:
+  Vector inv_diag_;
+  bool is_initialized_;
+};
 }  // namespace netket
 
 // Implementation of SrMatrix * Eigen::DenseVector though a
@@ -64,6 +64,13 @@ class Momentum : public AbstractOptimizer {
   }
 
   void Reset() override { mt_ = Eigen::VectorXd::Zero(npar_); }
+
+  Eigen::VectorXd GetState() const override { return mt_; }
+
+  void SetState(const Eigen::VectorXd &state) override {
+    CheckShape(__FUNCTION__, "state", state.size(), npar_);
+    mt_ = state;
+  }
 };
 
 }  // namespace netket
@@ -49,6 +49,13 @@ void AddOptimizerModule(py::module &m) {
       .def("init", static_cast<Init>(&AbstractOptimizer::Init))
       .def("reset", &AbstractOptimizer::Reset, R"EOF(
        Member function resetting the internal state of the optimizer.)EOF")
+      .def("get_state", &AbstractOptimizer::GetState, R"EOF(
+       Returns the internal state of the optimizer (e.g. the moments of the
+       gradient) as a vector, which can be restored with `set_state`.)EOF")
+      .def("set_state", &AbstractOptimizer::SetState, py::arg("state"), R"EOF(
+       Restores the internal state of the optimizer returned by `get_state`.
+       The optimizer must have been initialized with the same number of
+       parameters.)EOF")
       .def("update", static_cast<UpdateReal>(&AbstractOptimizer::Update),
            py::arg("grad").noconvert(), py::arg("param").noconvert(),
            "Update `param` by applying a gradient-based optimization step "
@@ -12,22 +12,80 @@ namespace netket {
 namespace py = pybind11;
 
 void AddSR(py::module& m) {
+  using ComputeUpdateType = void (SR::*)(SR::OkRef, SR::GradRef, SR::OutputRef);
+  using ComputeUpdateAccumulatedType =
+      void (SR::*)(SRAccumulator&, SR::OutputRef);
+
+  py::class_<SRAccumulator>(
+      m, "SRAccumulator",
+      R"EOF(Accumulates the S matrix and the gradient used by SR from blocks of
+           log-derivatives, without storing the full matrix of log-derivatives.
+           The memory is O(n_par²), independent of the number of samples.)EOF")
+      .def(py::init<Index>(), py::arg("n_par"))
+      .def("update", &SRAccumulator::Update, py::arg("der_logs"),
+           py::arg("eloc"),
+           py::call_guard<py::gil_scoped_release>(),
+           R"EOF(
+            Adds a block of samples.
+
+            Args:
+                der_logs: The log-derivatives O_i(v_j) of the samples in the
+                   block, as a (n_block, n_par) complex array.
+                eloc: The local values of the samples, centered with their mean
+                   over all the samples and all the MPI processes.
+          )EOF")
+      .def("finalize", &SRAccumulator::Finalize,
+           py::call_guard<py::gil_scoped_release>(),
+           R"EOF(
+            Combines the contributions of all the MPI processes. It must be
+            called on all the processes, and it is called automatically by
+            `SR.compute_update`.
+          )EOF")
+      .def("reset", &SRAccumulator::Reset,
+           "Discards all the accumulated samples.")
+      .def_property_readonly("n_samples", &SRAccumulator::NSamples)
+      .def_property_readonly("n_par", &SRAccumulator::Npar)
+      .def_property_readonly("finalized", &SRAccumulator::IsFinalized)
+      .def_property_readonly("covariance_matrix", &SRAccumulator::SMatrix,
+                             "numpy.ndarray: The S matrix, after finalize.")
+      .def_property_readonly("gradient", &SRAccumulator::Gradient,
+                             "numpy.ndarray: The gradient f, after finalize.");
+
   py::class_<SR>(m, "SR", "Performs stochastic reconfiguration (SR) updates")
       .def(py::init([](const std::string& solver_name, double diag_shift,
                        bool use_iterative, bool is_holomorphic,
-                       nonstd::optional<double> svd_threshold) {
+                       nonstd::optional<double> svd_threshold,
+                       const std::string& preconditioner_name,
+                       bool warm_start, nonstd::optional<Index> svd_rank,
+                       Index svd_oversampling) {
              const auto solver = SR::SolverFromString(solver_name);
              NETKET_CHECK(solver.has_value(), InvalidInputError,
                           "Invalid LSQ solver \"" << solver_name
                                                   << "\" specified for SR");
-             return SR(solver.value(), diag_shift, use_iterative,
-                       is_holomorphic, svd_threshold);
+             const auto preconditioner =
+                 SR::PreconditionerFromString(preconditioner_name);
+             NETKET_CHECK(preconditioner.has_value(), InvalidInputError,
+                          "Invalid preconditioner \""
+                              << preconditioner_name << "\" specified for SR");
+             SR sr(solver.value(), diag_shift, use_iterative, is_holomorphic,
+                   svd_threshold);
+             sr.SetPreconditioner(preconditioner.value());
+             sr.SetWarmStart(warm_start);
+             sr.SetRandomizedSVDParameters(svd_rank, svd_oversampling);
+             return sr;
            }),
            py::arg("lsq_solver") = "LLT", py::arg("diag_shift") = 0.01,
            py::arg("use_iterative") = false, py::arg("is_holomorphic") = true,
-           py::arg("svd_threshold") = nonstd::nullopt)
-      .def("compute_update", &SR::ComputeUpdate, py::arg("Oks").noconvert(),
+           py::arg("svd_threshold") = nonstd::nullopt,
+           py::arg("preconditioner") = "Identity",
+           py::arg("warm_start") = false,
+           py::arg("svd_rank") = nonstd::nullopt,
+           py::arg("svd_oversampling") = 10)
+      .def("compute_update",
+           static_cast<ComputeUpdateType>(&SR::ComputeUpdate),
+           py::arg("Oks").noconvert(),
            py::arg("grad").noconvert(), py::arg("out").noconvert(),
+           py::call_guard<py::gil_scoped_release>(),
            R"EOF(
             Solves the SR flow equation for the parameter update ẋ.
 
@@ -42,6 +100,22 @@ void AddSR(py::module& m) {
                    𝕆_ij = O_i(v_j) - ⟨O_i⟩.
                 grad: The vector of forces f.
                 out: Output array for the update ẋ.
+
+            The GIL is released while the update is computed, so that other
+            python threads (e.g. a sampler) can run concurrently.
+          )EOF")
+      .def("compute_update",
+           static_cast<ComputeUpdateAccumulatedType>(&SR::ComputeUpdate),
+           py::arg("accumulator"), py::arg("out").noconvert(),
+           py::call_guard<py::gil_scoped_release>(),
+           R"EOF(
+            Solves the SR flow equation for the parameter update ẋ, using the
+            S matrix and the gradient collected by an `SRAccumulator`. Only the
+            LLT, LDLT, ColPivHouseholder and BDCSVD solvers are supported.
+
+            Args:
+                accumulator: The accumulated samples.
+                out: Output array for the update ẋ.
           )EOF")
       .def_property("store_rank_enabled", &SR::StoreRankEnabled,
                     &SR::SetStoreRank)
@@ -56,6 +130,49 @@ void AddSR(py::module& m) {
                https://doi.org/10.1017/9781316417041")EOF")
       .def_property("store_covariance_matrix_enabled",
                     &SR::StoreFullSMatrixEnabled, &SR::SetStoreFullSMatrix)
+      .def_property(
+          "preconditioner",
+          [](const SR& sr) {
+            return std::string{
+                SR::PreconditionerAsString(sr.GetPreconditioner())};
+          },
+          [](SR& sr, const std::string& name) {
+            const auto preconditioner = SR::PreconditionerFromString(name);
+            NETKET_CHECK(preconditioner.has_value(), InvalidInputError,
+                         "Invalid preconditioner \"" << name
+                                                     << "\" specified for SR");
+            sr.SetPreconditioner(preconditioner.value());
+          },
+          R"EOF(str: Preconditioner of the iterative solver, either "Identity" or
+               "Jacobi" (the inverse of the diagonal of S).)EOF")
+      .def_property("warm_start_enabled", &SR::WarmStartEnabled,
+                    &SR::SetWarmStart,
+                    R"EOF(bool: Whether the iterative solver starts from the
+               update computed at the previous step.)EOF")
+      .def_property_readonly(
+          "last_iterations", &SR::LastIterations,
+          R"EOF(int: Number of iterations of the iterative solver during the
+               last call to `compute_update`, or None.)EOF")
+      .def_property_readonly(
+          "last_residual", &SR::LastResidual,
+          R"EOF(float: Estimated relative residual of the iterative solver
+               after the last call to `compute_update`, or None.)EOF")
+      .def_property_readonly(
+          "last_solve_time", &SR::LastSolveTime,
+          R"EOF(float: Wall time in seconds of the last call to
+               `compute_update`, or None.)EOF")
+      .def_property_readonly("svd_rank", &SR::GetSVDRank,
+                             R"EOF(int: Rank of the truncated pseudo-inverse
+               computed by the RandomizedSVD solver, or None for
+               min(n_samples, n_par).)EOF")
+      .def_property_readonly("svd_oversampling", &SR::GetSVDOversampling,
+                             R"EOF(int: Number of additional random vectors
+               used by the RandomizedSVD solver to sample the range of S.)EOF")
+      .def_property_readonly(
+          "last_truncation_error", &SR::LastTruncationError,
+          R"EOF(float: Fraction of the trace of S discarded by the
+               RandomizedSVD solver during the last call to `compute_update`,
+               or None.)EOF")
       .def_property_readonly("last_rank", &SR::LastRank)
       .def_property_readonly("last_covariance_matrix", &SR::LastSMatrix)
       .def("info", &SR::LongDesc, py::arg("depth") = 0)
@@ -68,6 +68,13 @@ class RMSProp : public AbstractOptimizer {
   }
 
   void Reset() override { st_ = Eigen::VectorXd::Zero(npar_); }
+
+  Eigen::VectorXd GetState() const override { return st_; }
+
+  void SetState(const Eigen::VectorXd &state) override {
+    CheckShape(__FUNCTION__, "state", state.size(), npar_);
+    st_ = state;
+  }
 };
 
 }  // namespace netket
@@ -70,6 +70,15 @@ class Sgd : public AbstractOptimizer {
   }
 
   void Reset() override {}
+
+  Eigen::VectorXd GetState() const override {
+    return Eigen::VectorXd::Constant(1, eta_);
+  }
+
+  void SetState(const Eigen::VectorXd &state) override {
+    CheckShape(__FUNCTION__, "state", state.size(), 1);
+    eta_ = state(0);
+  }
 };
 
 }  // namespace netket
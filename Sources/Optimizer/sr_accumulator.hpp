@@ -0,0 +1,179 @@
+// Copyright 2019 The Simons Foundation, Inc. - All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//    http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#ifndef NETKET_SR_ACCUMULATOR_HPP
+#define NETKET_SR_ACCUMULATOR_HPP
+
+#include <stdexcept>
+
+#include <Eigen/Dense>
+
+#include "Utils/exceptions.hpp"
+#include "Utils/parallel_utils.hpp"
+#include "common_types.hpp"
+
+namespace netket {
+
+/**
+ * Accumulates the quantities needed by SR from blocks of log-derivatives, as
+ * they are produced, without ever storing the full matrix O:
+ *    S = ⟨(O - ⟨O⟩)^† (O - ⟨O⟩)⟩ and f = ⟨O^† E_loc⟩,
+ * where E_loc are the centered local values. The memory is O(n_par²),
+ * independent of the number of samples.
+ *
+ * The mean and the co-moment matrix are updated block by block with the
+ * pairwise algorithm of Chan, Golub and LeVeque (1979), which is numerically
+ * stable, and then combined in the same way over the MPI processes.
+ */
+class SRAccumulator {
+ public:
+  using OkRef = Eigen::Ref<const RowMatrixXcd>;
+  using ElocRef = Eigen::Ref<const VectorXcd>;
+
+  explicit SRAccumulator(Index npar) : npar_(npar) { Reset(); }
+
+  /**
+   * Discards all the accumulated samples.
+   */
+  void Reset() {
+    n_samples_ = 0;
+    mean_ = Eigen::RowVectorXcd::Zero(npar_);
+    comoment_ = MatrixXcd::Zero(npar_, npar_);
+    grad_ = VectorXcd::Zero(npar_);
+    finalized_ = false;
+  }
+
+  /**
+   * Adds a block of samples.
+   *
+   * @param der_logs The log-derivatives O_i(v_j) of the samples in the block,
+   *    one row per sample.
+   * @param eloc The local values of the samples, centered with their mean
+   *    over all the samples and all the MPI processes. Since they sum to zero,
+   *    f can be accumulated without centering the log-derivatives.
+   */
+  void Update(OkRef der_logs, ElocRef eloc) {
+    NETKET_CHECK(der_logs.cols() == npar_, InvalidInputError,
+                 "Invalid number of parameters: " << der_logs.cols()
+                                                  << ", expected " << npar_);
+    NETKET_CHECK(der_logs.rows() == eloc.size(), InvalidInputError,
+                 "Inconsistent number of samples: " << der_logs.rows()
+                                                    << " log-derivatives and "
+                                                    << eloc.size()
+                                                    << " local values");
+    if (finalized_) {
+      throw std::logic_error{
+          "SRAccumulator cannot be updated after being finalized, call "
+          "reset() first."};
+    }
+    const Index n_block = der_logs.rows();
+    if (n_block == 0) {
+      return;
+    }
+
+    grad_.noalias() += der_logs.adjoint() * eloc;
+
+    const Eigen::RowVectorXcd block_mean = der_logs.colwise().mean();
+    RowMatrixXcd centered = der_logs.rowwise() - block_mean;
+    comoment_.selfadjointView<Eigen::Lower>().rankUpdate(centered.adjoint());
+    Merge(n_block, block_mean);
+  }
+
+  /**
+   * Combines the contributions of all the MPI processes and normalizes S and
+   * f. This must be called by all the processes, and is called automatically
+   * by `SR::ComputeUpdate`. Calling it more than once has no effect.
+   */
+  void Finalize() {
+    if (finalized_) {
+      return;
+    }
+    double n_local = n_samples_;
+    double n_total = n_local;
+    SumOnNodes(n_total);
+    NETKET_CHECK(n_total > 0, InvalidInputError,
+                 "SRAccumulator does not contain any sample");
+
+    VectorXcd global_mean = mean_.transpose() * n_local;
+    SumOnNodes(global_mean);
+    global_mean /= n_total;
+
+    // Correction to the co-moment due to the difference between the local
+    // and the global mean
+    const Eigen::RowVectorXcd delta = mean_ - global_mean.transpose();
+    comoment_.selfadjointView<Eigen::Lower>().rankUpdate(delta.adjoint(),
+                                                         n_local);
+
+    S_ = comoment_.selfadjointView<Eigen::Lower>();
+    SumOnNodes(S_);
+    S_ /= n_total;
+
+    SumOnNodes(grad_);
+    grad_ /= n_total;
+
+    n_samples_ = static_cast<Index>(n_total);
+    comoment_.resize(0, 0);
+    finalized_ = true;
+  }
+
+  bool IsFinalized() const { return finalized_; }
+
+  /**
+   * Number of samples accumulated on this process, or on all the processes
+   * after `Finalize` has been called.
+   */
+  Index NSamples() const { return n_samples_; }
+  Index Npar() const { return npar_; }
+
+  /**
+   * The S matrix and the gradient f, available after `Finalize`.
+   */
+  const MatrixXcd& SMatrix() const {
+    CheckFinalized();
+    return S_;
+  }
+  const VectorXcd& Gradient() const {
+    CheckFinalized();
+    return grad_;
+  }
+
+ private:
+  Index npar_;
+  Index n_samples_;
+  Eigen::RowVectorXcd mean_;
+  // Only the lower triangle is updated
+  MatrixXcd comoment_;
+  MatrixXcd S_;
+  VectorXcd grad_;
+  bool finalized_;
+
+  void Merge(Index n_block, const Eigen::RowVectorXcd& block_mean) {
+    const Index n_new = n_samples_ + n_block;
+    const Eigen::RowVectorXcd delta = block_mean - mean_;
+    comoment_.selfadjointView<Eigen::Lower>().rankUpdate(
+        delta.adjoint(), double(n_samples_) * n_block / n_new);
+    mean_ += delta * (double(n_block) / n_new);
+    n_samples_ = n_new;
+  }
+
+  void CheckFinalized() const {
+    if (!finalized_) {
+      throw std::logic_error{"SRAccumulator has not been finalized yet."};
+    }
+  }
+};
+
+}  // namespace netket
+
+#endif  // NETKET_SR_ACCUMULATOR_HPP
@@ -1,5 +1,7 @@
 #include "stochastic_reconfiguration.hpp"
 
+#include "Utils/profiler.hpp"
+
 namespace netket {
 
 nonstd::optional<SR::LSQSolver> SR::SolverFromString(const std::string& name) {
@@ -11,17 +13,49 @@ nonstd::optional<SR::LSQSolver> SR::SolverFromString(const std::string& name) {
     return ColPivHouseholder;
   } else if (name == "BDCSVD") {
     return BDCSVD;
+  } else if (name == "SampleSpace") {
+    return SampleSpace;
+  } else if (name == "DistributedLLT") {
+    return DistributedLLT;
+  } else if (name == "RandomizedSVD") {
+    return RandomizedSVD;
   } else {
     return nonstd::nullopt;
   }
 }
 
 const char* SR::SolverAsString(LSQSolver solver) {
-  static const char* solvers[] = {"LLT", "LDLT", "ColPivHouseholder", "BCDSVD"};
+  static const char* solvers[] = {"LLT",           "LDLT",
+                                 "ColPivHouseholder", "BCDSVD",
+                                 "SampleSpace",   "DistributedLLT",
+                                 "RandomizedSVD"};
   return solvers[solver];
 }
 
+nonstd::optional<SR::Preconditioner> SR::PreconditionerFromString(
+    const std::string& name) {
+  if (name == "Identity") {
+    return Identity;
+  } else if (name == "Jacobi") {
+    return Jacobi;
+  } else {
+    return nonstd::nullopt;
+  }
+}
+
+const char* SR::PreconditionerAsString(Preconditioner preconditioner) {
+  static const char* preconditioners[] = {"Identity", "Jacobi"};
+  return preconditioners[preconditioner];
+}
+
 void SR::ComputeUpdate(OkRef Oks, GradRef grad_ref, OutputRef deltaP) {
+  NETKET_PROFILE_SCOPE("sr.solve");
+  NETKET_PROFILE_SCOPE("sr.solve");
+  Stopwatch stopwatch;
+  last_iterations_ = nonstd::nullopt;
+  last_residual_ = nonstd::nullopt;
+  last_truncation_error_ = nonstd::nullopt;
+
   double nsamp = Oks.rows();
   SumOnNodes(nsamp);
   // auto npar = grad.size();
@@ -32,6 +66,12 @@ void SR::ComputeUpdate(OkRef Oks, GradRef grad_ref, OutputRef deltaP) {
   if (is_holomorphic_) {
     if (use_iterative_) {
       SolveIterative<VectorXcd>(Oks, grad, deltaP, nsamp);
+    } else if (solver_ == SampleSpace) {
+      SolveSampleSpace<Complex>(Oks, grad, deltaP, nsamp);
+    } else if (solver_ == DistributedLLT) {
+      SolveDistributed<Complex>(Oks, grad, deltaP, nsamp);
+    } else if (solver_ == RandomizedSVD) {
+      SolveRandomizedSVD<Complex>(Oks, grad, deltaP, nsamp);
     } else {
       BuildSMatrix<MatrixXcd>(Oks.adjoint() * Oks, Scomplex_, nsamp);
       ApplyPreconditioning(Scomplex_, grad);
@@ -41,6 +81,18 @@ void SR::ComputeUpdate(OkRef Oks, GradRef grad_ref, OutputRef deltaP) {
   } else {
     if (use_iterative_) {
       SolveIterative<VectorXd>(Oks, grad.real(), deltaP, nsamp);
+    } else if (solver_ == SampleSpace || solver_ == DistributedLLT ||
+               solver_ == RandomizedSVD) {
+      const RowMatrixXd O_real = StackRealImag(Oks);
+      VectorXd deltaP_real(deltaP.size());
+      if (solver_ == SampleSpace) {
+        SolveSampleSpace<double>(O_real, grad.real(), deltaP_real, nsamp);
+      } else if (solver_ == RandomizedSVD) {
+        SolveRandomizedSVD<double>(O_real, grad.real(), deltaP_real, nsamp);
+      } else {
+        SolveDistributed<double>(O_real, grad.real(), deltaP_real, nsamp);
+      }
+      deltaP.real() = deltaP_real;
     } else {
       BuildSMatrix<MatrixXd>((Oks.adjoint() * Oks).real(), Sreal_, nsamp);
       ApplyPreconditioning(Sreal_, grad);
@@ -50,11 +102,48 @@ void SR::ComputeUpdate(OkRef Oks, GradRef grad_ref, OutputRef deltaP) {
     deltaP.imag().setZero();
   }
   MPI_Barrier(MPI_COMM_WORLD);
+
+  last_solve_time_ =
+      stopwatch.elapsed<std::chrono::duration<double>>().count();
+}
+
+void SR::ComputeUpdate(SRAccumulator& accumulator, OutputRef deltaP) {
+  if (use_iterative_ || solver_ == SampleSpace || solver_ == DistributedLLT ||
+      solver_ == RandomizedSVD) {
+    throw InvalidInputError{
+        std::string{"Accumulated SR quantities are not supported by the "} +
+        (use_iterative_ ? "iterative" : SolverAsString(solver_)) + " solver"};
+  }
+  NETKET_PROFILE_SCOPE("sr.solve");
+  Stopwatch stopwatch;
+  last_iterations_ = nonstd::nullopt;
+  last_residual_ = nonstd::nullopt;
+  last_truncation_error_ = nonstd::nullopt;
+
+  accumulator.Finalize();
+  VectorXcd grad = accumulator.Gradient();
+
+  if (is_holomorphic_) {
+    Scomplex_ = accumulator.SMatrix();
+    ApplyPreconditioning(Scomplex_, grad);
+    SolveLeastSquares<MatrixXcd, VectorXcd>(Scomplex_, grad, deltaP);
+    RevertPreconditioning(deltaP);
+  } else {
+    Sreal_ = accumulator.SMatrix().real();
+    ApplyPreconditioning(Sreal_, grad);
+    SolveLeastSquares<MatrixXd, VectorXd>(Sreal_, grad.real(), deltaP.real());
+    RevertPreconditioning(deltaP);
+    deltaP.imag().setZero();
+  }
+
+  last_solve_time_ =
+      stopwatch.elapsed<std::chrono::duration<double>>().count();
 }
 
 void SR::SetParameters(LSQSolver solver, double diagshift, bool use_iterative,
                        bool is_holomorphic) {
   CheckSolverCompatibility(use_iterative, solver, store_rank_);
+  CheckDiagShift(use_iterative, solver, diagshift);
 
   solver_ = solver;
   sr_diag_shift_ = diagshift;
@@ -76,9 +165,21 @@ std::string SR::LongDesc(Index depth) const {
       << " wavefunctions\n"
       << indent() << "Solver: ";
   if (use_iterative_) {
-    str << "iterative (Conjugate Gradient)";
+    str << "iterative (Conjugate Gradient)\n"
+        << indent() << "Preconditioner: "
+        << PreconditionerAsString(preconditioner_) << "\n"
+        << indent() << "Warm start: " << (warm_start_ ? "enabled" : "disabled");
   } else {
     str << SolverAsString(solver_);
+    if (solver_ == RandomizedSVD) {
+      str << "\n" << indent() << "Rank: ";
+      if (svd_rank_.has_value()) {
+        str << *svd_rank_;
+      } else {
+        str << "min(n_samples, n_par)";
+      }
+      str << ", oversampling: " << svd_oversampling_;
+    }
   }
   str << "\n";
   return str.str();
@@ -88,12 +189,20 @@ std::string SR::ShortDesc() const {
   std::stringstream str;
   str << "SR(solver=";
   if (use_iterative_) {
-    str << "iterative";
+    str << "iterative, preconditioner="
+        << PreconditionerAsString(preconditioner_)
+        << ", warm_start=" << (warm_start_ ? "True" : "False");
   } else {
     str << SolverAsString(solver_) << ", diag_shift=" << sr_diag_shift_;
     if (svd_threshold_.has_value()) {
       str << ", threshold=" << *svd_threshold_;
     }
+    if (solver_ == RandomizedSVD) {
+      if (svd_rank_.has_value()) {
+        str << ", rank=" << *svd_rank_;
+      }
+      str << ", oversampling=" << svd_oversampling_;
+    }
   }
   str << ", is_holomorphic=" << (is_holomorphic_ ? "True" : "False") << ")";
   return str.str();
@@ -112,6 +221,12 @@ void SR::SetStoreFullSMatrix(bool enabled) {
     throw std::logic_error{
         "Cannot store full S matrix with `use_iterative = true`."};
   }
+  if ((solver_ == SampleSpace || solver_ == DistributedLLT ||
+       solver_ == RandomizedSVD) &&
+      enabled) {
+    throw std::logic_error{std::string{"Cannot store full S matrix with the "} +
+                           SolverAsString(solver_) + " solver."};
+  }
   store_full_S_matrix_ = enabled;
   if (!enabled) {
     last_S_ = nonstd::nullopt;
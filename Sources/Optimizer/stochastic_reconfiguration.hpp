@@ -19,6 +19,7 @@
 #include <fstream>
 #include <iomanip>
 #include <iostream>
+#include <random>
 #include <stdexcept>
 #include <string>
 #include <vector>
@@ -31,8 +32,11 @@
 #include "Utils/messages.hpp"
 #include "Utils/parallel_utils.hpp"
 #include "Utils/random_utils.hpp"
+#include "Utils/stopwatch.hpp"
 #include "common_types.hpp"
+#include "distributed_cholesky.hpp"
 #include "matrix_replacement.hpp"
+#include "sr_accumulator.hpp"
 
 namespace netket {
 
@@ -45,11 +49,25 @@ class SR {
   using GradRef = Eigen::Ref<const VectorXcd>;
   using OutputRef = Eigen::Ref<VectorXcd>;
 
-  enum LSQSolver { LLT = 0, LDLT = 1, ColPivHouseholder = 2, BDCSVD = 3 };
+  enum LSQSolver {
+    LLT = 0,
+    LDLT = 1,
+    ColPivHouseholder = 2,
+    BDCSVD = 3,
+    SampleSpace = 4,
+    DistributedLLT = 5,
+    RandomizedSVD = 6
+  };
 
   static nonstd::optional<LSQSolver> SolverFromString(const std::string& name);
   static const char* SolverAsString(LSQSolver solver);
 
+  enum Preconditioner { Identity = 0, Jacobi = 1 };
+
+  static nonstd::optional<Preconditioner> PreconditionerFromString(
+      const std::string& name);
+  static const char* PreconditionerAsString(Preconditioner preconditioner);
+
   explicit SR(LSQSolver solver, double diagshift = 0.01,
               bool use_iterative = false, bool is_holomorphic = true,
               nonstd::optional<double> svd_threshold = nonstd::nullopt)
@@ -59,11 +77,13 @@ class SR {
         is_holomorphic_(is_holomorphic),
         svd_threshold_(svd_threshold) {
     if (svd_threshold.has_value()) {
-      if (use_iterative || solver != BDCSVD) {
+      if (use_iterative || (solver != BDCSVD && solver != RandomizedSVD)) {
         throw InvalidInputError{
-            "svd_threshold option only available for BDCSVD solver"};
+            "svd_threshold option only available for BDCSVD and "
+            "RandomizedSVD solvers"};
       }
     }
+    CheckDiagShift(use_iterative, solver, diagshift);
   }
 
   explicit SR(double diagshift = 0.01, bool use_iterative = false,
@@ -88,6 +108,17 @@ class SR {
    */
   void ComputeUpdate(OkRef Oks, GradRef grad, OutputRef deltaP);
 
+  /**
+   * Solves the SR flow equation for the parameter update ẋ, using the S
+   * matrix and the gradient collected by an `SRAccumulator`. Only the dense
+   * solvers (LLT, LDLT, ColPivHouseholder and BDCSVD) are supported, since
+   * the others need the matrix of log-derivatives.
+   *
+   * @param accumulator The accumulated samples. It is finalized if needed.
+   * @param deltaP Output parameter for the update ẋ.
+   */
+  void ComputeUpdate(SRAccumulator& accumulator, OutputRef deltaP);
+
   void SetParameters(LSQSolver solver, double diagshift = 0.01,
                      bool use_iterative = false, bool is_holomorphic = true);
   void SetParameters(double diagshift = 0.01, bool use_iterative = false,
@@ -110,6 +141,14 @@ class SR {
           "Scale-invariant regularization is not implemented "
           "for iterative solvers at the moment."};
     }
+    if ((solver_ == SampleSpace || solver_ == DistributedLLT ||
+         solver_ == RandomizedSVD) &&
+        enabled) {
+      throw std::runtime_error{
+          std::string{"Scale-invariant regularization is not implemented "
+                      "for the "} +
+          SolverAsString(solver_) + " solver at the moment."};
+    }
     if (enabled) {
       InfoMessage() << "Using scale-invariant preconditioning." << std::endl;
     }
@@ -142,6 +181,71 @@ class SR {
   bool StoreFullSMatrixEnabled() const { return store_full_S_matrix_; }
   void SetStoreFullSMatrix(bool enabled);
 
+  /**
+   * Preconditioner used by the iterative solver.
+   */
+  Preconditioner GetPreconditioner() const { return preconditioner_; }
+  void SetPreconditioner(Preconditioner preconditioner) {
+    preconditioner_ = preconditioner;
+  }
+
+  /**
+   * If enabled, the iterative solver starts from the solution found during
+   * the previous call to `ComputeUpdate`, instead of zero. Since consecutive
+   * updates are strongly correlated, this reduces the number of iterations.
+   */
+  bool WarmStartEnabled() const { return warm_start_; }
+  void SetWarmStart(bool enabled) {
+    warm_start_ = enabled;
+    if (!enabled) {
+      last_solution_.resize(0);
+    }
+  }
+
+  /**
+   * Number of iterations and estimated relative residual of the iterative
+   * solver during the last call to `ComputeUpdate`, or `nullopt` if the
+   * iterative solver was not used.
+   */
+  nonstd::optional<Index> LastIterations() const { return last_iterations_; }
+  nonstd::optional<double> LastResidual() const { return last_residual_; }
+
+  /**
+   * Wall time (in seconds) spent in the last call to `ComputeUpdate`, or
+   * `nullopt` before the first call.
+   */
+  nonstd::optional<double> LastSolveTime() const { return last_solve_time_; }
+
+  /**
+   * Rank of the truncated pseudo-inverse computed by the RandomizedSVD
+   * solver, or `nullopt` to use min(n_samples, n_par), which is an upper
+   * bound to the rank of S. The range of S is sampled with
+   * rank + oversampling random vectors.
+   */
+  nonstd::optional<Index> GetSVDRank() const { return svd_rank_; }
+  Index GetSVDOversampling() const { return svd_oversampling_; }
+  void SetRandomizedSVDParameters(nonstd::optional<Index> rank,
+                                  Index oversampling = 10) {
+    if (rank.has_value() && *rank <= 0) {
+      throw InvalidInputError{"svd_rank must be positive"};
+    }
+    if (oversampling < 0) {
+      throw InvalidInputError{"svd_oversampling must be non-negative"};
+    }
+    svd_rank_ = rank;
+    svd_oversampling_ = oversampling;
+  }
+
+  /**
+   * Relative truncation error of the RandomizedSVD solver during the last
+   * call to `ComputeUpdate`, i.e. the fraction of Tr(S) (the squared
+   * Frobenius norm of the scaled Oks) which is not captured by the retained
+   * singular values, or `nullopt` if another solver was used.
+   */
+  nonstd::optional<double> LastTruncationError() const {
+    return last_truncation_error_;
+  }
+
   /**
    * Returns the is_holomorphic parameter
    * @return
@@ -168,6 +272,18 @@ class SR {
   nonstd::optional<Index> last_rank_;
   nonstd::optional<MatrixXcd> last_S_;
 
+  Preconditioner preconditioner_ = Identity;
+  bool warm_start_ = false;
+  VectorXcd last_solution_;
+
+  nonstd::optional<Index> last_iterations_;
+  nonstd::optional<double> last_residual_;
+  nonstd::optional<double> last_solve_time_;
+
+  nonstd::optional<Index> svd_rank_;
+  Index svd_oversampling_ = 10;
+  nonstd::optional<double> last_truncation_error_;
+
   template <class Mat>
   void BuildSMatrix(Eigen::Ref<const Mat> S_local, Mat& S_out, double nsamp) {
     static_assert(std::is_same<Mat, MatrixXd>::value ||
@@ -227,12 +343,248 @@ class SR {
     S.setShift(sr_diag_shift_);
     S.setScale(1. / nsamp);
 
+    if (preconditioner_ == Jacobi) {
+      SolveConjugateGradient<
+          SrJacobiPreconditioner<typename Vec::Scalar>>(S, grad, deltaP);
+    } else {
+      SolveConjugateGradient<Eigen::IdentityPreconditioner>(S, grad,
+                                                            deltaP);
+    }
+  }
+
+  template <class Precond, class SrMatrixType, class Vec>
+  void SolveConjugateGradient(const SrMatrixType& S,
+                              const Eigen::Ref<const Vec>& grad,
+                              OutputRef deltaP) {
     using SolverType =
         Eigen::ConjugateGradient<SrMatrixType, Eigen::Lower | Eigen::Upper,
-                                 Eigen::IdentityPreconditioner>;
+                                 Precond>;
     SolverType it_solver(S);
     it_solver.setTolerance(1.0e-3);
-    deltaP = it_solver.solve(grad);
+
+    if (warm_start_ && last_solution_.size() == grad.size()) {
+      Vec guess;
+      AssignGuess(last_solution_, guess);
+      deltaP = it_solver.solveWithGuess(grad, guess);
+    } else {
+      deltaP = it_solver.solve(grad);
+    }
+    if (warm_start_) {
+      last_solution_ = deltaP;
+    }
+
+    last_iterations_ = it_solver.iterations();
+    last_residual_ = it_solver.error();
+  }
+
+  static void AssignGuess(const VectorXcd& solution, VectorXd& guess) {
+    guess = solution.real();
+  }
+  static void AssignGuess(const VectorXcd& solution, VectorXcd& guess) {
+    guess = solution;
+  }
+
+  /**
+   * Solves the SR equation in the space of the samples, which is much
+   * smaller than the space of the parameters when n_par >> n_samples.
+   *
+   * With S = O^† O / N + ε, the Woodbury identity gives
+   *    S⁻¹ f = [f - O^† (O O^† + N ε)⁻¹ O f] / ε,
+   * hence only the N × N Gram matrix O O^† is built and factorized, at a cost
+   * O(N² n_par + N³) instead of O(n_par² N + n_par³).
+   * The rows of O are distributed among the MPI processes: the blocks of
+   * the Gram matrix are computed broadcasting the local rows of each process
+   * in turn, and then summed over all the nodes.
+   */
+  template <class T>
+  void SolveSampleSpace(
+      Eigen::Ref<const Eigen::Matrix<T, Eigen::Dynamic, Eigen::Dynamic,
+                                     Eigen::RowMajor>>
+          O,
+      Eigen::Ref<const Eigen::Matrix<T, Eigen::Dynamic, 1>> grad,
+      Eigen::Ref<Eigen::Matrix<T, Eigen::Dynamic, 1>> deltaP, double nsamp) {
+    using Matrix = Eigen::Matrix<T, Eigen::Dynamic, Eigen::Dynamic>;
+    using RowMatrix =
+        Eigen::Matrix<T, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor>;
+    using Vector = Eigen::Matrix<T, Eigen::Dynamic, 1>;
+    const MPI_Datatype mpi_type =
+        std::is_same<T, double>::value ? MPI_DOUBLE : MPI_DOUBLE_COMPLEX;
+
+    const int n_nodes = MPIHelpers::MPISize();
+    const int rank = MPIHelpers::MPIRank();
+    const Index npar = O.cols();
+
+    // Number of rows on each node and offsets of the local blocks
+    int local_rows = O.rows();
+    std::vector<int> rows(n_nodes);
+    MPI_Allgather(&local_rows, 1, MPI_INT, rows.data(), 1, MPI_INT,
+                  MPI_COMM_WORLD);
+    std::vector<Index> offsets(n_nodes + 1, 0);
+    for (int i = 0; i < n_nodes; ++i) {
+      offsets[i + 1] = offsets[i] + rows[i];
+    }
+    const Index n_rows = offsets.back();
+    const Index offset = offsets[rank];
+
+    Matrix gram = Matrix::Zero(n_rows, n_rows);
+    if (n_nodes == 1) {
+      gram.noalias() = O * O.adjoint();
+    } else {
+      RowMatrix O_other;
+      for (int i = 0; i < n_nodes; ++i) {
+        if (i == rank) {
+          O_other = O;
+        } else {
+          O_other.resize(rows[i], npar);
+        }
+        MPI_Bcast(O_other.data(), O_other.size(), mpi_type, i, MPI_COMM_WORLD);
+        gram.block(offset, offsets[i], local_rows, rows[i]).noalias() =
+            O * O_other.adjoint();
+      }
+      SumOnNodes(gram);
+    }
+    gram.diagonal().array() += nsamp * sr_diag_shift_;
+
+    Vector u = Vector::Zero(n_rows);
+    u.segment(offset, local_rows).noalias() = O * grad;
+    SumOnNodes(u);
+
+    Eigen::LLT<Matrix> llt(gram);
+    const Vector y = llt.solve(u);
+
+    Vector Oy = O.adjoint() * y.segment(offset, local_rows);
+    SumOnNodes(Oy);
+    deltaP = (grad - Oy) / sr_diag_shift_;
+  }
+
+  /**
+   * Solves the SR equation without ever storing the full S matrix on a
+   * single process: its blocks of columns are distributed cyclically among
+   * the MPI processes, which compute them from the local rows of O and
+   * perform a distributed Cholesky factorization.
+   */
+  template <class T>
+  void SolveDistributed(
+      Eigen::Ref<const Eigen::Matrix<T, Eigen::Dynamic, Eigen::Dynamic,
+                                     Eigen::RowMajor>>
+          O,
+      Eigen::Ref<const Eigen::Matrix<T, Eigen::Dynamic, 1>> grad,
+      Eigen::Ref<Eigen::Matrix<T, Eigen::Dynamic, 1>> deltaP, double nsamp) {
+    DistributedCholesky<T> cholesky;
+    cholesky.Compute(O, 1. / nsamp, sr_diag_shift_);
+    cholesky.Solve(grad, deltaP);
+  }
+
+  /**
+   * Solves the SR equation with a truncated pseudo-inverse of S, whose
+   * dominant eigenvectors are found by randomized range finding directly on
+   * the log-derivatives, without ever forming S.
+   *
+   * With A = O / √N, so that S = A^† A, the range of S is sampled as
+   * Y = A^† (A Ω) for a random n_par × (k + p) matrix Ω, where k is the rank
+   * and p the oversampling. With Q an orthonormal basis of Y, the small
+   * matrix Q^† S Q = (A Q)^† (A Q) is diagonalized, giving the approximate
+   * eigenpairs (σ², Q W) of S. The update is then
+   *    ẋ = Σ_{i<k} v_i (v_i^† f) / (σ_i² + ε),
+   * where the singular values below svd_threshold times the largest one are
+   * discarded. The cost is O(N n_par (k + p)) and the memory O(n_par (k + p)).
+   */
+  template <class T>
+  void SolveRandomizedSVD(
+      Eigen::Ref<const Eigen::Matrix<T, Eigen::Dynamic, Eigen::Dynamic,
+                                     Eigen::RowMajor>>
+          O,
+      Eigen::Ref<const Eigen::Matrix<T, Eigen::Dynamic, 1>> grad,
+      Eigen::Ref<Eigen::Matrix<T, Eigen::Dynamic, 1>> deltaP, double nsamp) {
+    using Matrix = Eigen::Matrix<T, Eigen::Dynamic, Eigen::Dynamic>;
+    using Vector = Eigen::Matrix<T, Eigen::Dynamic, 1>;
+
+    const Index npar = O.cols();
+    // The rows of O might be stacked real and imaginary parts, hence the
+    // number of rows of O is used instead of nsamp.
+    int n_rows = O.rows();
+    SumOnNodes(n_rows);
+    const Index max_rank = std::min<Index>(n_rows, npar);
+    const Index rank = std::min(svd_rank_.value_or(max_rank), max_rank);
+    const Index n_vec = std::min(rank + svd_oversampling_, npar);
+
+    // The same Ω is needed on all the nodes, hence a fixed seed is used
+    Matrix omega(npar, n_vec);
+    std::mt19937 engine(n_vec);
+    std::normal_distribution<double> dist;
+    for (Index j = 0; j < n_vec; ++j) {
+      for (Index i = 0; i < npar; ++i) {
+        RandomGaussian(engine, dist, omega(i, j));
+      }
+    }
+
+    Matrix Y = O.adjoint() * (O * omega);
+    SumOnNodes(Y);
+    Eigen::HouseholderQR<Matrix> qr(Y);
+    const Matrix Q = qr.householderQ() * Matrix::Identity(npar, n_vec);
+
+    const Matrix B = O * Q;
+    Matrix G = B.adjoint() * B;
+    SumOnNodes(G);
+    G /= nsamp;
+
+    // Eigenvalues are sorted in increasing order
+    Eigen::SelfAdjointEigenSolver<Matrix> eig(G);
+    const VectorXd& lambda = eig.eigenvalues();
+    const double lambda_max = std::max(lambda(n_vec - 1), 0.);
+    const double cutoff =
+        svd_threshold_.has_value()
+            ? (*svd_threshold_) * (*svd_threshold_) * lambda_max
+            : 0.;
+
+    Vector coeffs = eig.eigenvectors().adjoint() * (Q.adjoint() * grad);
+    Index kept = 0;
+    double captured = 0.;
+    for (Index i = 0; i < n_vec; ++i) {
+      if (i >= n_vec - rank && lambda(i) > cutoff) {
+        coeffs(i) /= (lambda(i) + sr_diag_shift_);
+        captured += lambda(i);
+        ++kept;
+      } else {
+        coeffs(i) = 0.;
+      }
+    }
+    deltaP = Q * (eig.eigenvectors() * coeffs);
+
+    double trace = O.squaredNorm();
+    SumOnNodes(trace);
+    trace /= nsamp;
+    last_truncation_error_ =
+        trace > 0. ? std::max(1. - captured / trace, 0.) : 0.;
+    if (store_rank_) {
+      last_rank_ = kept;
+    }
+  }
+
+  template <class Engine>
+  static void RandomGaussian(Engine& engine,
+                             std::normal_distribution<double>& dist,
+                             double& out) {
+    out = dist(engine);
+  }
+  template <class Engine>
+  static void RandomGaussian(Engine& engine,
+                             std::normal_distribution<double>& dist,
+                             Complex& out) {
+    const double re = dist(engine);
+    out = Complex(re, dist(engine));
+  }
+
+  /**
+   * Returns the real matrix [Re(O); Im(O)], such that
+   * Re(O^† O) = Re(O)^T Re(O) + Im(O)^T Im(O), i.e. the real and imaginary
+   * parts of the log-derivatives are treated as separate samples.
+   */
+  static RowMatrixXd StackRealImag(OkRef Oks) {
+    RowMatrixXd O_real(2 * Oks.rows(), Oks.cols());
+    O_real.topRows(Oks.rows()) = Oks.real();
+    O_real.bottomRows(Oks.rows()) = Oks.imag();
+    return O_real;
   }
 
   template <class Mat, class Vec, class Out>
@@ -279,13 +631,22 @@ class SR {
       throw std::logic_error{
           "SR cannot store matrix rank with interactive solver."};
     }
-    if (solver == LLT || solver == LDLT) {
+    if (solver == LLT || solver == LDLT || solver == SampleSpace ||
+        solver == DistributedLLT) {
       std::stringstream str;
       str << "SR cannot store matrix rank: Solver " << SolverAsString(solver)
           << " is not rank-revealing.";
       throw std::logic_error{str.str()};
     }
   }
+
+  static void CheckDiagShift(bool use_iterative, LSQSolver solver,
+                             double diagshift) {
+    if (!use_iterative && solver == SampleSpace && !(diagshift > 0.)) {
+      throw InvalidInputError{
+          "SampleSpace solver requires a positive diag_shift"};
+    }
+  }
 };
 
 }  // namespace netket
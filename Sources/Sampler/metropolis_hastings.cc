@@ -14,6 +14,8 @@
 
 #include "Sampler/metropolis_hastings.hpp"
 
+#include "Utils/profiler.hpp"
+
 namespace netket {
 
 MetropolisHastings::MetropolisHastings(
@@ -111,9 +113,13 @@ void MetropolisHastings::SweepSize(Index const sweep_size) {
 }
 
 void MetropolisHastings::Sweep() {
+  NETKET_PROFILE_SCOPE("sampler.sweep");
+  const auto accepted = accepted_samples_;
   for (auto i = Index{0}; i < sweep_size_; ++i) {
     OneStep();
   }
+  NETKET_PROFILE_COUNT("sampler.moves", sweep_size_ * n_chains_);
+  NETKET_PROFILE_COUNT("sampler.accepted", accepted_samples_ - accepted);
 }
 
 // Creates sub-batched calls of LogVal
@@ -123,12 +129,16 @@ void MetropolisHastings::LogValBatched(
   Index imax = v.rows() / batch_size_;
 
   for (Index i = 0; i < imax; i++) {
+    NETKET_PROFILE_SCOPE("log_val");
+    NETKET_PROFILE_COUNT("log_val.batch_size", batch_size_);
     GetMachine().LogVal(v.block(i * batch_size_, 0, batch_size_, v.cols()),
                         out.block(i * batch_size_, 0, batch_size_, out.cols()),
                         cache);
   }
 
   if (batch_size_ * imax < v.rows()) {
+    NETKET_PROFILE_SCOPE("log_val");
+    NETKET_PROFILE_COUNT("log_val.batch_size", v.rows() - batch_size_ * imax);
     GetMachine().LogVal(v.bottomRows(v.rows() - batch_size_ * imax),
                         out.bottomRows(v.rows() - batch_size_ * imax), cache);
   }
@@ -14,6 +14,8 @@
 
 #include "Sampler/metropolis_hastings_pt.hpp"
 
+#include "Utils/profiler.hpp"
+
 namespace netket {
 
 MetropolisHastingsPt::MetropolisHastingsPt(
@@ -165,6 +167,7 @@ void MetropolisHastingsPt::SweepSize(Index const sweep_size) {
 }
 
 void MetropolisHastingsPt::Sweep() {
+  NETKET_PROFILE_SCOPE("sampler.sweep");
   for (auto i = Index{0}; i < sweep_size_; ++i) {
     OneStep();
     ExchangeStep();
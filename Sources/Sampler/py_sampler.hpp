@@ -127,6 +127,10 @@ void AddSamplerModule(py::module& m) {
           [](const AbstractSampler& self) { return self.CurrentState().first; },
           R"EOF(A matrix of current visible configurations. Every row
                           corresponds to a visible configuration)EOF")
+      .def("set_visible", &AbstractSampler::SetVisible, py::arg("v"), R"EOF(
+      Sets the current visible configurations of the chains. Every row
+      corresponds to a visible configuration. The log-values of the machine are
+      only recomputed by the next call to ``reset``.)EOF")
       .def_property_readonly(
           "current_state",
           [](const AbstractSampler& self) { return self.CurrentState(); },
@@ -68,6 +68,26 @@ class MeanAndVarianceAccumulator {
 };
 }  // namespace detail
 
+namespace detail {
+/// Assembles `Stats` from the variance of the chain means divided by the
+/// number of chains `m` (B / n) and the average in-chain variance (W).
+Stats MakeStats(Complex mean, double between, double within, Index n,
+                Index m) {
+  constexpr auto NaN = std::numeric_limits<double>::quiet_NaN();
+  if (!std::isnan(between) && !std::isnan(within)) {
+    const auto t = between / within;
+    auto correlation = 0.5 * (t * static_cast<double>(n) - 1.0);
+    if (correlation < 0.0) correlation = 0;
+    const auto R =
+        std::sqrt(static_cast<double>(n - 1) / static_cast<double>(n) +
+                  between / within);
+    return {mean, std::sqrt(between / static_cast<double>(m)), within,
+            std::round(correlation), R};
+  }
+  return Stats{mean, NaN, NaN, NaN, NaN};
+}
+}  // namespace detail
+
 /// \brief Computes in-chain means and variances.
 std::pair<Eigen::VectorXcd, Eigen::VectorXd> StatisticsLocal(
     Eigen::Ref<const Eigen::VectorXcd> values, Index number_chains) {
@@ -149,17 +169,76 @@ Stats Statistics(Eigen::Ref<const Eigen::VectorXcd> values,
                           global_var[1] / static_cast<double>(m));
   }();
 
-  if (!std::isnan(var.first) && !std::isnan(var.second)) {
-    const auto t = var.first / var.second;
-    auto correlation = 0.5 * (t * static_cast<double>(n) - 1.0);
-    if (correlation < 0.0) correlation = 0;
-    const auto R =
-        std::sqrt(static_cast<double>(n - 1) / static_cast<double>(n) +
-                  var.first / var.second);
-    return {mean, std::sqrt(var.first / static_cast<double>(m)), var.second,
-            std::round(correlation), R};
+  return detail::MakeStats(mean, var.first, var.second, n, m);
+}
+
+Stats StatisticsAndGradient(Eigen::Ref<const Eigen::VectorXcd> values,
+                            Index local_number_chains,
+                            Eigen::Ref<RowMatrix<Complex>> der_logs,
+                            Eigen::Ref<Eigen::VectorXcd> grad,
+                            bool center_der_logs) {
+  NETKET_CHECK(values.size() >= local_number_chains, InvalidInputError,
+               "not enough samples to compute statistics");
+  CheckShape(__FUNCTION__, "der_logs", {der_logs.rows(), der_logs.cols()},
+             {values.size(), std::ignore});
+  CheckShape(__FUNCTION__, "grad", grad.size(), der_logs.cols());
+  constexpr auto NaN = std::numeric_limits<double>::quiet_NaN();
+
+  const auto stats_local = StatisticsLocal(values, local_number_chains);
+  const Index npar = der_logs.cols();
+  const Index n_local = values.size();
+  // Number of samples in each Markov Chain
+  const auto n = n_local / local_number_chains;
+  const int n_nodes = MPIHelpers::MPISize();
+  const auto m = n_nodes * local_number_chains;
+  const auto n_total = static_cast<double>(n * m);
+
+  // Local means of the values and of the log-derivatives
+  const Complex local_mean = stats_local.first.mean();
+  const Eigen::RowVectorXcd local_der_mean = der_logs.colwise().mean();
+
+  // Σ_k conj(O_k - ⟨O⟩_local) (v_k - ⟨v⟩_local), which is computed without
+  // centering O, since the centered values sum to zero
+  Eigen::VectorXcd local_grad =
+      der_logs.adjoint() * (values.array() - local_mean).matrix();
+  // Within-chain variances and variance of the chain means on this node
+  double within = stats_local.second.sum();
+  double between = (stats_local.first.array() - local_mean).abs2().sum();
+
+  Complex mean = local_mean;
+  Eigen::RowVectorXcd der_mean = local_der_mean;
+  if (n_nodes > 1) {
+    // All the local sums are combined in a single reduction. The contributions
+    // of the differences between the local and the global means are added
+    // after the reduction, following Chan, Golub and LeVeque (1979).
+    Eigen::VectorXcd buffer(2 * npar + 2);
+    const auto weight = static_cast<double>(n_local);
+    buffer(0) = weight * local_mean;
+    buffer(1) = Complex{within, between + local_number_chains *
+                                              std::norm(local_mean)};
+    buffer.segment(2, npar) = weight * local_der_mean.transpose();
+    buffer.segment(2 + npar, npar) =
+        local_grad + weight * local_der_mean.adjoint() * local_mean;
+    MPI_Allreduce(MPI_IN_PLACE, buffer.data(), buffer.size(),
+                  MPI_DOUBLE_COMPLEX, MPI_SUM, MPI_COMM_WORLD);
+
+    mean = buffer(0) / n_total;
+    within = buffer(1).real();
+    between = std::max(buffer(1).imag() - m * std::norm(mean), 0.0);
+    der_mean = buffer.segment(2, npar).transpose() / n_total;
+    local_grad = buffer.segment(2 + npar, npar) -
+                 n_total * der_mean.adjoint() * mean;
   }
-  return Stats{mean, NaN, NaN, NaN, NaN};
+  grad = local_grad / n_total;
+
+  if (center_der_logs) {
+    der_logs.rowwise() -= der_mean;
+  }
+
+  if (m == 1) {
+    return Stats{mean, NaN, NaN, NaN, NaN};
+  }
+  return detail::MakeStats(mean, between / m, within / m, n, m);
 }
 
 Eigen::VectorXcd product_sv(Eigen::Ref<const Eigen::VectorXcd> s_values,
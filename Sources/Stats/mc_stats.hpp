@@ -42,6 +42,19 @@ struct Stats {
 Stats Statistics(Eigen::Ref<const Eigen::VectorXcd> local_values,
                  Index local_number_chains);
 
+/// Computes the statistics of `local_values`, like #Statistics, together with
+/// the gradient
+///     grad[i] = 𝔼[conj(O_i - 𝔼[O_i]) (v - 𝔼[v])],
+/// where the rows of `der_logs` are the log-derivatives O of the samples.
+/// All the MPI reductions are fused in a single call and no temporary of the
+/// size of `der_logs` is created. If `center_der_logs` is true, `der_logs` is
+/// centered in place.
+Stats StatisticsAndGradient(Eigen::Ref<const Eigen::VectorXcd> local_values,
+                            Index local_number_chains,
+                            Eigen::Ref<RowMatrix<Complex>> der_logs,
+                            Eigen::Ref<Eigen::VectorXcd> grad,
+                            bool center_der_logs);
+
 Eigen::VectorXcd product_sv(Eigen::Ref<const Eigen::VectorXcd> s_values,
                             Eigen::Ref<const RowMatrix<Complex>> v_values);
 
@@ -0,0 +1,323 @@
+// Copyright 2019 The Simons Foundation, Inc. - All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//    http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#ifndef NETKET_ONLINE_STATISTICS_HPP
+#define NETKET_ONLINE_STATISTICS_HPP
+
+#include <cmath>
+#include <limits>
+#include <numeric>
+#include <vector>
+
+#include <Eigen/Dense>
+
+#include "Stats/mc_stats.hpp"
+#include "Utils/exceptions.hpp"
+#include "Utils/parallel_utils.hpp"
+#include "common_types.hpp"
+#include "onlinestat.hpp"
+
+namespace netket {
+
+/**
+ * Online estimator of the statistics of a Monte Carlo observable sampled by
+ * several Markov chains, which are updated one sweep at a time.
+ *
+ * The memory does not depend on the number of samples. For each chain, it
+ * stores:
+ *  - the running sums of x_t conj(x_{t+k}) for the lags k < max_lag, together
+ *    with the first and the last max_lag samples, from which the truncated
+ *    autocorrelation function is obtained exactly;
+ *  - n_bins bins of equal size (#OnlineStat), which are merged pairwise when
+ *    they are all full, as in #Binning. They give the statistics of the two
+ *    halves of the chain used by the split R-hat.
+ *
+ * The integrated autocorrelation time τ_int = 1/2 + Σ_k ρ(k) is computed with
+ * the automatic window of Sokal, i.e. the smallest W ≥ c τ_int(W) with c = 5,
+ * truncated at max_lag - 1.
+ *
+ * The methods computing the estimates are collective over the MPI processes,
+ * which are assumed to run the same number of chains and samples.
+ */
+class OnlineStatistics {
+  using BinType = OnlineStat<Eigen::VectorXd>;
+
+  struct Chain {
+    // The samples are shifted by the first one, to reduce round-off errors
+    Complex shift;
+    Complex sum;
+    // Running sums of x_t conj(x_{t+k})
+    Eigen::VectorXcd products;
+    // First max_lag samples
+    Eigen::VectorXcd head;
+    // Last max_lag samples, as a ring buffer
+    Eigen::VectorXcd tail;
+
+    std::vector<BinType> bins;
+    Index full_bins;
+  };
+
+ public:
+  explicit OnlineStatistics(Index n_chains, Index max_lag = 64,
+                            Index n_bins = 16)
+      : n_chains_(n_chains), max_lag_(max_lag), n_bins_(n_bins) {
+    NETKET_CHECK(n_chains > 0, InvalidInputError,
+                 "invalid number of chains: " << n_chains
+                                              << "; expected a positive integer");
+    NETKET_CHECK(max_lag > 1, InvalidInputError,
+                 "invalid max_lag: " << max_lag << "; expected at least 2");
+    NETKET_CHECK(n_bins >= 2 && n_bins % 2 == 0, InvalidInputError,
+                 "invalid number of bins: " << n_bins
+                                            << "; expected a positive even "
+                                               "integer");
+    Reset();
+  }
+
+  /**
+   * Discards all the samples.
+   */
+  void Reset() {
+    n_ = 0;
+    bin_size_ = 1;
+    chains_.assign(n_chains_, Chain{});
+    for (auto& chain : chains_) {
+      chain.shift = 0.;
+      chain.sum = 0.;
+      chain.products = Eigen::VectorXcd::Zero(max_lag_);
+      chain.head.resize(max_lag_);
+      chain.tail.resize(max_lag_);
+      chain.bins.resize(n_bins_);
+      chain.full_bins = 0;
+    }
+  }
+
+  /**
+   * Adds one sample for each chain.
+   */
+  void Update(Eigen::Ref<const Eigen::VectorXcd> values) {
+    CheckShape(__FUNCTION__, "values", values.size(), n_chains_);
+    const Index pos = n_ % max_lag_;
+    const Index n_lags = std::min(n_ + 1, max_lag_);
+    Eigen::VectorXd bin_value(2);
+
+    for (Index c = 0; c < n_chains_; ++c) {
+      auto& chain = chains_[c];
+      if (n_ == 0) {
+        chain.shift = values(c);
+      }
+      const Complex x = values(c) - chain.shift;
+
+      chain.tail(pos) = x;
+      for (Index k = 0; k < n_lags; ++k) {
+        chain.products(k) +=
+            chain.tail((pos - k + max_lag_) % max_lag_) * std::conj(x);
+      }
+      if (n_ < max_lag_) {
+        chain.head(n_) = x;
+      }
+      chain.sum += x;
+
+      bin_value << x.real(), x.imag();
+      chain.bins[chain.full_bins] << bin_value;
+      if (chain.bins[chain.full_bins].N() == bin_size_) {
+        chain.full_bins++;
+      }
+    }
+    ++n_;
+
+    if (chains_[0].full_bins == n_bins_) {
+      MergeBins();
+    }
+  }
+
+  /**
+   * Adds the samples of a `(n_samples, n_chains)` row-major array.
+   */
+  void UpdateSamples(Eigen::Ref<const RowMatrix<Complex>> values) {
+    for (Index i = 0; i < values.rows(); ++i) {
+      Update(Eigen::VectorXcd{values.row(i).transpose()});
+    }
+  }
+
+  /**
+   * Number of samples in each chain.
+   */
+  Index N() const { return n_; }
+  Index NChains() const { return n_chains_; }
+  Index MaxLag() const { return max_lag_; }
+
+  /**
+   * Normalized autocorrelation function ρ(k) of the chains, for
+   * k < min(max_lag, n_samples). It is computed separately for each chain,
+   * around its own mean, and then averaged over the chains.
+   */
+  Eigen::VectorXd Autocorrelation() const {
+    const Index n_lags = std::min(n_, max_lag_);
+    Eigen::VectorXd acf = Eigen::VectorXd::Zero(n_lags);
+    for (const auto& chain : chains_) {
+      const Complex mean = chain.sum / double(n_);
+      Complex head_sum = chain.sum;
+      Complex tail_sum = chain.sum;
+      for (Index k = 0; k < n_lags; ++k) {
+        if (k > 0) {
+          // Σ_{t < n - k} x_t and Σ_{t >= k} x_t
+          head_sum -= chain.tail((n_ - k) % max_lag_);
+          tail_sum -= chain.head(k - 1);
+        }
+        const Complex c = chain.products(k) - std::conj(mean) * head_sum -
+                          mean * std::conj(tail_sum) +
+                          double(n_ - k) * std::norm(mean);
+        acf(k) += c.real() / double(n_ - k);
+      }
+    }
+    SumOnNodes(acf);
+    if (n_lags > 0) {
+      acf /= acf(0);
+    }
+    return acf;
+  }
+
+  /**
+   * Integrated autocorrelation time τ_int. It is 1/2 for uncorrelated
+   * samples.
+   */
+  double TauInt() const {
+    const auto acf = Autocorrelation();
+    if (acf.size() == 0 || !std::isfinite(acf(0))) {
+      return std::numeric_limits<double>::quiet_NaN();
+    }
+    double tau = 0.5;
+    for (Index w = 1; w < acf.size(); ++w) {
+      tau += acf(w);
+      if (w >= kSokalWindow * tau) {
+        break;
+      }
+    }
+    return tau;
+  }
+
+  /**
+   * Split R-hat (Gelman et al.), computed from the two halves of each chain.
+   * It is NaN until each half of the chains contains at least two
+   * samples.
+   */
+  double RHat() const {
+    constexpr auto NaN = std::numeric_limits<double>::quiet_NaN();
+    const Index half = chains_[0].full_bins / 2;
+    if (half * bin_size_ < 2) {
+      return NaN;
+    }
+    std::vector<BinType> halves(2 * n_chains_);
+    for (Index c = 0; c < n_chains_; ++c) {
+      for (Index i = 0; i < half; ++i) {
+        halves[2 * c] << chains_[c].bins[i];
+        halves[2 * c + 1] << chains_[c].bins[half + i];
+      }
+    }
+
+    // Means of the halves, without the shift of their chain
+    std::vector<Complex> means(halves.size());
+    double within = 0.;
+    for (std::size_t i = 0; i < halves.size(); ++i) {
+      const auto& h = halves[i];
+      means[i] = chains_[i / 2].shift + Complex(h.Mean()(0), h.Mean()(1));
+      within += h.Variance().sum();
+    }
+    int n_halves = halves.size();
+    Complex mean = std::accumulate(means.begin(), means.end(), Complex{0.});
+    SumOnNodes(n_halves);
+    SumOnNodes(mean);
+    SumOnNodes(within);
+    mean /= double(n_halves);
+
+    double between = 0.;
+    for (const auto& m : means) {
+      between += std::norm(m - mean);
+    }
+    SumOnNodes(between);
+
+    // W and B / n
+    within /= n_halves;
+    between /= (n_halves - 1);
+    if (!(within > 0.)) {
+      return NaN;
+    }
+    const double n = halves[0].N();
+    return std::sqrt(((n - 1.) / n * within + between) / within);
+  }
+
+  /**
+   * Returns the statistics of the samples. The error of the mean takes into
+   * account the autocorrelation time, `tau_corr` is τ_int - 1/2 (as estimated
+   * by #Statistics) and `R` is the split R-hat.
+   */
+  Stats AllStats() const {
+    constexpr auto NaN = std::numeric_limits<double>::quiet_NaN();
+    NETKET_CHECK(n_ > 0, InvalidInputError, "no samples to compute statistics");
+
+    Complex mean = 0.;
+    double variance = 0.;
+    for (const auto& chain : chains_) {
+      const Complex chain_mean = chain.sum / double(n_);
+      mean += chain.shift + chain_mean;
+      // Σ |x_t|² is the lag-0 product
+      variance += chain.products(0).real() / double(n_) - std::norm(chain_mean);
+    }
+    int n_total_chains = n_chains_;
+    SumOnNodes(n_total_chains);
+    SumOnNodes(mean);
+    SumOnNodes(variance);
+    mean /= double(n_total_chains);
+    variance /= double(n_total_chains);
+
+    const double tau = TauInt();
+    const double r_hat = RHat();
+    if (std::isnan(tau)) {
+      return Stats{mean, NaN, variance, NaN, r_hat};
+    }
+    const double n_total = double(n_) * n_total_chains;
+    return Stats{mean, std::sqrt(variance * 2. * tau / n_total), variance,
+                 tau - 0.5, r_hat};
+  }
+
+ private:
+  static constexpr double kSokalWindow = 5.;
+
+  Index n_chains_;
+  Index max_lag_;
+  Index n_bins_;
+
+  Index n_;
+  Index bin_size_;
+  std::vector<Chain> chains_;
+
+  void MergeBins() {
+    for (auto& chain : chains_) {
+      for (Index i = 0; i < n_bins_ / 2; ++i) {
+        BinType merged = chain.bins[2 * i];
+        merged << chain.bins[2 * i + 1];
+        chain.bins[i] = merged;
+      }
+      for (Index i = n_bins_ / 2; i < n_bins_; ++i) {
+        chain.bins[i].Reset();
+      }
+      chain.full_bins = n_bins_ / 2;
+    }
+    bin_size_ *= 2;
+  }
+};
+
+}  // namespace netket
+
+#endif  // NETKET_ONLINE_STATISTICS_HPP
@@ -8,6 +8,7 @@
 
 #include "Stats/mc_stats.hpp"
 #include "Stats/obs_manager.hpp"
+#include "Stats/online_statistics.hpp"
 #include "Utils/exceptions.hpp"
 #include "common_types.hpp"
 
@@ -94,6 +95,71 @@ void AddStatsModule(py::module m) {
       .def("_asdict", as_dict)  //< compatibility with namedtuple
       .def("asdict", as_dict);
 
+  py::class_<OnlineStatistics>(
+      subm, "OnlineStatistics",
+      R"EOF(Online estimator of the statistics of an observable sampled by
+           several Markov chains. The samples are added as they are generated,
+           and the memory does not depend on their number.
+
+           It estimates the integrated autocorrelation time `tau_int` from the
+           autocorrelation function truncated at `max_lag`, with the automatic
+           window of Sokal, and the split R-hat `r_hat` from `n_bins` bins per
+           chain, which are merged pairwise when they are all full.
+
+           The estimates are computed over all MPI processes, hence they must
+           be requested on all of them.)EOF")
+      .def(py::init<Index, Index, Index>(), py::arg("n_chains"),
+           py::arg("max_lag") = 64, py::arg("n_bins") = 16)
+      .def("update",
+           [](OnlineStatistics& self,
+              py::array_t<Complex, py::array::c_style> values) {
+             switch (values.ndim()) {
+               case 2:
+                 self.UpdateSamples(Eigen::Map<const RowMatrix<Complex>>{
+                     values.data(), values.shape(0), values.shape(1)});
+                 break;
+               case 1:
+                 self.Update(Eigen::Map<const Eigen::VectorXcd>{
+                     values.data(), values.size()});
+                 break;
+               default:
+                 NETKET_CHECK(false, InvalidInputError,
+                              "values has wrong dimension: "
+                                  << values.ndim()
+                                  << "; expected either 1 or 2.");
+             }
+           },
+           py::arg("values"),
+           R"EOF(
+            Adds samples.
+
+            Args:
+                values: Either a vector of size `n_chains`, with one sample per
+                    chain, or an array of shape `(N, n_chains)`, with `N`
+                    samples per chain.
+          )EOF")
+      .def("reset", &OnlineStatistics::Reset, "Discards all the samples.")
+      .def_property_readonly("n_samples", &OnlineStatistics::N,
+                             "int: Number of samples in each chain.")
+      .def_property_readonly("n_chains", &OnlineStatistics::NChains)
+      .def_property_readonly("max_lag", &OnlineStatistics::MaxLag)
+      .def_property_readonly(
+          "autocorrelation", &OnlineStatistics::Autocorrelation,
+          R"EOF(numpy.ndarray: Normalized autocorrelation function, averaged
+               over the chains, for lags smaller than `max_lag`.)EOF")
+      .def_property_readonly(
+          "tau_int", &OnlineStatistics::TauInt,
+          R"EOF(float: Integrated autocorrelation time, which is 1/2 for
+               uncorrelated samples.)EOF")
+      .def_property_readonly("r_hat", &OnlineStatistics::RHat,
+                             "float: Split R-hat convergence diagnostic.")
+      .def("statistics", &OnlineStatistics::AllStats,
+           R"EOF(
+            Returns the `Stats` of the samples. The error of the mean takes the
+            autocorrelation time into account, `tau_corr` is `tau_int - 1/2`
+            and `R` is the split R-hat.
+          )EOF");
+
   subm.def("statistics",
            [](py::array_t<Complex, py::array::c_style> local_values) {
              switch (local_values.ndim()) {
@@ -128,6 +194,52 @@ void AddStatsModule(py::module m) {
                     number of samples in one Markov Chain and `M` is the number
                     of Markov Chains. Data should be in row major order.)EOF");
 
+  subm.def(
+      "statistics_and_gradient",
+      [](py::array_t<Complex, py::array::c_style> local_values,
+         py::array_t<Complex, py::array::c_style> der_logs,
+         Eigen::Ref<Eigen::VectorXcd> grad, bool center_der_logs) {
+        NETKET_CHECK(local_values.ndim() == 1 || local_values.ndim() == 2,
+                     InvalidInputError,
+                     "local_values has wrong dimension: "
+                         << local_values.ndim() << "; expected either 1 or 2.");
+        NETKET_CHECK(der_logs.ndim() == 2 || der_logs.ndim() == 3,
+                     InvalidInputError,
+                     "der_logs has wrong dimension: "
+                         << der_logs.ndim() << "; expected either 2 or 3.");
+        const Index n_chains =
+            local_values.ndim() == 2 ? local_values.shape(1) : 1;
+        const Index npar = der_logs.shape(der_logs.ndim() - 1);
+        return StatisticsAndGradient(
+            Eigen::Map<const Eigen::VectorXcd>{local_values.data(),
+                                               local_values.size()},
+            n_chains,
+            Eigen::Map<RowMatrix<Complex>>{der_logs.mutable_data(),
+                                           der_logs.size() / npar, npar},
+            grad, center_der_logs);
+      },
+      py::arg{"values"}.noconvert(), py::arg{"der_logs"}.noconvert(),
+      py::arg{"grad_out"}.noconvert(), py::arg{"center_der_logs"} = false,
+      R"EOF(Computes the statistics of the local estimators `values`, like
+            `statistics`, and the centered gradient
+                grad[i] = 𝔼[conj(v[i] - 𝔼[v[i]]) * (S - 𝔼[S])]
+            where V = (v[1], ..., v[m]) are the log-derivatives `der_logs`,
+            in a single pass over the samples and with a single MPI
+            reduction.
+
+            Args:
+                values: A rank-1 or rank-2 tensor of `complex128` local
+                    estimators, as in `statistics`.
+                der_logs: The log-derivatives of the samples, with shape
+                    `(N, M, m)` or `(N * M, m)`.
+                grad_out: Pre-allocated `complex128` vector of size `m` where
+                    the gradient is stored.
+                center_der_logs (bool=False): Whether `der_logs` should be
+                    centered in place, e.g. to pass it to `SR.compute_update`.
+
+            Returns:
+                The `Stats` of `values`.)EOF");
+
   subm.def(
       "covariance_sv",
       [](py::array_t<Complex, py::array::c_style> s_values,
@@ -21,10 +21,12 @@ class OnlineStat;
 template <class T>
 class Binning;
 class ObsManager;
+class OnlineStatistics;
 }  // namespace netket
 
 #include "binning.hpp"
 #include "obs_manager.hpp"
+#include "online_statistics.hpp"
 #include "onlinestat.hpp"
 
 #endif
@@ -24,6 +24,7 @@
 #include "messages.hpp"
 #include "next_variation.hpp"
 #include "parallel_utils.hpp"
+#include "profiler.hpp"
 #include "random_utils.hpp"
 #include "stopwatch.hpp"
 
@@ -0,0 +1,192 @@
+// Copyright 2019 The Simons Foundation, Inc. - All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//    http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#ifndef NETKET_PROFILER_HPP
+#define NETKET_PROFILER_HPP
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <map>
+#include <mutex>
+#include <string>
+#include <vector>
+
+#include "Utils/stopwatch.hpp"
+#include "common_types.hpp"
+
+namespace netket {
+
+/**
+ * Collects the wall times of named sections of the code (timers) and named
+ * counters, e.g. the number of configurations passed to the machine.
+ *
+ * The profiler is disabled by default, in which case #ProfileScope and
+ * NETKET_PROFILE_COUNT only check a flag. When tracing is enabled, every timed
+ * section is also stored as an event, to be exported in the Chrome trace
+ * format by `netket.profiling`.
+ *
+ * The names must be string literals, since the events only store a pointer to
+ * them. The data can be recorded from several threads, e.g. by a sampler
+ * running while the SR equations are solved.
+ */
+class Profiler {
+ public:
+  struct TimerStats {
+    Index count;
+    // In seconds
+    double total;
+    double min;
+    double max;
+  };
+
+  struct TraceEvent {
+    const char *name;
+    // In microseconds since the last reset
+    double start;
+    double duration;
+  };
+
+  bool Enabled() const noexcept { return enabled_; }
+  bool Tracing() const noexcept { return tracing_; }
+
+  void Enable(bool trace) {
+    enabled_ = true;
+    tracing_ = trace;
+  }
+
+  void Disable() {
+    enabled_ = false;
+    tracing_ = false;
+  }
+
+  /**
+   * Discards all the timers, counters and events, and restarts the clock.
+   */
+  void Reset() {
+    std::lock_guard<std::mutex> lock(mutex_);
+    timers_.clear();
+    counters_.clear();
+    events_.clear();
+    clock_.restart();
+  }
+
+  /**
+   * Microseconds elapsed since the last reset.
+   */
+  double Now() {
+    return clock_.elapsed<std::chrono::duration<double, std::micro>>().count();
+  }
+
+  /**
+   * Records a section which started at `start` and lasted `duration`
+   * microseconds.
+   */
+  void AddTime(const char *name, double start, double duration) {
+    const double seconds = duration * 1e-6;
+    std::lock_guard<std::mutex> lock(mutex_);
+    auto it = timers_.find(name);
+    if (it == timers_.end()) {
+      timers_.emplace(name, TimerStats{1, seconds, seconds, seconds});
+    } else {
+      auto &timer = it->second;
+      timer.count += 1;
+      timer.total += seconds;
+      timer.min = std::min(timer.min, seconds);
+      timer.max = std::max(timer.max, seconds);
+    }
+    if (tracing_) {
+      events_.push_back(TraceEvent{name, start, duration});
+    }
+  }
+
+  void Count(const char *name, Index value) {
+    std::lock_guard<std::mutex> lock(mutex_);
+    counters_[name] += value;
+  }
+
+  // The accessors return copies, which are consistent even if other threads
+  // are recording data
+  std::map<std::string, TimerStats> Timers() const {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return timers_;
+  }
+
+  std::map<std::string, Index> Counters() const {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return counters_;
+  }
+
+  std::vector<TraceEvent> Events() const {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return events_;
+  }
+
+ private:
+  std::atomic<bool> enabled_{false};
+  std::atomic<bool> tracing_{false};
+  Stopwatch clock_;
+  mutable std::mutex mutex_;
+
+  std::map<std::string, TimerStats> timers_;
+  std::map<std::string, Index> counters_;
+  std::vector<TraceEvent> events_;
+};
+
+Profiler &GetProfiler();
+
+/**
+ * Times the enclosing scope with the profiler, if it is enabled.
+ */
+class ProfileScope {
+ public:
+  explicit ProfileScope(const char *name)
+      : name_(GetProfiler().Enabled() ? name : nullptr) {
+    if (name_ != nullptr) {
+      start_ = GetProfiler().Now();
+    }
+  }
+
+  ~ProfileScope() {
+    if (name_ != nullptr) {
+      auto &profiler = GetProfiler();
+      profiler.AddTime(name_, start_, profiler.Now() - start_);
+    }
+  }
+
+  ProfileScope(const ProfileScope &) = delete;
+  ProfileScope &operator=(const ProfileScope &) = delete;
+
+ private:
+  const char *name_;
+  double start_ = 0.;
+};
+
+}  // namespace netket
+
+#define NETKET_PROFILE_CONCAT_IMPL(a, b) a##b
+#define NETKET_PROFILE_CONCAT(a, b) NETKET_PROFILE_CONCAT_IMPL(a, b)
+
+#define NETKET_PROFILE_SCOPE(name)                                    \
+  ::netket::ProfileScope NETKET_PROFILE_CONCAT(netket_profile_scope_, \
+                                               __LINE__)(name)
+
+#define NETKET_PROFILE_COUNT(name, value)             \
+  do {                                                \
+    if (::netket::GetProfiler().Enabled()) {          \
+      ::netket::GetProfiler().Count((name), (value)); \
+    }                                                 \
+  } while (false)
+
+#endif  // NETKET_PROFILER_HPP
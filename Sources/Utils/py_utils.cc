@@ -14,6 +14,8 @@
 
 #include "py_utils.hpp"
 
+#include <sstream>
+
 #include <pybind11/eigen.h>
 #include "Utils/all_utils.hpp"
 
@@ -38,6 +40,28 @@ void AddUtilsModule(py::module m) {
       py::arg("seed") = netket::default_random_engine::default_seed,
       R"EOF(seed: The chosen seed for the distributed random number generator.  )EOF");
 
+  subm.def(
+      "random_engine_state",
+      []() {
+        std::ostringstream state;
+        state << GetDistributedRandomEngine().Get();
+        return state.str();
+      },
+      R"EOF(Returns the state of the random engine of this MPI process as a string,
+      which can be restored with `set_random_engine_state`.)EOF");
+
+  subm.def(
+      "set_random_engine_state",
+      [](const std::string &state) {
+        std::istringstream input{state};
+        input >> GetDistributedRandomEngine().Get();
+        NETKET_CHECK(!input.fail(), InvalidInputError,
+                     "invalid state of the random engine");
+      },
+      py::arg("state"),
+      R"EOF(Restores the state of the random engine of this MPI process returned by
+      `random_engine_state`.)EOF");
+
   subm.def(
       "random_engine", []() { return; },
       R"EOF(seed: The random engine for the distributed random number generator.  )EOF");
@@ -83,6 +107,54 @@ void AddUtilsModule(py::module m) {
            },
            py::arg("input"), py::arg("output"));
 
+  subm.def(
+      "_profiler_enable",
+      [](bool trace) { GetProfiler().Enable(trace); }, py::arg("trace"),
+      R"EOF(Enables the profiler of the C++ code, optionally storing the events
+      of a trace.)EOF");
+
+  subm.def(
+      "_profiler_disable", []() { GetProfiler().Disable(); },
+      R"EOF(Disables the profiler of the C++ code.)EOF");
+
+  subm.def(
+      "_profiler_reset", []() { GetProfiler().Reset(); },
+      R"EOF(Discards the data of the profiler of the C++ code and restarts its
+      clock.)EOF");
+
+  subm.def(
+      "_profiler_now", []() { return GetProfiler().Now(); },
+      R"EOF(Microseconds elapsed on the clock of the profiler of the C++ code.)EOF");
+
+  subm.def(
+      "_profiler_data",
+      []() {
+        const auto &profiler = GetProfiler();
+        py::dict timers;
+        for (const auto &entry : profiler.Timers()) {
+          const auto &timer = entry.second;
+          timers[py::str(entry.first)] =
+              py::make_tuple(timer.count, timer.total, timer.min, timer.max);
+        }
+        py::dict counters;
+        for (const auto &entry : profiler.Counters()) {
+          counters[py::str(entry.first)] = entry.second;
+        }
+        py::list events;
+        for (const auto &event : profiler.Events()) {
+          events.append(
+              py::make_tuple(event.name, event.start, event.duration));
+        }
+        py::dict data;
+        data["timers"] = timers;
+        data["counters"] = counters;
+        data["events"] = events;
+        return data;
+      },
+      R"EOF(Returns the data of the profiler of the C++ code: the timers as
+      (count, total, min, max) tuples in seconds, the counters, and the events
+      of the trace as (name, start, duration) tuples in microseconds.)EOF");
+
   py::class_<MPIHelpers>(m, "MPI")
       .def_static("rank", &MPIHelpers::MPIRank,
                   R"EOF(int: The MPI rank for the current process.  )EOF")
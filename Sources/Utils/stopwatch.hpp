@@ -2,6 +2,7 @@
 #define NETKET_STOPWATCH_HPP
 
 #include <chrono>
+#include <iostream>
 
 namespace netket {
 
@@ -105,6 +105,67 @@ def test_vmc_iterator_iterative():
     assert last_obs["Energy"].mean == approx(-10.25, abs=0.2)
 
 
+def _setup_ising_vmc(**kwargs):
+    nk.utils.seed(SEED)
+    g = nk.graph.Hypercube(length=8, n_dim=1)
+    hi = nk.hilbert.Spin(s=0.5, graph=g)
+
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(sigma=0.01)
+
+    ha = nk.operator.Ising(hi, h=1.0)
+    sa = nk.sampler.MetropolisLocal(machine=ma)
+    op = nk.optimizer.Sgd(learning_rate=0.1)
+    sr = nk.optimizer.SR(diag_shift=0.01)
+
+    kwargs.setdefault("sr", sr)
+    return nk.Vmc(ha, sa, op, n_samples=500, **kwargs)
+
+
+def test_vmc_pipeline():
+    vmc = _setup_ising_vmc(pipeline=True, n_discard_fresh=5)
+
+    for step in vmc.iter(300):
+        pass
+
+    assert vmc.energy.mean == approx(-10.25, abs=0.2)
+
+
+def test_vmc_adaptive_discard():
+    vmc = _setup_ising_vmc(adaptive_discard=True)
+
+    for step in vmc.iter(300):
+        assert 0 < vmc.last_n_discard <= vmc.n_discard
+
+    assert vmc.energy.mean == approx(-10.25, abs=0.2)
+
+
+def test_vmc_chunk_size():
+    for sr in None, nk.optimizer.SR(diag_shift=0.01):
+        vmc1 = _setup_ising_vmc(sr=sr)
+        for step in vmc1.iter(10):
+            pass
+
+        vmc2 = _setup_ising_vmc(sr=sr, chunk_size=7)
+        for step in vmc2.iter(10):
+            pass
+
+        assert np.allclose(vmc1.machine.parameters, vmc2.machine.parameters)
+
+
+def test_vmc_streaming_sr():
+    vmc1 = _setup_ising_vmc()
+    for step in vmc1.iter(10):
+        pass
+
+    vmc2 = _setup_ising_vmc(streaming_sr=True, chunk_size=7)
+    assert not hasattr(vmc2, "_der_logs")
+    for step in vmc2.iter(10):
+        pass
+
+    assert np.allclose(vmc1.machine.parameters, vmc2.machine.parameters)
+
+
 def test_vmc_run():
     ma, vmc = _setup_vmc(n_samples=500, diag_shift=0.01)
 
@@ -131,11 +192,175 @@ def test_vmc_run():
             assert "Mean" in e
             assert "Sigma" in e
             assert "TauCorr" in e
+        assert obs["SR"]["Time"] >= 0
+        for phase in "Sampling", "LocalValues", "Gradient", "SR", "Observables":
+            assert obs["Timings"][phase] >= 0
+        # The update of each step is done after its output is logged
+        assert ("Update" in obs["Timings"]) == (step > 0)
         last_obs = obs
 
     assert last_obs["Energy"]["Mean"] == approx(-10.25, abs=0.2)
 
 
+def test_vmc_profiling():
+    ma, vmc = _setup_vmc(n_samples=100, diag_shift=0.01)
+
+    nk.profiling.reset()
+    nk.profiling.enable(trace=True)
+    try:
+        vmc.advance(3)
+    finally:
+        nk.profiling.disable()
+
+    summary = nk.profiling.summary()
+    for name in "log_val", "get_conn_flattened", "sampler.sweep", "sr.solve":
+        timer = summary["timers"][name]
+        assert timer["count"] > 0
+        assert timer["min"] <= timer["mean"] <= timer["max"]
+    counters = summary["counters"]
+    assert counters["log_val.batch_size"] >= summary["timers"]["log_val"]["count"]
+    assert counters["get_conn_flattened.connections"] > 0
+    assert 0 < counters["sampler.accepted"] <= counters["sampler.moves"]
+
+    steps = nk.profiling.step_summaries()
+    assert [s["step"] for s in steps] == [0, 1, 2]
+    assert sum(s["timers"]["sr.solve"]["count"] for s in steps) == (
+        summary["timers"]["sr.solve"]["count"]
+    )
+
+    tempdir = tempfile.mkdtemp()
+    prefix = tempdir + "/profile"
+    nk.profiling.export(prefix)
+    with open("{}.{}.trace.json".format(prefix, nk.MPI.rank())) as infile:
+        trace = json.load(infile)
+    with open("{}.{}.profile.json".format(prefix, nk.MPI.rank())) as infile:
+        profile = json.load(infile)
+    shutil.rmtree(tempdir)
+
+    names = {event["name"] for event in trace["traceEvents"]}
+    assert {"log_val", "sampler.sweep", "sr.solve", "step"} <= names
+    assert len(profile["steps"]) == 3
+
+    # Nothing is collected while the profiler is disabled
+    vmc.advance(1)
+    assert nk.profiling.summary() == summary
+    assert len(nk.profiling.step_summaries()) == 3
+
+
+def test_vmc_run_obs_schedule():
+    ma, vmc = _setup_vmc(n_samples=500, diag_shift=0.01)
+    hi = ma.hilbert
+    X = [[0, 1], [1, 0]]
+    sx = nk.operator.LocalOperator(hi, [X] * 8, [[i] for i in range(8)])
+    sx0 = nk.operator.LocalOperator(hi, X, [0])
+
+    tempdir = tempfile.mkdtemp()
+    prefix = tempdir + "/vmc_test"
+    vmc.run(20, out=prefix, obs={"SigmaX": sx, "SigmaX0": (sx0, 5)})
+
+    with open(prefix + ".log") as logfile:
+        output = json.load(logfile)["Output"]
+
+    shutil.rmtree(tempdir)
+
+    assert len(output) == 20
+    for obs in output:
+        assert "SigmaX" in obs
+        assert ("SigmaX0" in obs) == (obs["Iteration"] % 5 == 0)
+
+    # The observables estimated together have the same statistics as one at a time
+    stats = vmc.estimate({"SigmaX": sx, "SigmaX0": sx0})
+    assert stats["SigmaX"].mean == approx(vmc.estimate({"SigmaX": sx})["SigmaX"].mean)
+    assert stats["SigmaX0"].mean == approx(vmc.estimate({"X": sx0})["X"].mean)
+
+
+def test_observable_registry():
+    from netket.vmc_common import ObservableRegistry, tree_flatten, tree_unflatten
+
+    ma, vmc = _setup_vmc(n_samples=500, diag_shift=0.01)
+    hi = ma.hilbert
+    X = [[0, 1], [1, 0]]
+    sx = [nk.operator.LocalOperator(hi, X, [i]) for i in range(3)]
+
+    tree = {"SigmaX": sx, "Nested": {"SigmaX0": sx[0]}}
+    leaves, treedef = tree_flatten(tree)
+    assert len(leaves) == 4
+    assert tree_unflatten(treedef, range(4)) == {
+        "SigmaX": [0, 1, 2],
+        "Nested": {"SigmaX0": 3},
+    }
+
+    vmc.advance(1)
+    registry = ObservableRegistry({"SigmaX": sx, "Nested": ({"SigmaX0": sx[0]}, 2)})
+    assert len(registry) == 4
+
+    registry.estimate(vmc, 0)
+    data = registry.log_data()
+    assert len(data["SigmaX"]) == 3
+    assert data["Nested"]["SigmaX0"]["Mean"] == data["SigmaX"][0]["Mean"]
+    stats = vmc.estimate(sx[1])
+    assert data["SigmaX"][1]["Mean"] == approx(stats.mean.real)
+    assert data["SigmaX"][1]["Sigma"] == approx(stats.error_of_mean)
+    assert registry.records["Mean"][1] == data["SigmaX"][1]["Mean"]
+
+    registry.estimate(vmc, 1)
+    assert "Nested" not in registry.log_data()
+
+
+def test_vmc_run_ndjson_log():
+    ma, vmc = _setup_vmc(n_samples=500, diag_shift=0.01)
+
+    tempdir = tempfile.mkdtemp()
+    prefix = tempdir + "/vmc_test"
+    logger = nk.logging.NdjsonLog(
+        prefix, write_every=7, save_params_every=10, keep_params=2
+    )
+    vmc.run(50, out=logger)
+
+    checkpoints = logger.checkpointer.checkpoints
+    assert 1 <= len(checkpoints) <= 2
+    assert checkpoints[-1] == prefix + ".49.wf"
+    params = ma.parameters
+    ma.parameters = np.zeros_like(params)
+    logger.checkpointer.load(ma)
+    assert np.array_equal(ma.parameters, params)
+
+    reader = nk.logging.NdjsonReader(prefix)
+    assert len(reader) == 50
+    assert [obs["Iteration"] for obs in reader] == list(range(50))
+    energies = reader.column("Energy", "Mean")
+
+    reader.to_json(prefix + ".log")
+    with open(prefix + ".log") as logfile:
+        log = json.load(logfile)
+
+    shutil.rmtree(tempdir)
+
+    assert [obs["Energy"]["Mean"] for obs in log["Output"]] == energies
+
+
+def test_vmc_save_load_state():
+    ma1, vmc1 = _setup_vmc(n_samples=500, diag_shift=0.01)
+    vmc1.advance(3)
+
+    tempdir = tempfile.mkdtemp()
+    path = tempdir + "/vmc_test.state"
+    vmc1.save_state(path)
+    vmc1.advance(2)
+
+    # The resumed run continues exactly as the original one
+    ma2, vmc2 = _setup_vmc(n_samples=500, diag_shift=0.01)
+    vmc2.load_state(path)
+    assert vmc2.step_count == 3
+    vmc2.advance(2)
+
+    shutil.rmtree(tempdir)
+
+    assert vmc2.step_count == 5
+    assert np.array_equal(ma1.parameters, ma2.parameters)
+    assert vmc1.energy.mean == vmc2.energy.mean
+
+
 def test_imag_time_propagation():
     g = nk.graph.Hypercube(length=8, n_dim=1, pbc=True)
     hi = nk.hilbert.Spin(s=0.5, graph=g)
@@ -84,8 +84,14 @@ machines["RbmSpin 1d Hypercube spin"] = nk.machine.RbmSpin(hilbert=hi, alpha=2)
 
 machines["PyRbm 1d Hypercube spin"] = PyRbm(hilbert=hi, alpha=3)
 
+machines["CachedMachine RbmSpin 1d Hypercube spin"] = nk.machine.CachedMachine(
+    nk.machine.RbmSpin(hilbert=hi, alpha=1)
+)
+
 machines["RbmSpinSymm 1d Hypercube spin"] = nk.machine.RbmSpinSymm(hilbert=hi, alpha=2)
 
+machines["RbmSpinConv 1d Hypercube spin"] = nk.machine.RbmSpinConv(hilbert=hi, alpha=2)
+
 machines["Real RBM"] = nk.machine.RbmSpinReal(hilbert=hi, alpha=1)
 
 machines["Phase RBM"] = nk.machine.RbmSpinPhase(hilbert=hi, alpha=2)
@@ -342,6 +348,36 @@ def test_vector_jacobian():
         same_derivatives(vjp, num_der_log)
 
 
+def test_cached_machine():
+    hi = nk.hilbert.Spin(s=0.5, graph=g)
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(sigma=0.1)
+    cma = nk.machine.CachedMachine(ma, max_size=8)
+
+    rg = nk.utils.RandomEngine(seed=1234)
+    v = np.zeros((6, hi.size))
+    for i in range(3):
+        hi.random_vals(v[i], rg)
+    v[3:] = v[:3]
+
+    assert np.allclose(cma.log_val(v), ma.log_val(v))
+    assert np.allclose(cma.log_val(v), ma.log_val(v))
+    info = cma.cache_info()
+    assert info.misses <= 3 and info.hits + info.misses == 12
+    assert info.size == info.misses
+    assert cma.hit_rate == approx(info.hits / 12)
+
+    # Setting the parameters invalidates the table
+    cma.parameters = 0.1 * (np.random.randn(ma.n_par) + 1.0j * np.random.randn(ma.n_par))
+    assert cma.cache_info().size == 0
+    assert np.allclose(cma.log_val(v), ma.log_val(v))
+
+    for i in range(6):
+        hi.random_vals(v[i], rg)
+    cma.log_val(np.concatenate((v, -v)))
+    assert cma.cache_info().size <= 8
+
+
 def test_nvisible():
     for name, machine in machines.items():
         print("Machine test: %s" % name)
@@ -179,3 +179,26 @@ def test_Heisenberg():
         assert not hi.graph.is_bipartite
 
         ha = nk.operator.Heisenberg(hi, sign_rule=True)
+
+
+def test_local_values_many():
+    g = nk.graph.Hypercube(length=6, n_dim=1, pbc=True)
+    hi = nk.hilbert.Spin(s=0.5, graph=g)
+    ma = nk.machine.RbmSpin(hilbert=hi, alpha=1)
+    ma.init_random_parameters(seed=1234, sigma=0.2)
+
+    sz = [[1, 0], [0, -1]]
+    sx = [[0, 1], [1, 0]]
+    ops = [nk.operator.LocalOperator(hi, [sz, sz], [[0], [j]]) for j in range(1, 4)]
+    ops += [
+        nk.operator.Ising(h=1.321, hilbert=hi),
+        nk.operator.LocalOperator(hi, sx, [2]),
+    ]
+
+    sa = nk.sampler.MetropolisLocal(machine=ma, n_chains=8)
+    samples = np.array([np.array(sample) for sample in sa.samples(10)])
+
+    loc = nk.operator.local_values_many(ops, ma, samples)
+    assert loc.shape == (len(ops),) + samples.shape[:-1]
+    for k, op in enumerate(ops):
+        assert np.allclose(loc[k], nk.operator.local_values(op, ma, samples))
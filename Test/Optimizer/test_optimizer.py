@@ -0,0 +1,42 @@
+import netket as nk
+import numpy as np
+import pytest
+
+optimizers = {
+    "Sgd": lambda: nk.optimizer.Sgd(learning_rate=0.1, decay_factor=0.9),
+    "Momentum": lambda: nk.optimizer.Momentum(),
+    "AdaGrad": lambda: nk.optimizer.AdaGrad(),
+    "AdaDelta": lambda: nk.optimizer.AdaDelta(),
+    "AdaMax": lambda: nk.optimizer.AdaMax(),
+    "AmsGrad": lambda: nk.optimizer.AmsGrad(),
+    "RmsProp": lambda: nk.optimizer.RmsProp(),
+}
+
+
+@pytest.mark.parametrize("name", list(optimizers))
+def test_get_set_state(name):
+    np.random.seed(1234)
+    n_par = 5
+    grad = np.random.randn(n_par) + 1j * np.random.randn(n_par)
+
+    op1 = optimizers[name]()
+    op1.init(n_par, True)
+    params1 = np.random.randn(n_par) + 1j * np.random.randn(n_par)
+    for _ in range(3):
+        op1.update(grad, params1)
+
+    op2 = optimizers[name]()
+    op2.init(n_par, True)
+    op2.set_state(op1.get_state())
+    params2 = params1.copy()
+
+    op1.update(grad, params1)
+    op2.update(grad, params2)
+    assert np.array_equal(params1, params2)
+
+
+def test_set_state_wrong_size():
+    op = nk.optimizer.Momentum()
+    op.init(5, False)
+    with pytest.raises(ValueError):
+        op.set_state(np.zeros(3))
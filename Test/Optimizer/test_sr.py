@@ -1,5 +1,5 @@
 import netket as nk
-from netket.optimizer import SR
+from netket.optimizer import SR, SRAccumulator
 
 import numpy as np
 
@@ -19,15 +19,15 @@ def test_svd_threshold():
     Test SVD threshold option of BDCSVD
     """
     with pytest.raises(
-        ValueError, match="svd_threshold option only available for BDCSVD solver"
+        ValueError, match="svd_threshold option only available for BDCSVD and RandomizedSVD"
     ):
         SR(svd_threshold=1e-3)
     with pytest.raises(
-        ValueError, match="svd_threshold option only available for BDCSVD solver"
+        ValueError, match="svd_threshold option only available for BDCSVD and RandomizedSVD"
     ):
         SR(use_iterative=True, svd_threshold=1e-3)
     with pytest.raises(
-        ValueError, match="svd_threshold option only available for BDCSVD solver"
+        ValueError, match="svd_threshold option only available for BDCSVD and RandomizedSVD"
     ):
         SR(lsq_solver="LDLT", svd_threshold=1e-3)
 
@@ -51,3 +51,144 @@ def test_svd_threshold():
 
     sr = SR_with_threshold(1e-6)
     assert np.allclose(solve(sr, a, b), [1.0, 1e3, 1e6])
+
+
+def _check_same_update(lsq_solver, n_samples, n_par):
+    oks = np.random.randn(n_samples, n_par) + 1.0j * np.random.randn(n_samples, n_par)
+    oks -= oks.mean(axis=0)
+    grad = np.random.randn(n_par) + 1.0j * np.random.randn(n_par)
+
+    for is_holomorphic in True, False:
+        out_llt = np.empty(n_par, dtype=np.complex128)
+        SR(lsq_solver="LLT", is_holomorphic=is_holomorphic).compute_update(
+            oks, grad, out_llt
+        )
+
+        out = np.empty(n_par, dtype=np.complex128)
+        SR(lsq_solver=lsq_solver, is_holomorphic=is_holomorphic).compute_update(
+            oks, grad, out
+        )
+        assert np.allclose(out, out_llt)
+
+
+def test_sample_space_solver():
+    """
+    Test that solving SR in the space of the samples gives the same update
+    """
+    with pytest.raises(
+        ValueError, match="SampleSpace solver requires a positive diag_shift"
+    ):
+        SR(lsq_solver="SampleSpace", diag_shift=0)
+
+    _check_same_update("SampleSpace", n_samples=20, n_par=50)
+
+
+def test_distributed_solver():
+    """
+    Test the block-cyclic distributed Cholesky solver, with several blocks
+    """
+    _check_same_update("DistributedLLT", n_samples=100, n_par=150)
+
+
+def test_randomized_svd_solver():
+    """
+    Test the truncated pseudo-inverse computed by randomized range finding
+    """
+    with pytest.raises(ValueError, match="svd_rank must be positive"):
+        SR(lsq_solver="RandomizedSVD", svd_rank=0)
+
+    _check_same_update("RandomizedSVD", n_samples=20, n_par=50)
+
+    # A matrix of exact rank 3, perturbed by small noise
+    n_samples, n_par = 100, 40
+    oks = np.random.randn(n_samples, 3) @ np.random.randn(3, n_par)
+    oks = oks + 1e-4 * np.random.randn(n_samples, n_par)
+    oks = oks - oks.mean(axis=0)
+    grad = np.random.randn(n_par) + 0.0j
+
+    sr = SR(lsq_solver="RandomizedSVD", svd_rank=3, svd_oversampling=5)
+    assert sr.svd_rank == 3 and sr.svd_oversampling == 5
+    assert sr.last_truncation_error is None
+    sr.store_rank_enabled = True
+
+    out = np.empty(n_par, dtype=np.complex128)
+    sr.compute_update(oks.astype(np.complex128), grad, out)
+    assert sr.last_rank == 3
+    assert 0 <= sr.last_truncation_error < 1e-6
+
+    s = oks.T @ oks / n_samples
+    w, v = np.linalg.eigh(s)
+    v = v[:, -3:]
+    expected = v @ ((v.T @ grad) / (w[-3:] + 0.01))
+    assert np.allclose(out, expected)
+
+
+def test_accumulated_update():
+    """
+    Test that accumulating S and the gradient block by block gives the same update
+    """
+    n_samples, n_par = 53, 12
+    der_logs = 3.0 + np.random.randn(n_samples, n_par) + 1.0j * np.random.randn(
+        n_samples, n_par
+    )
+    eloc = np.random.randn(n_samples) + 1.0j * np.random.randn(n_samples)
+    eloc -= eloc.mean()
+
+    oks = der_logs - der_logs.mean(axis=0)
+    grad = oks.conj().T @ eloc / n_samples
+
+    acc = SRAccumulator(n_par)
+    for start in range(0, n_samples, 10):
+        acc.update(der_logs[start : start + 10], eloc[start : start + 10])
+    assert acc.n_samples == n_samples and not acc.finalized
+
+    for is_holomorphic in True, False:
+        out_full = np.empty(n_par, dtype=np.complex128)
+        SR(is_holomorphic=is_holomorphic).compute_update(oks, grad, out_full)
+
+        out = np.empty(n_par, dtype=np.complex128)
+        SR(is_holomorphic=is_holomorphic).compute_update(acc, out)
+        assert np.allclose(out, out_full)
+
+    assert acc.finalized
+    assert np.allclose(acc.covariance_matrix, oks.conj().T @ oks / n_samples)
+    assert np.allclose(acc.gradient, grad)
+
+    with pytest.raises(ValueError, match="not supported by the SampleSpace solver"):
+        SR(lsq_solver="SampleSpace").compute_update(acc, out)
+
+
+def test_iterative_warm_start():
+    """
+    Test the preconditioned iterative solver and its diagnostics
+    """
+    with pytest.raises(ValueError, match="Invalid preconditioner"):
+        SR(use_iterative=True, preconditioner="Foo")
+
+    n_samples, n_par = 200, 30
+    scale = np.exp(2.0 * np.random.randn(n_par))
+    oks = np.random.randn(n_samples, n_par) + 1.0j * np.random.randn(n_samples, n_par)
+    oks *= scale
+    oks -= oks.mean(axis=0)
+    grad = np.random.randn(n_par) + 1.0j * np.random.randn(n_par)
+
+    out_llt = np.empty(n_par, dtype=np.complex128)
+    sr = SR(lsq_solver="LLT")
+    sr.compute_update(oks, grad, out_llt)
+    assert sr.last_iterations is None
+    assert sr.last_solve_time >= 0
+
+    sr = SR(use_iterative=True, preconditioner="Jacobi", warm_start=True)
+    assert sr.preconditioner == "Jacobi" and sr.warm_start_enabled
+    assert sr.last_solve_time is None
+
+    out = np.empty(n_par, dtype=np.complex128)
+    sr.compute_update(oks, grad, out)
+    assert np.linalg.norm(out - out_llt) < 1e-2 * np.linalg.norm(out_llt)
+    n_iter = sr.last_iterations
+    assert n_iter > 0 and sr.last_residual <= 1e-3
+
+    # Starting from the previous solution, the same system needs fewer iterations
+    sr.compute_update(oks, grad, out)
+    assert np.linalg.norm(out - out_llt) < 1e-2 * np.linalg.norm(out_llt)
+    assert sr.last_iterations < n_iter
@@ -37,6 +37,12 @@ sa = nk.sampler.MetropolisLocal(
     machine=maz, sweep_size=hi.size + 1, n_chains=2)
 samplers["MetropolisLocal RbmSpin ZeroPars"] = sa
 
+# Sampling in single precision
+mas = nk.machine.PyRbm(hilbert=hi, alpha=1, dtype=np.complex64)
+mas.parameters = 0.2 * (np.random.randn(mas.n_par) + 1.0j * np.random.randn(mas.n_par))
+sa = nk.sampler.MetropolisLocal(machine=mas, n_chains=16, dtype=np.complex64)
+samplers["MetropolisLocal PyRbm complex64"] = sa
+
 mas = nk.machine.RbmSpinSymm(hilbert=hi, alpha=1)
 mas.init_random_parameters(sigma=0.2)
 sa = nk.sampler.MetropolisHamiltonianPt(
@@ -60,3 +60,89 @@ def test_stats_mean_std():
 
     for bs in (1, 2, 16, 32):
         _test_stats_mean_std(hi, ham, ma, bs)
+
+
+def test_statistics_and_gradient():
+    n_samples, n_chains, n_par = 100, 4, 7
+    eloc = 10.0 + np.random.randn(n_samples, n_chains) + 1.0j * np.random.randn(
+        n_samples, n_chains
+    )
+    der_logs = 2.0 + np.random.randn(
+        n_samples, n_chains, n_par
+    ) + 1.0j * np.random.randn(n_samples, n_chains, n_par)
+    der_logs_copy = der_logs.copy()
+
+    grad = np.empty(n_par, dtype=np.complex128)
+    stats = nk.stats.statistics_and_gradient(eloc, der_logs, grad)
+    expected = statistics(eloc)
+    assert stats.mean == pytest.approx(expected.mean)
+    assert stats.error_of_mean == pytest.approx(expected.error_of_mean)
+    assert stats.variance == pytest.approx(expected.variance)
+    assert stats.R == pytest.approx(expected.R)
+    assert np.allclose(grad, nk.stats.covariance_sv(eloc, der_logs))
+    assert np.array_equal(der_logs, der_logs_copy)
+
+    nk.stats.statistics_and_gradient(
+        eloc, der_logs.reshape(-1, n_par), grad, center_der_logs=True
+    )
+    assert np.allclose(der_logs, der_logs_copy - der_logs_copy.mean(axis=(0, 1)))
+
+
+def test_mean_async():
+    a = np.random.randn(10, 3) + 1.0j * np.random.randn(10, 3)
+
+    future = nk.stats.mean_async(a, axis=0)
+    assert np.allclose(future.result(), nk.stats.mean(a, axis=0))
+    assert future.done()
+
+    out = np.empty(3, dtype=np.complex128)
+    assert nk.stats.mean_async(a, axis=0, out=out).result() is out
+
+    assert nk.stats.mean_async(a.real).result() == pytest.approx(a.real.mean())
+
+
+def test_mean_batched():
+    arrays = [np.random.randn(10, 3), np.random.randn(7) + 1.0j, np.arange(5)]
+
+    means = nk.stats.mean_batched(arrays)
+    for m, a in zip(means, arrays):
+        assert m == pytest.approx(nk.stats.mean(a))
+    assert not np.iscomplexobj(means[0])
+
+    means = nk.stats.mean_batched(arrays[:2], axis=0, blocking=False).result()
+    assert np.allclose(means[0], nk.stats.mean(arrays[0], axis=0))
+    assert np.allclose(means[1], nk.stats.mean(arrays[1], axis=0))
+
+
+def test_online_statistics():
+    n_samples, n_chains, phi = 4000, 4, 0.8
+    # Autoregressive process with tau_int = (1 + phi) / (2 (1 - phi))
+    x = np.zeros((n_samples, n_chains))
+    noise = np.random.randn(n_samples, n_chains)
+    for i in range(1, n_samples):
+        x[i] = phi * x[i - 1] + noise[i]
+    values = (x + 5.0).astype(np.complex128)
+
+    online = nk.stats.OnlineStatistics(n_chains, max_lag=64)
+    online.update(values[:100])
+    for row in values[100:]:
+        online.update(row)
+    assert online.n_samples == n_samples
+
+    stats = online.statistics()
+    expected = statistics(values)
+    assert stats.mean == pytest.approx(expected.mean)
+    assert stats.variance == pytest.approx(expected.variance)
+
+    centered = x - x.mean(axis=0)
+    acf_3 = (centered[:-3] * centered[3:]).mean() / (centered ** 2).mean()
+    assert online.autocorrelation[3] == pytest.approx(acf_3)
+
+    assert online.tau_int == pytest.approx((1 + phi) / (2 * (1 - phi)), rel=0.3)
+    assert stats.tau_corr == pytest.approx(online.tau_int - 0.5)
+    assert online.r_hat == pytest.approx(1.0, abs=0.05)
+
+    # Chains sampling different distributions are detected
+    online.reset()
+    online.update(values + np.arange(n_chains))
+    assert online.r_hat > 1.1
@@ -22,6 +22,7 @@ __all__ = [
     "operator",
     "optimizer",
     "output",
+    "profiling",
     "random",
     "sampler",
     "stats",
@@ -42,6 +43,7 @@ from . import (
     operator,
     optimizer,
     output,
+    profiling,
     random,
     sampler,
     stats,
@@ -13,6 +13,7 @@ from netket.stats import (
     covariance_sv as _covariance_sv,
     subtract_mean as _subtract_mean,
     mean as _mean,
+    mean_async as _mean_async,
 )
 
 from netket.vmc_common import info
@@ -189,7 +190,8 @@ class Qsr(AbstractVariationalDriver):
             for i, sample in enumerate(self._samples):
                 self._der_logs[i] = self._machine.der_log(sample)
 
-            grad_neg = _mean(self._der_logs.reshape(-1, self._npar), axis=0).conjugate()
+            # The reduction over the nodes overlaps with the positive phase
+            grad_neg = _mean_async(self._der_logs.reshape(-1, self._npar), axis=0)
 
             # Positive phase driven by the data
             for x, b_x, grad_x in zip(
@@ -199,7 +201,7 @@ class Qsr(AbstractVariationalDriver):
 
             grad_pos = _mean(self._data_grads, axis=0)
 
-            grad = 2.0 * (grad_neg - grad_pos)
+            grad = 2.0 * (grad_neg.result().conjugate() - grad_pos)
 
             dp = _np.empty(self._npar, dtype=_np.complex128)
 
@@ -214,7 +216,8 @@ class Qsr(AbstractVariationalDriver):
             for x, grad_x in zip(self._samples, self._grads):
                 self._machine.vector_jacobian_prod(x, vec_ones, grad_x)
 
-            grad_neg = _mean(self._grads, axis=0)
+            # The reduction over the nodes overlaps with the positive phase
+            grad_neg = _mean_async(self._grads, axis=0)
 
             # Positive phase driven by the data
             for x, b_x, grad_x in zip(
@@ -224,7 +227,7 @@ class Qsr(AbstractVariationalDriver):
 
             grad_pos = _mean(self._data_grads, axis=0)
 
-            dp = 2.0 * (grad_neg - grad_pos)
+            dp = 2.0 * (grad_neg.result() - grad_pos)
 
         return dp
 
@@ -1,12 +1,16 @@
 import sys
+from concurrent.futures import Future as _Future
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
 
 import numpy as _np
 
 import netket as _nk
 from netket._core import deprecated
 from .operator import local_values as _local_values
+from .operator import local_values_many as _local_values_many
 from netket.stats import (
     statistics as _statistics,
+    statistics_and_gradient as _statistics_and_gradient,
     mean as _mean,
 )
 
@@ -20,7 +24,18 @@ class Vmc(AbstractVariationalDriver):
     """
 
     def __init__(
-        self, hamiltonian, sampler, optimizer, n_samples, n_discard=None, sr=None
+        self,
+        hamiltonian,
+        sampler,
+        optimizer,
+        n_samples,
+        n_discard=None,
+        sr=None,
+        pipeline=False,
+        n_discard_fresh=0,
+        adaptive_discard=False,
+        chunk_size=None,
+        streaming_sr=False,
     ):
         """
         Initializes the driver class.
@@ -39,6 +54,31 @@ class Vmc(AbstractVariationalDriver):
             sr (SR, optional): Determines whether and how stochastic reconfiguration
                 is applied to the bare energy gradient before performing applying
                 the optimizer. If this parameter is not passed or None, SR is not used.
+            pipeline (bool, optional): If True and SR is used, the burn-in of the
+                Markov chains for the next step is performed in a background thread
+                while the SR update is computed. The discarded sweeps are thus
+                generated with parameters which are one update stale. Defaults to False.
+            n_discard_fresh (int, optional): When `pipeline` is True, number of sweeps
+                discarded after the update, with the new parameters, before the
+                samples are stored. Increase it to reduce the bias coming from the
+                stale burn-in. Defaults to 0.
+            adaptive_discard (bool, optional): If True, `n_discard` is only the maximum
+                number of sweeps discarded at each step. The chains, which are kept
+                across steps, are thermalized in blocks of `n_discard // 20` sweeps
+                until the average of log|Ψ| over the chains changes between two blocks
+                by less than its standard error. Defaults to False.
+            chunk_size (int, optional): The samples of all the chains are evaluated
+                together with a single batched call to `local_values`, `der_log` or
+                `vector_jacobian_prod`. If given, this is the maximum number of samples
+                per call, which bounds the memory used by the intermediate results.
+                Defaults to None, meaning that all the samples of a node are processed
+                at once.
+            streaming_sr (bool, optional): If True and SR is used, the log-derivatives
+                are consumed chunk by chunk by an `SRAccumulator`, which builds the
+                S matrix and the gradient in place, instead of being stored for all
+                the samples. The memory is then O(n_par²), independent of the number
+                of samples. Only the LLT, LDLT, ColPivHouseholder and BDCSVD solvers
+                are supported. Defaults to False.
 
         Example:
             Optimizing a 1D wavefunction with Variational Monte Carlo.
@@ -69,9 +109,32 @@ class Vmc(AbstractVariationalDriver):
 
         self._batch_size = sampler.sample_shape[0]
 
+        self._sr_accumulator = (
+            _nk.optimizer.SRAccumulator(self._npar)
+            if streaming_sr and sr is not None
+            else None
+        )
+
         self.n_samples = n_samples
         self.n_discard = n_discard
 
+        if n_discard_fresh < 0:
+            raise ValueError(
+                "Invalid number of discarded samples: n_discard_fresh={}".format(
+                    n_discard_fresh
+                )
+            )
+        self._n_discard_fresh = n_discard_fresh
+        self._adaptive_discard = adaptive_discard
+        self._last_n_discard = 0
+        self._pipeline = pipeline and sr is not None
+        self._executor = _ThreadPoolExecutor(max_workers=1) if self._pipeline else None
+        self._burn_in = None
+
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("Invalid chunk size: chunk_size={}".format(chunk_size))
+        self._chunk_size = chunk_size
+
     @property
     def n_samples(self):
         return self._n_samples
@@ -90,13 +153,12 @@ class Vmc(AbstractVariationalDriver):
             (self._n_samples_node, self._batch_size, self._ham.hilbert.size)
         )
 
-        self._der_logs = _np.ndarray(
-            (self._n_samples_node, self._batch_size, self._npar), dtype=_np.complex128
-        )
-
-        self._grads = _np.empty(
-            (self._n_samples_node, self._machine.n_par), dtype=_np.complex128
-        )
+        # The log-derivatives are not stored when they are accumulated
+        if self._sr_accumulator is None:
+            self._der_logs = _np.ndarray(
+                (self._n_samples_node, self._batch_size, self._npar),
+                dtype=_np.complex128,
+            )
 
     @property
     def n_discard(self):
@@ -122,60 +184,158 @@ class Vmc(AbstractVariationalDriver):
             n_steps (int): Number of steps to perform.
         """
 
-        self._sampler.reset()
+        with self._timed("Sampling"):
+            if self._burn_in is None:
+                self._burn_in_chains()
+            else:
+                # The chains were thermalized while the previous update was computed
+                self._wait_burn_in()
+                for _ in self._sampler.samples(self._n_discard_fresh):
+                    pass
 
-        # Burnout phase
-        for _ in self._sampler.samples(self._n_discard):
-            pass
+            # Generate samples and store them
+            for i, sample in enumerate(self._sampler.samples(self._n_samples_node)):
+                self._samples[i] = sample
 
-        # Generate samples and store them
-        for i, sample in enumerate(self._sampler.samples(self._n_samples_node)):
-            self._samples[i] = sample
+        # Perform update
+        if self._sr and self._sr_accumulator is not None:
+            with self._timed("LocalValues"):
+                # Compute the local energy estimator and average Energy
+                eloc, self._loss_stats = self._get_mc_stats(self._ham)
 
-        # Compute the local energy estimator and average Energy
-        eloc, self._loss_stats = self._get_mc_stats(self._ham)
+            # Center the local energy, the mean is already reduced over the nodes
+            eloc -= self._loss_stats.mean
 
-        # Perform update
-        if self._sr:
-            # When using the SR (Natural gradient) we need to have the full jacobian
-            # Computes the jacobian
-            for i, sample in enumerate(self._samples):
-                self._der_logs[i] = self._machine.der_log(sample)
+            samples = self._samples.reshape(-1, self._samples.shape[-1])
+            eloc = eloc.reshape(-1)
+
+            with self._timed("Gradient"):
+                # The jacobian is consumed chunk by chunk, it is never stored
+                self._sr_accumulator.reset()
+                for s in self._chunks(samples.shape[0]):
+                    self._sr_accumulator.update(
+                        self._machine.der_log(samples[s]), eloc[s]
+                    )
 
+            dp = _np.empty(self._npar, dtype=_np.complex128)
+
+            if self._pipeline:
+                self._burn_in = self._executor.submit(self._burn_in_chains)
+
+            with self._timed("SR"):
+                try:
+                    self._sr.compute_update(self._sr_accumulator, dp)
+                finally:
+                    if self._burn_in is not None:
+                        self._burn_in.result()
+        elif self._sr:
+            # When using the SR (Natural gradient) we need to have the full jacobian
             # flatten MC chain dimensions:
             self._der_logs = self._der_logs.reshape(-1, self._npar)
 
-            # Center the local energy
-            eloc -= _mean(eloc)
+            with self._timed("LocalValues"):
+                # Computes the local energy estimator
+                eloc = self._local_values(self._ham)
 
-            # Center the log derivatives
-            self._der_logs -= _mean(self._der_logs, axis=0)
+            with self._timed("Gradient"):
+                # Computes the jacobian
+                samples = self._samples.reshape(-1, self._samples.shape[-1])
+                for s in self._chunks(samples.shape[0]):
+                    self._der_logs[s] = self._machine.der_log(samples[s])
 
-            # Compute the gradient
-            self._grads = _np.conjugate(self._der_logs) * eloc.reshape(-1, 1)
-
-            grad = _mean(self._grads, axis=0)
+                # Computes the average Energy and the gradient, and centers the log
+                # derivatives, in a single pass and with a single MPI reduction
+                grad = _np.empty(self._npar, dtype=_np.complex128)
+                self._loss_stats = _statistics_and_gradient(
+                    eloc, self._der_logs, grad, center_der_logs=True
+                )
 
             dp = _np.empty(self._npar, dtype=_np.complex128)
 
-            self._sr.compute_update(self._der_logs, grad, dp)
+            # The machine is not used by SR, hence the sampler can start
+            # the burn-in for the next step in the meantime
+            if self._pipeline:
+                self._burn_in = self._executor.submit(self._burn_in_chains)
+
+            with self._timed("SR"):
+                try:
+                    self._sr.compute_update(self._der_logs, grad, dp)
+                finally:
+                    # Parameters must not change while the chains are moving
+                    if self._burn_in is not None:
+                        self._burn_in.result()
 
             self._der_logs = self._der_logs.reshape(
                 self._n_samples_node, self._batch_size, self._npar
             )
         else:
+            with self._timed("LocalValues"):
+                # Compute the local energy estimator and average Energy
+                eloc, self._loss_stats = self._get_mc_stats(self._ham)
+
             # Computing updates using the simple gradient
             # Center the local energy
-            eloc -= _mean(eloc)
+            eloc -= self._loss_stats.mean
 
-            for x, eloc_x, grad_x in zip(self._samples, eloc, self._grads):
-                self._machine.vector_jacobian_prod(x, eloc_x, grad_x)
+            samples = self._samples.reshape(-1, self._samples.shape[-1])
+            eloc = eloc.reshape(-1)
 
-            grad = _mean(self._grads, axis=0) / float(self._batch_size)
+            with self._timed("Gradient"):
+                grad = _np.zeros((1, self._npar), dtype=_np.complex128)
+                grad_s = _np.empty(self._npar, dtype=_np.complex128)
+                for s in self._chunks(samples.shape[0]):
+                    self._machine.vector_jacobian_prod(samples[s], eloc[s], grad_s)
+                    grad += grad_s
+
+                grad = _mean(grad, axis=0) / float(samples.shape[0])
             dp = grad
 
         return dp
 
+    def _burn_in_chains(self):
+        # The chains are not re-initialized, only their stored log-values are
+        # recomputed with the current parameters
+        self._sampler.reset()
+
+        if not self._adaptive_discard:
+            # Burnout phase
+            for _ in self._sampler.samples(self._n_discard):
+                pass
+            self._last_n_discard = self._n_discard
+            return
+
+        # Adaptive burnout phase. The decision is taken independently on each
+        # node, since sampling does not need any communication.
+        block_size = max(1, self._n_discard // 20)
+        n_discarded = 0
+        last_mean = None
+        while n_discarded < self._n_discard:
+            n_block = min(block_size, self._n_discard - n_discarded)
+            for sample in self._sampler.samples(n_block):
+                pass
+            n_discarded += n_block
+
+            log_psi = self._machine.log_val(sample).real
+            mean = log_psi.mean()
+            error = log_psi.std() / _np.sqrt(log_psi.size)
+            if last_mean is not None and abs(mean - last_mean) <= error:
+                break
+            last_mean = mean
+
+        self._last_n_discard = n_discarded
+
+    @property
+    def last_n_discard(self):
+        """
+        The number of sweeps discarded in the last burn-in phase.
+        """
+        return self._last_n_discard
+
+    def _wait_burn_in(self):
+        burn_in, self._burn_in = self._burn_in, None
+        if burn_in is not None:
+            burn_in.result()
+
     @property
     def energy(self):
         """
@@ -184,18 +344,66 @@ class Vmc(AbstractVariationalDriver):
         """
         return self._loss_stats
 
+    def _log_additional_data(self, log_data, step):
+        # Diagnostics of the SR solver during the last update
+        if self._sr is not None and self._sr.last_solve_time is not None:
+            sr_data = {"Time": self._sr.last_solve_time}
+            if self._sr.last_iterations is not None:
+                sr_data["Iterations"] = self._sr.last_iterations
+                sr_data["Residual"] = self._sr.last_residual
+            if self._sr.last_truncation_error is not None:
+                sr_data["TruncationError"] = self._sr.last_truncation_error
+            log_data["SR"] = sr_data
+
+    def _local_state(self):
+        burned_in = self._burn_in is not None
+        if burned_in:
+            # The chains must not move while they are saved
+            self._burn_in.result()
+        return {"sampler": self._sampler.get_state(), "burned_in": burned_in}
+
+    def _set_local_state(self, state):
+        self._wait_burn_in()
+        self._sampler.set_state(state["sampler"])
+        if state["burned_in"]:
+            # The chains were already thermalized for the next step
+            self._burn_in = _Future()
+            self._burn_in.set_result(None)
+
     def _estimate_stats(self, obs):
         return self._get_mc_stats(obs)[1]
 
+    def _estimate_stats_many(self, observables):
+        # All the observables are estimated in a single pass over the samples,
+        # which evaluates the machine only once for each chunk
+        samples = self._samples.reshape(-1, self._samples.shape[-1])
+        loc = _np.empty((len(observables), samples.shape[0]), dtype=_np.complex128)
+        for s in self._chunks(samples.shape[0]):
+            _local_values_many(observables, self._machine, samples[s], out=loc[:, s])
+
+        shape = self._samples.shape[0:2]
+        return [_statistics(loc_op.reshape(shape)) for loc_op in loc]
+
     def reset(self):
+        self._wait_burn_in()
         self._sampler.reset()
         super().reset()
 
-    def _get_mc_stats(self, op):
-        loc = _np.empty(self._samples.shape[0:2], dtype=_np.complex128)
-        for i, sample in enumerate(self._samples):
-            _local_values(op, self._machine, sample, out=loc[i])
+    def _chunks(self, n):
+        chunk_size = n if self._chunk_size is None else self._chunk_size
+        for start in range(0, n, chunk_size):
+            yield slice(start, min(start + chunk_size, n))
+
+    def _local_values(self, op):
+        samples = self._samples.reshape(-1, self._samples.shape[-1])
+        loc = _np.empty(samples.shape[0], dtype=_np.complex128)
+        for s in self._chunks(samples.shape[0]):
+            _local_values(op, self._machine, samples[s], out=loc[s])
 
+        return loc.reshape(self._samples.shape[0:2])
+
+    def _get_mc_stats(self, op):
+        loc = self._local_values(op)
         return loc, _statistics(loc)
 
     def __repr__(self):
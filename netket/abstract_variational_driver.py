@@ -1,11 +1,24 @@
 import abc
+import pickle as _pickle
+import time as _time
+from contextlib import contextmanager as _contextmanager
+
+from mpi4py import MPI as _MPI
 
 from netket._core import deprecated, warn_deprecation
 import netket as _nk
+from netket import profiling as _profiling
+from netket import random as _random
 
 from netket.logging import JsonLog as _JsonLog
+from netket.logging._checkpoint import _atomic_write
 
-from netket.vmc_common import make_optimizer_fn, tree_map
+from netket.vmc_common import (
+    make_optimizer_fn,
+    tree_flatten,
+    tree_unflatten,
+    ObservableRegistry,
+)
 
 from tqdm import tqdm
 
@@ -26,8 +39,18 @@ def _obs_stat_to_dict(value):
 #   maximising some loss function, this quantity should be assigned to self._stats
 #   in order to monitor it.
 # - _estimate_stats should return the MC estimate of a single operator
+# - _estimate_stats_many can optionally be overridden to estimate several operators
+#   at once (e.g. in a single pass over the samples).
 # - reset should reset the driver (usually the sampler).
 # - info should return a string with an overview of the driver.
+# - _log_additional_data can optionally be overridden to add driver-specific data
+#   (e.g. diagnostics of the solver) to the output logged at every step.
+# - The phases of a step can be timed with `with self._timed(name):`, and their
+#   wall times are logged at every step in the "Timings" entry. The finer-grained
+#   quantities instrumented by `netket.profiling` are summarized at every step.
+# - _local_state and _set_local_state can optionally be overridden to save and
+#   restore with save_state/load_state the state of each MPI process (e.g. the
+#   Markov chains of the sampler).
 # - The __init__ method shouldbe called with the machine and the optimizer. If this
 #   driver is minimising a loss function and you want it's name to show up automatically
 #   in the progress bar/ouput files you should pass the optional keyword argument
@@ -41,8 +64,10 @@ class AbstractVariationalDriver(abc.ABC):
         self._loss_stats = None
         self._loss_name = minimized_quantity_name
         self.step_count = 0
+        self._timings = {}
 
         self._machine = machine
+        self._optimizer = optimizer
         self._optimizer_step, self._optimizer_desc = make_optimizer_fn(
             optimizer, self._machine
         )
@@ -86,6 +111,16 @@ class AbstractVariationalDriver(abc.ABC):
         """
         pass
 
+    def _estimate_stats_many(self, observables):
+        """
+        Returns the MCMC statistics for the expectation values of a list of
+        observables. By default, they are estimated one at a time.
+
+        :param observables: A list of quantum operators (netket observables)
+        :return: A list with the statistics of each operator.
+        """
+        return [self._estimate_stats(op) for op in observables]
+
     @abc.abstractmethod
     def reset(self):
         """
@@ -96,6 +131,120 @@ class AbstractVariationalDriver(abc.ABC):
         self.step_count = 0
         pass
 
+    @_contextmanager
+    def _timed(self, phase):
+        """
+        Context manager measuring the wall time of a phase of the step, which is
+        logged by `run`.
+        """
+        start = _time.perf_counter()
+        try:
+            yield
+        finally:
+            self._timings[phase] = _time.perf_counter() - start
+
+    def _log_additional_data(self, log_data, step):
+        """
+        Adds driver-specific entries to the dictionary `log_data`, which is
+        logged at the given step of `run`. Does nothing by default.
+        """
+        pass
+
+    def _local_state(self):
+        """
+        Returns a dictionary with the driver-specific state of this MPI process,
+        which is saved by `save_state`. It is empty by default.
+        """
+        return {}
+
+    def _set_local_state(self, state):
+        """
+        Restores the state of this MPI process returned by `_local_state`.
+        """
+        pass
+
+    def save_state(self, path):
+        """
+        Saves the full state of the driver to the binary file `path`, so that the
+        optimization can be resumed with `load_state` exactly where it stopped.
+        It contains the step count, the parameters of the machine, the internal
+        state of the optimizer and, for every MPI process, the state of the random
+        number generators and of the sampler.
+
+        This must be called by all the MPI processes. The file is written by the
+        root process, and replaced atomically.
+
+        Args:
+            path: the path of the file.
+        """
+        local_state = {
+            "random": _random.get_state(),
+            "random_engine": _nk.utils.random_engine_state(),
+        }
+        local_state.update(self._local_state())
+        local_states = _MPI.COMM_WORLD.gather(local_state, root=0)
+
+        if self._mynode == 0:
+            state = {
+                "n_nodes": len(local_states),
+                "step_count": self.step_count,
+                "parameters": self._machine.parameters,
+                "optimizer": self._get_optimizer_state(),
+                "local": local_states,
+            }
+            _atomic_write(
+                path,
+                lambda outfile: _pickle.dump(state, outfile, _pickle.HIGHEST_PROTOCOL),
+            )
+
+        _MPI.COMM_WORLD.barrier()
+
+    def load_state(self, path):
+        """
+        Restores the state of the driver saved by `save_state`. The driver must have
+        been constructed with the same machine, optimizer and sampler, and run with
+        the same number of MPI processes.
+
+        This must be called by all the MPI processes.
+
+        Args:
+            path: the path of the file.
+        """
+        comm = _MPI.COMM_WORLD
+        state, local_states = None, None
+        if self._mynode == 0:
+            with open(path, "rb") as infile:
+                state = _pickle.load(infile)
+            local_states = state.pop("local")
+        state = comm.bcast(state, root=0)
+
+        if state["n_nodes"] != comm.Get_size():
+            raise ValueError(
+                "The state was saved with {} MPI processes, but {} are running.".format(
+                    state["n_nodes"], comm.Get_size()
+                )
+            )
+        local_state = comm.scatter(local_states, root=0)
+
+        self.step_count = state["step_count"]
+        self._machine.parameters = state["parameters"]
+        self._set_optimizer_state(state["optimizer"])
+
+        _random.set_state(local_state["random"])
+        _nk.utils.set_random_engine_state(local_state["random_engine"])
+        self._set_local_state(local_state)
+
+    def _get_optimizer_state(self):
+        # Only NetKet optimizers have an internal state, the others are
+        # stateless functions
+        if isinstance(self._optimizer, _nk.optimizer.Optimizer):
+            return self._optimizer.get_state()
+        return None
+
+    def _set_optimizer_state(self, state):
+        if state is not None:
+            self._optimizer.set_state(state)
+
     @abc.abstractmethod
     def info(self, depth=0):
         """
@@ -130,6 +279,8 @@ class AbstractVariationalDriver(abc.ABC):
                     yield self.step_count
 
                 self.update_parameters(dp)
+                # Summarizes the profiled quantities of the step, if enabled
+                _profiling.mark_step(self.step_count - 1)
 
     def advance(self, steps=1):
         """
@@ -146,6 +297,7 @@ class AbstractVariationalDriver(abc.ABC):
         out=None,
         obs=None,
         show_progress=True,
+        progress_interval=0.1,
         save_params_every=50,  # for default logger
         write_every=50,  # for default logger
         step_size=1,  # for default logger
@@ -165,13 +317,18 @@ class AbstractVariationalDriver(abc.ABC):
             :n_iter: the total number of iterations
             :out: A logger object to be used to store simulation log and data.
                 If this argument is a string, it will be used as output prefix for the standard JSON logger.
-            :obs: An iterable containing all observables that should be computed
+            :obs: A dictionary containing all observables that should be computed. An
+                observable given as `name: (operator, every)` is only estimated every
+                `every` steps, and otherwise as often as the output is logged.
             :save_params_every: Every how many steps the parameters of the network should be
             serialized to disk (ignored if logger is provided)
             :write_every: Every how many steps the json data should be flushed to disk (ignored if
             logger is provided)
             :step_size: Every how many steps should observables be logged to disk (default=1)
             :show_progress: If true displays a progress bar (default=True)
+            :progress_interval: The minimum time in seconds between two refreshes of the
+                progress bar (default=0.1). The statistics displayed in the progress bar
+                are only formatted when it is refreshed.
             :output_prefix: (Deprecated) The prefix at which json output should be stored (ignored if out
               is provided).
         """
@@ -192,6 +349,8 @@ class AbstractVariationalDriver(abc.ABC):
                 obs = self._obs
             else:
                 obs = {}
+        # The observables are flattened once for the whole run
+        registry = ObservableRegistry(obs)
 
         # output_prefix is deprecated. out should be used and takes over
         # error out if both are passed
@@ -222,20 +381,34 @@ class AbstractVariationalDriver(abc.ABC):
         else:
             logger = None
 
+        last_refresh = None
         with tqdm(
-            self.iter(n_iter, step_size), total=n_iter, disable=not show_progress
+            self.iter(n_iter, step_size),
+            total=n_iter,
+            disable=not show_progress,
+            mininterval=progress_interval,
         ) as itr:
             for step in itr:
-                # if the cost-function is defined then report it in the progress bar
-                if self._loss_stats is not None:
-                    itr.set_postfix_str(self._loss_name + "=" + str(self._loss_stats))
-
-                obs_data = self.estimate(obs)
+                # if the cost-function is defined then report it in the progress bar,
+                # formatting it only when the progress bar can be refreshed
+                if show_progress and self._loss_stats is not None:
+                    now = _time.monotonic()
+                    if last_refresh is None or now - last_refresh >= progress_interval:
+                        itr.set_postfix_str(
+                            self._loss_name + "=" + str(self._loss_stats),
+                            refresh=False,
+                        )
+                        last_refresh = now
+
+                # Only the observables which are due are estimated, all together
+                with self._timed("Observables"):
+                    registry.estimate(self, step)
+                log_data = registry.log_data()
 
                 if self._loss_stats is not None:
-                    obs_data[self._loss_name] = self._loss_stats
-
-                log_data = tree_map(_obs_stat_to_dict, obs_data)
+                    log_data[self._loss_name] = _obs_stat_to_dict(self._loss_stats)
+                self._log_additional_data(log_data, step)
+                log_data["Timings"] = dict(self._timings)
 
                 if logger is not None:
                     logger(step, log_data, self.machine)
@@ -257,7 +430,10 @@ class AbstractVariationalDriver(abc.ABC):
             A pytree of the same structure as the input, containing MCMC statistics
             for the corresponding operators as leaves.
         """
-        return tree_map(self._estimate_stats, observables)
+        # The leaves are estimated together
+        leaves, treedef = tree_flatten(observables)
+        stats = self._estimate_stats_many(leaves) if len(leaves) > 0 else []
+        return tree_unflatten(treedef, stats)
 
     def update_parameters(self, dp):
         """
@@ -266,9 +442,10 @@ class AbstractVariationalDriver(abc.ABC):
         Args:
             :param dp: the gradient
         """
-        self._machine.parameters = self._optimizer_step(
-            self.step_count, dp, self._machine.parameters
-        )
+        with self._timed("Update"):
+            self._machine.parameters = self._optimizer_step(
+                self.step_count, dp, self._machine.parameters
+            )
         self.step_count += 1
 
     @deprecated()
@@ -1 +1,3 @@
-from ._json_log import JsonLog
\ No newline at end of file
+from ._json_log import JsonLog
+from ._ndjson_log import NdjsonLog, NdjsonReader
+from ._checkpoint import AsyncCheckpointer
@@ -0,0 +1,139 @@
+import glob as _glob
+import os as _os
+import re as _re
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+
+import numpy as _np
+
+
+def _atomic_write(path, write):
+    """
+    Writes a file atomically: `write` is called with a binary file object on a
+    temporary file in the same directory, which is synced to disk and then renamed
+    to `path`. Readers thus see either the old or the new file, never a partial one.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as outfile:
+        write(outfile)
+        outfile.flush()
+        _os.fsync(outfile.fileno())
+    _os.replace(tmp_path, path)
+
+
+class AsyncCheckpointer:
+    """
+    Saves the parameters of a machine to disk without blocking the optimization.
+
+    The parameters are copied into one of two pre-allocated buffers, and serialized,
+    synced to disk and atomically renamed on a background thread, while the
+    optimization continues with the other buffer. If the buffer is still being
+    written when a new checkpoint is requested, that checkpoint is skipped instead
+    of waiting for the disk.
+
+    The checkpoints are stored as `.npy` arrays in the files
+    `output_prefix + ".<step>.wf"`, and only the most recent `keep` are kept. They
+    can be loaded into any machine with `load`, since they only contain
+    `machine.parameters`.
+
+    Args:
+        output_prefix: the name of the checkpoint files before the step and extension.
+        keep: the number of checkpoints kept on disk.
+    """
+
+    def __init__(self, output_prefix, keep=3):
+        if keep < 1:
+            raise ValueError("Invalid number of checkpoints: keep={}".format(keep))
+
+        self._prefix = output_prefix
+        self._keep = keep
+        self._checkpoints = self._existing_checkpoints()
+
+        self._buffers = [None, None]
+        self._futures = [None, None]
+        self._next_buffer = 0
+        self._n_skipped = 0
+
+        # A single worker keeps the checkpoints in order
+        self._executor = _ThreadPoolExecutor(max_workers=1)
+
+    def _path(self, step):
+        return "{}.{}.wf".format(self._prefix, step)
+
+    def _existing_checkpoints(self):
+        pattern = _re.compile(_re.escape(self._prefix) + r"\.(\d+)\.wf$")
+        steps = []
+        for path in _glob.glob(_glob.escape(self._prefix) + ".*.wf"):
+            match = pattern.match(path)
+            if match is not None:
+                steps.append(int(match.group(1)))
+        return [self._path(step) for step in sorted(steps)]
+
+    def save(self, machine, step):
+        """
+        Starts saving a checkpoint of the parameters of `machine` at the given step.
+
+        Returns:
+            True if the checkpoint was scheduled, False if it was skipped because the
+            previous checkpoints are still being written.
+        """
+        i = self._next_buffer
+        future = self._futures[i]
+        if future is not None:
+            if not future.done():
+                self._n_skipped += 1
+                return False
+            # Raises the errors of the previous write
+            future.result()
+
+        parameters = machine.parameters
+        if self._buffers[i] is None or self._buffers[i].shape != parameters.shape:
+            self._buffers[i] = _np.empty_like(parameters)
+        _np.copyto(self._buffers[i], parameters)
+
+        self._futures[i] = self._executor.submit(self._write, self._buffers[i], step)
+        self._next_buffer = 1 - i
+        return True
+
+    def _write(self, parameters, step):
+        path = self._path(step)
+        _atomic_write(path, lambda outfile: _np.save(outfile, parameters))
+
+        if path in self._checkpoints:
+            self._checkpoints.remove(path)
+        self._checkpoints.append(path)
+        while len(self._checkpoints) > self._keep:
+            old = self._checkpoints.pop(0)
+            if _os.path.exists(old):
+                _os.remove(old)
+
+    def wait(self):
+        """
+        Waits until all the scheduled checkpoints have been written.
+        """
+        for future in self._futures:
+            if future is not None:
+                future.result()
+
+    @property
+    def n_skipped(self):
+        """The number of checkpoints skipped because the disk was busy."""
+        return self._n_skipped
+
+    @property
+    def checkpoints(self):
+        """The paths of the checkpoints written so far, from the oldest to the newest."""
+        return list(self._checkpoints)
+
+    def latest(self):
+        """The path of the most recent checkpoint, or None."""
+        return self._checkpoints[-1] if len(self._checkpoints) > 0 else None
+
+    def load(self, machine, path=None):
+        """
+        Sets the parameters of `machine` from a checkpoint, by default the most recent.
+        """
+        if path is None:
+            path = self.latest()
+            if path is None:
+                raise ValueError("No checkpoint found at {}".format(self._prefix))
+        machine.parameters = _np.load(path, allow_pickle=False)
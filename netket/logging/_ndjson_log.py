@@ -0,0 +1,185 @@
+import json as _json
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+from os import path as _path
+
+from ._checkpoint import AsyncCheckpointer
+
+
+def _exists_ndjson(prefix):
+    return _path.exists(prefix + ".ndjson")
+
+
+class NdjsonLog:
+    """
+    Creates a logger sink object, with the same interface as `JsonLog`, which stores one
+    JSON record per line (NDJSON) in the file `output_prefix + ".ndjson"`.
+
+    Contrary to `JsonLog`, which rewrites the whole history at every flush, only the
+    records logged since the last flush are appended to the file, and they are
+    serialized and written on a background thread, so that the cost of a flush does
+    not depend on the length of the run and does not block the optimization. The log
+    can be read lazily with `NdjsonReader`, and exported to the format of `JsonLog`.
+
+    The machine parameters are saved in the background as well, by an
+    `AsyncCheckpointer`, to the files `output_prefix + ".<step>.wf"`.
+
+    Args:
+        output_prefix: the name of the output files before the extension
+        save_params_every: every how many iterations should machine parameters be flushed to file
+        keep_params: how many parameter checkpoints are kept on disk
+        write_every: every how many iterations should data be flushed to file
+        mode: Specify the behaviour in case the file already exists at this output_prefix. Options
+        are
+        - `[w]rite`: (default) overwrites file if it already exists;
+        - `[a]ppend`: appends to the file if it exists, overwise creates a new file.
+          The existing file is not read;
+        - `[x]` or `fail`: fails if file already exists;
+    """
+
+    def __init__(
+        self,
+        output_prefix,
+        mode="write",
+        save_params_every=50,
+        write_every=50,
+        keep_params=3,
+    ):
+        # Shorthands for mode
+        if mode == "w":
+            mode = "write"
+        elif mode == "a":
+            mode = "append"
+        elif mode == "x":
+            mode = "fail"
+
+        if not ((mode == "write") or (mode == "append") or (mode == "fail")):
+            raise ValueError(
+                "Mode not recognized: should be one of `[w]rite`, `[a]ppend` or `[x]`(fail)."
+            )
+
+        file_exists = _exists_ndjson(output_prefix)
+
+        if file_exists and mode == "fail":
+            raise ValueError(
+                "Output file already exists. Either delete it manually or change `output_prefix`."
+            )
+
+        if mode != "append":
+            open(output_prefix + ".ndjson", "w").close()
+
+        self._records = []
+        self._prefix = output_prefix
+        self._write_every = write_every
+        self._save_params_every = save_params_every
+        self._old_step = 0
+
+        # A single worker keeps the records in order
+        self._executor = _ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+
+        self._checkpointer = AsyncCheckpointer(output_prefix, keep=keep_params)
+
+    def __call__(self, step, item, machine):
+        item["Iteration"] = step
+
+        self._records.append(item)
+
+        if step % self._write_every == 0 or step == self._old_step - 1:
+            self._flush_log()
+        if step % self._save_params_every == 0 or step == self._old_step - 1:
+            self._flush_params(machine, step)
+
+        self._old_step = step
+
+    def _flush_log(self):
+        # Errors of the previous write are raised here, without waiting for it
+        if self._pending is not None and self._pending.done():
+            self._pending.result()
+
+        records, self._records = self._records, []
+        if len(records) > 0:
+            self._pending = self._executor.submit(self._write_records, records)
+
+    def _write_records(self, records):
+        lines = "".join(_json.dumps(record) + "\n" for record in records)
+        with open(self._prefix + ".ndjson", "a") as outfile:
+            outfile.write(lines)
+
+    def _flush_params(self, machine, step):
+        # Skipped if the previous checkpoints are still being written
+        self._checkpointer.save(machine, step)
+
+    def flush(self, machine=None):
+        """
+        Writes to file the content of this logger, and waits until all the records
+        and the parameter checkpoints have been written.
+
+        :param machine: optionally also writes the parameters of the machine.
+        """
+        self._flush_log()
+        if self._pending is not None:
+            self._pending.result()
+
+        if machine is not None:
+            # Waiting first ensures that the last checkpoint is not skipped
+            self._checkpointer.wait()
+            self._flush_params(machine, self._old_step)
+        self._checkpointer.wait()
+
+    @property
+    def checkpointer(self):
+        """The `AsyncCheckpointer` saving the machine parameters."""
+        return self._checkpointer
+
+
+class NdjsonReader:
+    """
+    Reads lazily a log written by `NdjsonLog`: the file is only read while iterating
+    over the records, one line at a time.
+
+    Args:
+        path: the path of the log, either the `.ndjson` file or its output prefix.
+    """
+
+    def __init__(self, path):
+        if not path.endswith(".ndjson"):
+            path = path + ".ndjson"
+        self._path = path
+
+    def __iter__(self):
+        with open(self._path) as infile:
+            for line in infile:
+                if line.strip():
+                    yield _json.loads(line)
+
+    def __len__(self):
+        with open(self._path) as infile:
+            return sum(1 for line in infile if line.strip())
+
+    def column(self, *keys):
+        """
+        Returns the list of the values of an entry in all the records, e.g.
+        `reader.column("Energy", "Mean")`. Records not containing the entry are skipped.
+        """
+        values = []
+        for record in self:
+            try:
+                for key in keys:
+                    record = record[key]
+            except KeyError:
+                continue
+            values.append(record)
+        return values
+
+    def to_json(self, path):
+        """
+        Exports the log to the format written by `JsonLog`, i.e. a JSON document
+        `{"Output": [...]}`, streaming the records one at a time.
+        """
+        with open(path, "w") as outfile:
+            outfile.write('{"Output": [')
+            for i, record in enumerate(self):
+                if i > 0:
+                    outfile.write(", ")
+                _json.dump(record, outfile)
+            outfile.write("]}")
@@ -4,6 +4,8 @@ from .cxx_machine import *
 from .abstract_machine import AbstractMachine
 
 from .py_rbm import *
+from .rbm_conv import *
+from .cached import *
 
 
 def _has_jax():
@@ -5,9 +5,20 @@ import numpy as _np
 class AbstractMachine(abc.ABC):
     """Abstract class for NetKet machines"""
 
-    def __init__(self, hilbert):
+    def __init__(self, hilbert, dtype=_np.complex128):
         super().__init__()
         self.hilbert = hilbert
+        self._dtype = _np.dtype(dtype)
+
+    @property
+    def dtype(self):
+        r"""The complex datatype of the values returned by `log_val`.
+
+        Using `complex64` halves the cost of evaluating the wave function, for
+        example while sampling or computing local values. Derivatives are
+        always returned as `complex128`.
+        """
+        return self._dtype
 
     @abc.abstractmethod
     def log_val(self, x, out=None):
@@ -18,7 +29,7 @@ class AbstractMachine(abc.ABC):
             x: Either a
                 * vector of `float64` of size `self.n_visible` or
                 * a matrix of `float64` of shape `(*, self.n_visible)`.
-            out: Destination vector of `complex128`. If `x` is a matrix then
+            out: Destination vector of `self.dtype`. If `x` is a matrix then
                 length of `out` should be `x.shape[0]`. If `x` is a vector,
                 then length of `out` should be 1.
 
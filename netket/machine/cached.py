@@ -0,0 +1,151 @@
+from collections import OrderedDict, namedtuple
+
+import numpy as _np
+
+from .abstract_machine import AbstractMachine
+
+__all__ = ["CachedMachine"]
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "max_size", "size"])
+
+
+class CachedMachine(AbstractMachine):
+    r"""
+    A wrapper memoizing the values of `log_val` of another machine.
+
+    Markov chains with low acceptance rates keep proposing configurations they
+    visited recently, and the same connected configurations appear many times
+    when computing local values. This machine stores the last `max_size`
+    values of `log_val` in a least-recently-used table keyed by the
+    configuration, and only evaluates the wrapped machine on the
+    configurations missing from the table.
+
+    The table is cleared whenever the parameters are set through this
+    machine. If the parameters of the wrapped machine are modified directly,
+    `cache_clear` must be called.
+    """
+
+    def __init__(self, machine, max_size=2 ** 16):
+        r"""Constructs a new cached machine.
+
+        Args:
+            machine: The machine to wrap.
+            max_size: Maximum number of configurations stored in the table.
+        """
+        if max_size < 1:
+            raise ValueError("`max_size` should be a positive integer")
+        self._machine = machine
+        self._max_size = int(max_size)
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        super().__init__(
+            machine.hilbert, dtype=getattr(machine, "dtype", _np.complex128)
+        )
+
+    @property
+    def machine(self):
+        r"""The wrapped machine."""
+        return self._machine
+
+    def cache_info(self):
+        r"""Returns the number of hits and misses since the last call to
+        `cache_clear`, together with the maximum and current size of the table.
+        """
+        return CacheInfo(self._hits, self._misses, self._max_size, len(self._cache))
+
+    @property
+    def hit_rate(self):
+        r"""The fraction of configurations whose `log_val` was found in the
+        table since the last call to `cache_clear`."""
+        n_calls = self._hits + self._misses
+        return self._hits / n_calls if n_calls > 0 else 0.0
+
+    def cache_clear(self):
+        r"""Empties the table and resets the statistics."""
+        self._cache.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def log_val(self, x, out=None):
+        if x.ndim != 2:
+            x_2d = x.reshape(-1, x.shape[-1])
+            res = self.log_val(x_2d, None if out is None else out.reshape(-1))
+            return res[0] if x.ndim == 1 else res.reshape(x.shape[:-1])
+
+        if out is None:
+            out = _np.empty(x.shape[0], dtype=self.dtype)
+
+        x = _np.ascontiguousarray(x, dtype=_np.float64)
+        cache = self._cache
+
+        # Rows whose value is not in the table, grouped by configuration so
+        # that repeated configurations in the batch are evaluated only once
+        missing = OrderedDict()
+        for i, key in enumerate(map(_np.ndarray.tobytes, x)):
+            val = cache.get(key)
+            if val is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                cache.move_to_end(key)
+                out[i] = val
+
+        self._misses += len(missing)
+        self._hits += x.shape[0] - len(missing)
+
+        if missing:
+            first = [idx[0] for idx in missing.values()]
+            vals = self._machine.log_val(x[first])
+            for (key, idx), val in zip(missing.items(), vals):
+                out[idx] = val
+                cache[key] = val
+            while len(cache) > self._max_size:
+                cache.popitem(last=False)
+
+        return out
+
+    def der_log(self, x, out=None):
+        return self._machine.der_log(x, out)
+
+    def vector_jacobian_prod(self, x, vec, out=None):
+        return self._machine.vector_jacobian_prod(x, vec, out)
+
+    def jacobian_vector_prod(self, v, vec, out=None):
+        return self._machine.jacobian_vector_prod(v, vec, out)
+
+    @property
+    def n_visible(self):
+        return self._machine.n_visible
+
+    @property
+    def is_holomorphic(self):
+        return self._machine.is_holomorphic
+
+    @property
+    def n_par(self):
+        return self._machine.n_par
+
+    @property
+    def state_dict(self):
+        state_dict = self._machine.state_dict
+        return state_dict() if callable(state_dict) else state_dict
+
+    @property
+    def parameters(self):
+        return self._machine.parameters
+
+    @parameters.setter
+    def parameters(self, p):
+        self.cache_clear()
+        self._machine.parameters = p
+
+    def init_random_parameters(self, *args, **kwargs):
+        self.cache_clear()
+        self._machine.init_random_parameters(*args, **kwargs)
+
+    def save(self, file):
+        self._machine.save(file)
+
+    def load(self, file):
+        self.cache_clear()
+        self._machine.load(file)
@@ -2,6 +2,10 @@ from .._C_netket.machine import Machine
 import numpy as _np
 
 class CxxMachine(Machine):
+    # Datatype of the values returned by `log_val`. Subclasses implementing
+    # `_log_val` in single precision can override it with `complex64`.
+    _complex_dtype = _np.complex128
+
     def __init__(self, hilbert):
         super(CxxMachine, self).__init__(hilbert)
 
@@ -26,7 +30,8 @@ class CxxMachine(Machine):
             v: Either a
                 * vector of `float64` of size `self.n_visible` or
                 * a matrix of `float64` of shape `(*, self.n_visible)`.
-            out: Destination vector of `complex128`. If `v` is a matrix then
+            out: Destination vector of `complex128` (or `complex64` for
+                single-precision machines). If `v` is a matrix then
                 length of `out` should be `v.shape[0]`. If `v` is a vector,
                 then length of `out` should be 1.
 
@@ -48,7 +53,7 @@ class CxxMachine(Machine):
                 v.shape[1] == self.n_visible
             ), "v has wrong shape: {}; expected (?, {})".format(v.shape, self.n_visible)
             if out is None:
-                out = _np.empty(v.shape[0], dtype=_np.complex128)
+                out = _np.empty(v.shape[0], dtype=self._complex_dtype)
             self._log_val(v, out)
             return out
         elif v.ndim == 1:
@@ -56,11 +61,16 @@ class CxxMachine(Machine):
                 v.shape, self.n_visible
             )
             if out is None:
-                out = _np.empty(1, dtype=_np.complex128)
+                out = _np.empty(1, dtype=self._complex_dtype)
             self._log_val(v.reshape(1, -1), out)
             return out[0]
+        elif v.ndim == 3:
+            out = self.log_val(
+                v.reshape(-1, v.shape[2]), None if out is None else out.reshape(-1)
+            )
+            return out.reshape(v.shape[0:2])
         raise ValueError(
-            "v has wrong dimension: {}; expected either 1 or 2".format(v.ndim)
+            "v has wrong dimension: {}; expected either 1, 2 or 3".format(v.ndim)
         )
 
     def _log_val(self, v, out):
@@ -117,8 +127,14 @@ class CxxMachine(Machine):
             )
             self._der_log(v.reshape(1, -1), out.reshape(1, -1))
             return out
+        elif v.ndim == 3:
+            out = self.der_log(
+                v.reshape(-1, v.shape[2]),
+                None if out is None else out.reshape(-1, self._n_par()),
+            )
+            return out.reshape(v.shape[0], v.shape[1], self._n_par())
         raise ValueError(
-            "v has wrong dimension: {}; expected either 1 or 2".format(v.ndim)
+            "v has wrong dimension: {}; expected either 1, 2 or 3".format(v.ndim)
         )
 
     def _der_log(self, v, out):
@@ -44,6 +44,10 @@ class Jax(CxxMachine):
                 automatically (which is __not__ synchronized between MPI
                 processes so prefer `self.init_random_parameters` if you're
                 using multiple MPI tasks)
+
+        If the parameters of `module` are `float32`, `log_val` is evaluated
+        and returned in single precision (`complex64`), while `der_log` is
+        always returned as `complex128`.
         """
         # NOTE: The following call to __init__ is important!
         super(Jax, self).__init__(hilbert)
@@ -82,6 +86,9 @@ class Jax(CxxMachine):
 
         See `self.log_val`.
         """
+        # Casting the input avoids an implicit promotion to double precision
+        # of single-precision networks.
+        x = x.astype(self._dtype, copy=False)
         out[:] = (
             np.asarray(self._forward_fn(self._params, x))
             .view(dtype=self._complex_dtype)
@@ -30,7 +30,12 @@ class PyRbm(AbstractMachine):
     """
 
     def __init__(
-        self, hilbert, alpha=None, use_visible_bias=True, use_hidden_bias=True
+        self,
+        hilbert,
+        alpha=None,
+        use_visible_bias=True,
+        use_hidden_bias=True,
+        dtype=_np.complex128,
     ):
         r"""Constructs a new RBM.
 
@@ -40,6 +45,9 @@ class PyRbm(AbstractMachine):
             use_visible_bias: specifies whether to use a bias for visible
                               spins.
             use_hidden_bias: specifies whether to use a bias for hidden spins.
+            dtype: datatype used to evaluate `log_val`. Parameters and
+                   derivatives are always stored in `complex128`, but with
+                   `complex64` the amplitudes are computed in single precision.
         """
 
         n = hilbert.size
@@ -63,7 +71,7 @@ class PyRbm(AbstractMachine):
 
         self._kernel = RbmSpinKernel()
 
-        super().__init__(hilbert)
+        super().__init__(hilbert, dtype=dtype)
 
     @property
     def n_par(self):
@@ -77,9 +85,12 @@ class PyRbm(AbstractMachine):
         configuration ``x``.
         """
         if out is None:
-            out = _np.empty(x.shape[0], dtype=_np.complex128)
+            out = _np.empty(x.shape[0], dtype=self.dtype)
 
-        self._kernel.log_val(x, out, self._w, self._a, self._b)
+        if self.dtype == _np.complex128:
+            self._kernel.log_val(x, out, self._w, self._a, self._b)
+        else:
+            self._log_val_single(x, out)
 
         # self._r = x.dot(self._w.T)
         # if self._b is not None:
@@ -92,6 +103,25 @@ class PyRbm(AbstractMachine):
 
         return out
 
+    def _log_val_single(self, x, out):
+        # Single precision path: the parameters are downcast on every call,
+        # which is cheap compared to the (batch, n_visible, n_hidden) product.
+        dtype = self.dtype
+        x = x.astype(_np.finfo(dtype).dtype, copy=False)
+
+        r = _np.dot(x, self._w.T.astype(dtype))
+        if self._b is not None:
+            r += self._b.astype(dtype)
+
+        # log(cosh(r)) = r + log(1 + exp(-2r)) - log(2), after flipping the
+        # sign of r wherever Re(r) < 0 to avoid overflows.
+        r = _np.where(r.real < 0, -r, r)
+        r += _np.log1p(_np.exp(-2 * r)) - dtype.type(_np.log(2.0))
+        r.sum(axis=1, out=out)
+
+        if self._a is not None:
+            out += _np.dot(x, self._a.astype(dtype))
+
     def der_log(self, x, out=None):
 
         if out is None:
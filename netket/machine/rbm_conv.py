@@ -0,0 +1,171 @@
+# Copyright 2019 The Simons Foundation, Inc. - All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+
+import numpy as _np
+
+from .._C_netket.graph import Hypercube
+from .cxx_machine import CxxMachine
+
+__all__ = ["RbmSpinConv"]
+
+
+def _hypercube_shape(graph):
+    r"""Returns the shape `(L, ..., L)` of a periodic hypercube."""
+    if not isinstance(graph, Hypercube):
+        raise ValueError(
+            "The lattice shape can only be inferred for a Hypercube, "
+            "please pass `shape` explicitly."
+        )
+    n_sites = graph.n_sites
+    if len(graph.automorphisms) != n_sites:
+        raise ValueError(
+            "RbmSpinConv requires a Hypercube with periodic boundary conditions."
+        )
+    # Every site of a periodic hypercube (with length >= 3) has 2 * n_dim
+    # neighbours.
+    n_dim = len(graph.adjacency_list[0]) // 2
+    length = int(round(n_sites ** (1.0 / n_dim)))
+    assert length ** n_dim == n_sites, "Bug! Inconsistent hypercube"
+    return (length,) * n_dim
+
+
+def _log_cosh(x):
+    # log(cosh(x)) = x + log(1 + exp(-2x)) - log(2), after flipping the sign
+    # of x wherever Re(x) < 0 to avoid overflows.
+    x = _np.where(x.real < 0, -x, x)
+    return x + _np.log1p(_np.exp(-2.0 * x)) - _np.log(2.0)
+
+
+class RbmSpinConv(CxxMachine):
+    r"""
+    A translation invariant RBM for periodic lattices.
+
+    The hidden units are organized in `alpha` feature maps, each one obtained
+    convolving the visible configuration with a filter spanning the whole
+    lattice. This describes the same states as `RbmSpinSymm` restricted to
+    the translation group, but the activations of all the `alpha * N` hidden
+    units are computed with batched FFTs, reducing the cost of `log_val` and
+    `der_log` from O(alpha N^2) to O(alpha N log N) per configuration.
+    """
+
+    def __init__(
+        self, hilbert, alpha=1, use_visible_bias=True, use_hidden_bias=True, shape=None
+    ):
+        r"""Constructs a new convolutional RBM.
+
+        Args:
+            hilbert: Hilbert space. Its graph should be a `Hypercube` with
+                     periodic boundary conditions, unless `shape` is given.
+            alpha: Number of feature maps, `alpha * hilbert.size` is the
+                   number of hidden units.
+            use_visible_bias: specifies whether to use a (translation
+                              invariant) bias for visible spins.
+            use_hidden_bias: specifies whether to use a bias for each
+                             feature map.
+            shape: The shape `(L_0, L_1, ...)` of the periodic lattice,
+                   where site `i` has coordinates `c` such that
+                   `i = c_0 + L_0 * (c_1 + L_1 * ...)`, as in `Hypercube`.
+                   If None, it is inferred from `hilbert.graph`.
+        """
+        # NOTE: The following call to __init__ is important!
+        super(RbmSpinConv, self).__init__(hilbert)
+        if alpha < 1 or int(alpha) != alpha:
+            raise ValueError("`alpha` should be a positive integer")
+        if shape is None:
+            shape = _hypercube_shape(hilbert.graph)
+        shape = tuple(int(l) for l in shape)
+        if int(_np.prod(shape)) != hilbert.size:
+            raise ValueError(
+                "shape {} is incompatible with a Hilbert space of size {}".format(
+                    shape, hilbert.size
+                )
+            )
+
+        # The first coordinate is the fastest varying one, hence the C-ordered
+        # lattice is the reversed shape.
+        self._shape = shape[::-1]
+        self._axes = tuple(range(2, 2 + len(shape)))
+
+        alpha = int(alpha)
+        self._w = _np.empty([alpha, hilbert.size], dtype=_np.complex128)
+        self._a = _np.empty(1, dtype=_np.complex128) if use_visible_bias else None
+        self._b = _np.empty(alpha, dtype=_np.complex128) if use_hidden_bias else None
+
+    def _n_par(self):
+        return (
+            self._w.size
+            + (self._a.size if self._a is not None else 0)
+            + (self._b.size if self._b is not None else 0)
+        )
+
+    def _hidden_fft(self, x):
+        # Returns the FFT of the visible configurations, with shape
+        # (batch, 1, *shape), and the activations of the hidden units, with
+        # shape (batch, alpha, *shape).
+        x_fft = _np.fft.fftn(x.reshape((x.shape[0], 1) + self._shape), axes=self._axes)
+        w_fft = _np.fft.fftn(self._w.reshape((1, -1) + self._shape), axes=self._axes)
+
+        r = _np.fft.ifftn(x_fft * w_fft, axes=self._axes)
+        if self._b is not None:
+            r += self._b.reshape((1, -1) + (1,) * len(self._shape))
+        return x_fft, r
+
+    def _log_val(self, x, out):
+        _, r = self._hidden_fft(x)
+
+        _np.sum(_log_cosh(r).reshape(x.shape[0], -1), axis=-1, out=out)
+
+        if self._a is not None:
+            out += self._a[0] * x.sum(axis=-1)
+
+    def _der_log(self, x, out):
+        batch_size = x.shape[0]
+        x_fft, r = self._hidden_fft(x)
+        _np.tanh(r, out=r)
+
+        i = 0
+        if self._a is not None:
+            out[:, i] = x.sum(axis=-1)
+            i += 1
+
+        if self._b is not None:
+            out[:, i : i + self._b.size] = r.reshape(batch_size, self._b.size, -1).sum(
+                axis=-1
+            )
+            i += self._b.size
+
+        # The derivative with respect to the filters is the circular
+        # cross-correlation of tanh(r) with the (real) visible configuration.
+        r_fft = _np.fft.fftn(r, axes=self._axes)
+        r_fft *= _np.conjugate(x_fft)
+        out[:, i : i + self._w.size] = _np.fft.ifftn(r_fft, axes=self._axes).reshape(
+            batch_size, -1
+        )
+
+    def _is_holomorphic(self):
+        return True
+
+    def state_dict(self):
+        od = OrderedDict()
+        if self._a is not None:
+            od["a"] = self._a.view()
+
+        if self._b is not None:
+            od["b"] = self._b.view()
+
+        od["w"] = self._w.view()
+
+        return od
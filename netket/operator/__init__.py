@@ -5,6 +5,7 @@ from . import spin, boson
 
 from .local_values import (
     local_values,
+    local_values_many,
     der_local_values,
 )
 
@@ -10,6 +10,7 @@ from numba import jit
 
 
 from .._C_netket.machine import DensityMatrix
+from .. import profiling as _profiling
 
 
 @jit(nopython=True)
@@ -21,12 +22,26 @@ def _local_values_kernel(log_vals, log_val_primes, mels, sections, out):
         low_range = s
 
 
-def _local_values_impl(op, machine, v, log_vals, out):
+def _log_val(machine, v, *args):
+    with _profiling.timer("log_val"):
+        log_vals = machine.log_val(v, *args)
+    _profiling.count("log_val.batch_size", v.size // v.shape[-1])
+    return log_vals
+
 
+def _get_conn_flattened(op, v):
     sections = _np.empty(v.shape[0], dtype=_np.int32)
-    v_primes, mels = op.get_conn_flattened(v, sections)
+    with _profiling.timer("get_conn_flattened"):
+        v_primes, mels = op.get_conn_flattened(v, sections)
+    _profiling.count("get_conn_flattened.connections", mels.shape[0])
+    return v_primes, mels, sections
+
+
+def _local_values_impl(op, machine, v, log_vals, out):
 
-    log_val_primes = machine.log_val(v_primes)
+    v_primes, mels, sections = _get_conn_flattened(op, v)
+
+    log_val_primes = _log_val(machine, v_primes)
 
     _local_values_kernel(log_vals, log_val_primes, mels, sections, out)
 
@@ -44,13 +59,12 @@ def _op_op_unpack_kernel(v, sections, vold):
 
 def _local_values_op_op_impl(op, machine, v, log_vals, out):
 
-    sections = _np.empty(v.shape[0], dtype=_np.int32)
-    v_primes, mels = op.get_conn_flattened(v, sections)
+    v_primes, mels, sections = _get_conn_flattened(op, v)
 
     vold = _np.empty((sections[-1], v.shape[1]))
     _op_op_unpack_kernel(v, sections, vold)
 
-    log_val_primes = machine.log_val(v_primes, vold)
+    log_val_primes = _log_val(machine, v_primes, vold)
 
     _local_values_kernel(log_vals, log_val_primes, mels, sections, out)
 
@@ -90,9 +104,9 @@ def local_values(op, machine, v, log_vals=None, out=None):
 
     if log_vals is None:
         if not is_op_times_op:
-            log_vals = machine.log_val(v)
+            log_vals = _log_val(machine, v)
         else:
-            log_vals = machine.log_val(v, v)
+            log_vals = _log_val(machine, v, v)
 
     if not is_op_times_op:
         _impl = _local_values_impl
@@ -149,6 +163,99 @@ def local_values(op, machine, v, log_vals=None, out=None):
     )
 
 
+def _connections(op, v):
+    v_primes, mels, sections = _get_conn_flattened(op, v)
+
+    # Index of the sample from which each connected configuration is obtained
+    n_conn = _np.diff(sections, prepend=0)
+    origin = _np.repeat(_np.arange(v.shape[0]), n_conn)
+    return v_primes, mels, sections, origin
+
+
+def local_values_many(ops, machine, v, log_vals=None, out=None):
+    """
+    Computes the local values of several operators for all `samples`, sharing the
+    evaluations of the machine between them.
+
+    The connected configurations of all the operators are merged and deduplicated,
+    so that `log_val` is called only once. Operators which are diagonal on the
+    given samples do not need any evaluation of the machine, and their local
+    values are computed directly from the matrix elements.
+
+            Args:
+                ops: A list of Hermitian operators.
+                machine: Wavefunction :math:`\Psi`.
+                v: A numpy array containing a batch of visible configurations
+                    :math:`V = v_1,\dots v_M`, either as a matrix or with an
+                    additional leading dimension (e.g. the Markov chains).
+                log_vals: A numpy array containing the values :math:`\Psi(V)`.
+                    If not given, it is computed from scratch.
+                    Defaults to None.
+                out: A numpy array of shape `(len(ops),) + v.shape[:-1]`, where the
+                    local values are stored. If not given, it is allocated from
+                    scratch and then returned.
+                    Defaults to None.
+
+            Returns:
+                A numpy array of shape `(len(ops),) + v.shape[:-1]` containing the
+                local values of each operator.
+    """
+    batch_shape = v.shape[:-1]
+    if v.ndim == 3:
+        v = v.reshape(-1, v.shape[-1])
+    elif v.ndim != 2:
+        raise ValueError(
+            "v has wrong dimension: {}; expected either 2 or 3".format(v.ndim)
+        )
+
+    if out is None:
+        out = _np.empty((len(ops),) + batch_shape, dtype=_np.complex128)
+    out_flat = out.reshape(len(ops), v.shape[0])
+    if not _np.shares_memory(out_flat, out):
+        # The local values are copied back to a non-contiguous `out` at the end
+        local_values_many(ops, machine, v, log_vals, out=out_flat)
+        out[...] = out_flat.reshape(out.shape)
+        return out
+
+    if isinstance(machine, DensityMatrix):
+        # The connections of the observables of density matrices are not
+        # configurations of the machine, hence they are not merged
+        for k, op in enumerate(ops):
+            local_values(op, machine, v, log_vals, out=out_flat[k])
+        return out
+
+    if log_vals is None:
+        log_vals = _log_val(machine, v)
+    log_vals = log_vals.reshape(-1)
+
+    off_diagonal = []
+    for k, op in enumerate(ops):
+        v_primes, mels, sections, origin = _connections(op, v)
+
+        if _np.array_equal(v_primes, v[origin]):
+            # Diagonal operator: the local values are the sums of the matrix elements
+            out_flat[k] = _np.bincount(
+                origin, weights=mels.real, minlength=v.shape[0]
+            ) + 1j * _np.bincount(origin, weights=mels.imag, minlength=v.shape[0])
+        else:
+            off_diagonal.append((k, v_primes, mels, sections))
+
+    if len(off_diagonal) > 0:
+        all_primes = _np.concatenate([conn[1] for conn in off_diagonal])
+        unique_primes, inverse = _np.unique(all_primes, axis=0, return_inverse=True)
+        unique_log_vals = _log_val(machine, unique_primes)
+
+        inverse = inverse.reshape(-1)
+        start = 0
+        for k, v_primes, mels, sections in off_diagonal:
+            stop = start + v_primes.shape[0]
+            log_val_primes = unique_log_vals[inverse[start:stop]]
+            _local_values_kernel(log_vals, log_val_primes, mels, sections, out_flat[k])
+            start = stop
+
+    return out
+
+
 def _der_local_values_impl(op, machine, v, log_vals, der_log_vals, out):
 
     vprimes, mels = op.get_conn(v)
@@ -0,0 +1,313 @@
+"""
+Lightweight instrumentation of the hot paths of NetKet.
+
+The profiler collects named timers (number of calls, total, minimum and maximum
+wall time) and named counters, both in the Python code and in the C++ code, where
+the sections invisible from Python are timed (e.g. the sweeps of the C++ samplers
+and the calls to the machine they make). The instrumented quantities are:
+
+- `log_val`: the calls to `machine.log_val`, and `log_val.batch_size` the total
+  number of configurations passed to it;
+- `get_conn_flattened`: the calls to `op.get_conn_flattened`, and
+  `get_conn_flattened.connections` the total number of connected configurations;
+- `sampler.sweep`: the sweeps of the Metropolis-Hastings samplers, and
+  `sampler.moves`, `sampler.accepted` the number of proposed and accepted moves;
+- `sr.solve`: the solutions of the linear system of the stochastic reconfiguration.
+
+The profiler is disabled by default, in which case `timer` and `count` only check
+a flag. The data of each MPI process is collected separately: it can be
+summarized for every step of the variational drivers, and exported, together
+with a trace of the timed sections in the Chrome trace format (which can be
+opened in `chrome://tracing` or https://ui.perfetto.dev), with `export`.
+
+Example:
+    >>> import netket as nk
+    >>> nk.profiling.enable(trace=True)
+    >>> vmc.run(n_iter=100, out="test")
+    >>> nk.profiling.export("test")
+"""
+
+import json as _json
+import threading as _threading
+import time as _time
+
+from ._C_netket import MPI as _MPI
+from ._C_netket import utils as _utils
+
+_enabled = False
+_tracing = False
+
+# The samplers can run on a background thread, e.g. while SR is solved
+_lock = _threading.Lock()
+
+# name -> [count, total, min, max], in seconds
+_timers = {}
+_counters = {}
+# (name, start, duration), in microseconds on the clock of the C++ profiler
+_events = []
+
+_steps = []
+_step_marks = []
+_last_totals = None
+
+# Converts the times of time.perf_counter to the clock of the C++ profiler
+_offset = 0.0
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("_name", "_start")
+
+    def __init__(self, name):
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = _time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _add_time(self._name, self._start, _time.perf_counter() - self._start)
+        return False
+
+
+def _now():
+    return _time.perf_counter() * 1e6 + _offset
+
+
+def _add_time(name, start, duration):
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            _timers[name] = [1, duration, duration, duration]
+        else:
+            timer[0] += 1
+            timer[1] += duration
+            timer[2] = min(timer[2], duration)
+            timer[3] = max(timer[3], duration)
+        if _tracing:
+            _events.append((name, start * 1e6 + _offset, duration * 1e6))
+
+
+def enable(trace=False):
+    """
+    Enables the profiler, in the Python and in the C++ code.
+
+    Args:
+        trace: whether every timed section is stored, to be exported as a trace.
+    """
+    global _enabled, _tracing
+    _enabled = True
+    _tracing = trace
+    _utils._profiler_enable(trace)
+
+
+def disable():
+    """
+    Disables the profiler. The data collected so far is kept.
+    """
+    global _enabled, _tracing
+    _enabled = False
+    _tracing = False
+    _utils._profiler_disable()
+
+
+def is_enabled():
+    """Whether the profiler is enabled."""
+    return _enabled
+
+
+def reset():
+    """
+    Discards all the data collected by the profiler.
+    """
+    global _offset, _last_totals
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+        del _events[:]
+        del _steps[:]
+        del _step_marks[:]
+        _last_totals = None
+
+    _utils._profiler_reset()
+    _offset = _utils._profiler_now() - _time.perf_counter() * 1e6
+
+
+def timer(name):
+    """
+    Returns a context manager timing the enclosed code as the timer `name`, or
+    a no-op context manager if the profiler is disabled.
+    """
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def count(name, value=1):
+    """
+    Adds `value` to the counter `name`, if the profiler is enabled.
+    """
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + value
+
+
+def summary():
+    """
+    Returns the data collected by the profiler in this MPI process, merging the
+    Python and the C++ code.
+
+    Returns:
+        A dictionary with the entries `timers`, which maps the name of each timer to
+        a dictionary with its `count`, and its `total`, `mean`, `min` and `max` time
+        in seconds, and `counters`, which maps the name of each counter to its value.
+    """
+    data = _utils._profiler_data()
+    with _lock:
+        python_timers = {name: tuple(timer) for name, timer in _timers.items()}
+        python_counters = dict(_counters)
+
+    timers = {}
+    for source in (data["timers"], python_timers):
+        for name, (n_calls, total, t_min, t_max) in source.items():
+            if name in timers:
+                timer = timers[name]
+                timer["count"] += n_calls
+                timer["total"] += total
+                timer["min"] = min(timer["min"], t_min)
+                timer["max"] = max(timer["max"], t_max)
+            else:
+                timers[name] = {
+                    "count": n_calls,
+                    "total": total,
+                    "min": t_min,
+                    "max": t_max,
+                }
+    for timer in timers.values():
+        timer["mean"] = timer["total"] / timer["count"]
+
+    counters = dict(data["counters"])
+    for name, value in python_counters.items():
+        counters[name] = counters.get(name, 0) + value
+
+    return {"timers": timers, "counters": counters}
+
+
+def mark_step(step):
+    """
+    Ends a step of the optimization, storing the summary of the timers and the
+    counters since the previous step. Does nothing if the profiler is disabled.
+
+    This is called by the variational drivers at the end of every step.
+    """
+    global _last_totals
+    if not _enabled:
+        return
+
+    totals = summary()
+    last = _last_totals if _last_totals is not None else {"timers": {}, "counters": {}}
+
+    timers = {}
+    for name, timer in totals["timers"].items():
+        previous = last["timers"].get(name, {"count": 0, "total": 0.0})
+        n_calls = timer["count"] - previous["count"]
+        if n_calls > 0:
+            timers[name] = {
+                "count": n_calls,
+                "total": timer["total"] - previous["total"],
+            }
+
+    counters = {}
+    for name, value in totals["counters"].items():
+        delta = value - last["counters"].get(name, 0)
+        if delta != 0:
+            counters[name] = delta
+
+    _steps.append({"step": step, "timers": timers, "counters": counters})
+    if _tracing:
+        _step_marks.append((step, _now()))
+    _last_totals = totals
+
+
+def step_summaries():
+    """
+    Returns the list of the summaries of the steps ended by `mark_step`, as
+    dictionaries with the entries `step`, `timers` (the `count` and `total` time
+    of each timer) and `counters`.
+    """
+    return list(_steps)
+
+
+def chrome_trace():
+    """
+    Returns the trace of the timed sections of this MPI process in the Chrome
+    trace format, as a dictionary which can be serialized to JSON. The sections are
+    only stored when the profiler is enabled with `trace=True`. The process id of
+    the events is the MPI rank.
+    """
+    rank = _MPI.rank()
+
+    def complete_events(events, category):
+        for name, start, duration in events:
+            yield {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": duration,
+                "pid": rank,
+                "tid": 0,
+            }
+
+    trace_events = list(complete_events(_utils._profiler_data()["events"], "cxx"))
+    with _lock:
+        python_events = list(_events)
+    trace_events.extend(complete_events(python_events, "python"))
+    for step, ts in _step_marks:
+        trace_events.append(
+            {
+                "name": "step",
+                "ph": "i",
+                "s": "p",
+                "ts": ts,
+                "pid": rank,
+                "tid": 0,
+                "args": {"step": step},
+            }
+        )
+    trace_events.sort(key=lambda event: event["ts"])
+
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def export(output_prefix):
+    """
+    Writes the data of the profiler of this MPI process to the files
+    `output_prefix + ".<rank>.trace.json"`, containing the trace in the Chrome trace
+    format, and `output_prefix + ".<rank>.profile.json"`, containing the `summary`
+    and the `step_summaries`.
+
+    Args:
+        output_prefix: the name of the output files before the rank and extension.
+    """
+    rank = _MPI.rank()
+    with open("{}.{}.trace.json".format(output_prefix, rank), "w") as outfile:
+        _json.dump(chrome_trace(), outfile)
+    with open("{}.{}.profile.json".format(output_prefix, rank), "w") as outfile:
+        _json.dump(
+            {"rank": rank, "summary": summary(), "steps": step_summaries()}, outfile
+        )
+
+
+reset()
@@ -1,5 +1,5 @@
 import numpy as _np
-from numba import jit, objmode
+from numba import jit, objmode, _helperlib
 from mpi4py import MPI
 
 
@@ -22,6 +22,24 @@ def seed(seed=None):
     _np.random.seed(derived_seed)
 
 
+def get_state():
+    """
+    Returns the state of the random number generators of this process: the one used
+    in jitted code and the one of numpy. It can be restored with `set_state`.
+    """
+    numba_state = _helperlib.rnd_get_state(_helperlib.rnd_get_np_state_ptr())
+    return (numba_state, _np.random.get_state())
+
+
+def set_state(state):
+    """
+    Restores the state of the random number generators returned by `get_state`.
+    """
+    numba_state, numpy_state = state
+    _helperlib.rnd_set_state(_helperlib.rnd_get_np_state_ptr(), numba_state)
+    _np.random.set_state(numpy_state)
+
+
 @jit
 def uniform(low=0.0, high=1.0):
     return _np.random.uniform(low, high)
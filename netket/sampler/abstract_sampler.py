@@ -26,6 +26,35 @@ class AbstractSampler(abc.ABC):
     def reset(self, init_random=False):
         pass
 
+    def get_state(self):
+        """
+        Returns the current configurations of the Markov chains, which can be
+        restored with `set_state`, or None if the sampler has no state.
+        """
+        sampler = getattr(self, "sampler", None)
+        if isinstance(sampler, AbstractSampler):
+            return sampler.get_state()
+        elif sampler is not None:
+            # Samplers implemented in C++
+            return _np.array(sampler.current_state[0])
+        return None
+
+    def set_state(self, state):
+        """
+        Restores the configurations of the Markov chains returned by `get_state`,
+        and recomputes their log-values with the current machine.
+        """
+        if state is None:
+            return
+        sampler = getattr(self, "sampler", None)
+        if isinstance(sampler, AbstractSampler):
+            sampler.set_state(state)
+        elif sampler is not None:
+            sampler.set_visible(state)
+            sampler.reset()
+        else:
+            raise NotImplementedError
+
     @property
     def machine_pow(self):
         return 2.0
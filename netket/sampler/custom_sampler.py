@@ -42,6 +42,7 @@ class CustomSampler(AbstractSampler):
         n_chains=16,
         sweep_size=None,
         batch_size=None,
+        dtype=_np.complex128,
     ):
         """
         Args:
@@ -56,6 +57,8 @@ class CustomSampler(AbstractSampler):
            n_chains: The number of Markov Chains to be run in parallel on a single process.
            sweep_size: The number of exchanges that compose a single sweep.
                        If None, sweep_size is equal to the number of degrees of freedom (n_visible).
+           dtype: The datatype used to store the values of log_val along the chains
+                  (only used by the python backend, for non-C++ machines).
 
        Examples:
            Sampling from a RBM machine in a 1D lattice of spin 1/2
@@ -90,6 +93,7 @@ class CustomSampler(AbstractSampler):
                 n_chains,
                 sweep_size,
                 batch_size,
+                dtype,
             )
         super().__init__(machine, n_chains)
 
@@ -66,7 +66,15 @@ class MetropolisExchange(AbstractSampler):
     otherwise the sampling would be strongly not ergodic.
     """
 
-    def __init__(self, machine, d_max=1, n_chains=16, sweep_size=None, batch_size=None):
+    def __init__(
+        self,
+        machine,
+        d_max=1,
+        n_chains=16,
+        sweep_size=None,
+        batch_size=None,
+        dtype=_np.complex128,
+    ):
         """
         Args:
               machine: A machine :math:`\Psi(s)` used for the sampling.
@@ -80,6 +88,8 @@ class MetropolisExchange(AbstractSampler):
                           If None, sweep_size is equal to the number of degrees of freedom (n_visible).
               batch_size: The batch size to be used when calling log_val on the given Machine.
                           If None, batch_size is equal to the number Markov chains (n_chains).
+              dtype: The datatype used to store the values of log_val along the chains
+                     (only used by the python backend, for non-C++ machines).
 
 
         Examples:
@@ -116,6 +126,7 @@ class MetropolisExchange(AbstractSampler):
                 n_chains,
                 sweep_size,
                 batch_size,
+                dtype,
             )
         super().__init__(machine, n_chains)
 
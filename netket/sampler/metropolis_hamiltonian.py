@@ -62,7 +62,13 @@ class MetropolisHamiltonian(AbstractSampler):
     """
 
     def __init__(
-        self, machine, hamiltonian, n_chains=16, sweep_size=None, batch_size=None
+        self,
+        machine,
+        hamiltonian,
+        n_chains=16,
+        sweep_size=None,
+        batch_size=None,
+        dtype=_np.complex128,
     ):
         """
         Args:
@@ -76,6 +82,8 @@ class MetropolisHamiltonian(AbstractSampler):
                        If None, sweep_size is equal to the number of degrees of freedom (n_visible).
            batch_size: The batch size to be used when calling log_val on the given Machine.
                        If None, batch_size is equal to the number Markov chains (n_chains).
+           dtype: The datatype used to store the values of log_val along the chains
+                  (only used by the python backend, for non-C++ machines).
 
        Examples:
            Sampling from a RBM machine in a 1D lattice of spin 1/2
@@ -109,6 +117,7 @@ class MetropolisHamiltonian(AbstractSampler):
                 n_chains,
                 sweep_size,
                 batch_size,
+                dtype,
             )
         super().__init__(machine, n_chains)
 
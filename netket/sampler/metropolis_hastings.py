@@ -3,9 +3,10 @@ from .abstract_sampler import AbstractSampler
 
 from .._C_netket import sampler as c_sampler
 from .._C_netket.utils import random_engine
-from ..stats import mean as _mean
+from ..stats import mean_batched as _mean_batched
 
 from netket import random as _random
+from netket import profiling as _profiling
 
 from numba import jit, int64, float64
 from .._jitclass import jitclass
@@ -27,7 +28,13 @@ class PyMetropolisHastings(AbstractSampler):
     """
 
     def __init__(
-        self, machine, transition_kernel, n_chains=16, sweep_size=None, batch_size=None
+        self,
+        machine,
+        transition_kernel,
+        n_chains=16,
+        sweep_size=None,
+        batch_size=None,
+        dtype=_np.complex128,
     ):
         """
         Constructs a new ``MetropolisHastings`` sampler given a machine and
@@ -48,10 +55,14 @@ class PyMetropolisHastings(AbstractSampler):
                         If None, sweep_size is equal to the number of degrees of freedom (n_visible).
             batch_size: The batch size to be used when calling log_val on the given Machine.
                         If None, batch_size is equal to the number Markov chains (n_chains).
+            dtype: The datatype of the buffers storing the values of log_val along the chains.
+                   Use `complex64` together with a single-precision machine to sample
+                   in single precision.
 
         """
 
         self.machine = machine
+        self._dtype = _np.dtype(dtype)
         self.n_chains = n_chains
 
         self.sweep_size = sweep_size
@@ -76,10 +87,14 @@ class PyMetropolisHastings(AbstractSampler):
         self._state = _np.zeros((n_chains, self._n_visible))
         self._state1 = _np.copy(self._state)
 
-        self._log_values = _np.zeros(n_chains, dtype=_np.complex128)
-        self._log_values_1 = _np.zeros(n_chains, dtype=_np.complex128)
+        self._log_values = _np.zeros(n_chains, dtype=self._dtype)
+        self._log_values_1 = _np.zeros(n_chains, dtype=self._dtype)
         self._log_prob_corr = _np.zeros(n_chains)
 
+    @property
+    def dtype(self):
+        return self._dtype
+
     @property
     def machine_pow(self):
         return self._machine_pow
@@ -117,6 +132,13 @@ class PyMetropolisHastings(AbstractSampler):
         self._accepted_samples = 0
         self._total_samples = 0
 
+    def get_state(self):
+        return _np.copy(self._state)
+
+    def set_state(self, state):
+        _np.copyto(self._state, state)
+        self.machine.log_val(self._state, out=self._log_values)
+
     @staticmethod
     @jit(nopython=True)
     def acceptance_kernel(
@@ -149,26 +171,35 @@ class PyMetropolisHastings(AbstractSampler):
         _machine_pow = self._machine_pow
         _accepted_samples = self._accepted_samples
         _t_kernel = self._kernel.apply
+        _timer = _profiling.timer
+        _count = _profiling.count
 
-        for sweep in range(self.sweep_size):
+        with _timer("sampler.sweep"):
+            for sweep in range(self.sweep_size):
 
-            # Propose a new state using the transition kernel
-            _t_kernel(_state, _state1, _log_prob_corr)
+                # Propose a new state using the transition kernel
+                _t_kernel(_state, _state1, _log_prob_corr)
 
-            _log_val(_state1, out=_log_values_1)
+                with _timer("log_val"):
+                    _log_val(_state1, out=_log_values_1)
+                _count("log_val.batch_size", _state1.shape[0])
 
-            # Acceptance Kernel
-            acc = _acc_kernel(
-                _state,
-                _state1,
-                _log_values,
-                _log_values_1,
-                _log_prob_corr,
-                _machine_pow,
-            )
+                # Acceptance Kernel
+                acc = _acc_kernel(
+                    _state,
+                    _state1,
+                    _log_values,
+                    _log_values_1,
+                    _log_prob_corr,
+                    _machine_pow,
+                )
+
+                _accepted_samples += acc
 
-            _accepted_samples += acc
+        _count("sampler.moves", self.sweep_size * self.n_chains)
+        _count("sampler.accepted", _accepted_samples - self._accepted_samples)
 
+        self._accepted_samples = _accepted_samples
         self._total_samples += self.sweep_size * self.n_chains
 
         return self._state
@@ -176,4 +207,5 @@ class PyMetropolisHastings(AbstractSampler):
     @property
     def acceptance(self):
         """The measured acceptance probability."""
-        return _mean(self._accepted_samples) / _mean(self._total_samples)
+        accepted, total = _mean_batched([self._accepted_samples, self._total_samples])
+        return accepted / total
@@ -60,7 +60,13 @@ class MetropolisLocal(AbstractSampler):
     """
 
     def __init__(
-        self, machine, n_chains=16, sweep_size=None, batch_size=None, backend=None
+        self,
+        machine,
+        n_chains=16,
+        sweep_size=None,
+        batch_size=None,
+        backend=None,
+        dtype=_np.complex128,
     ):
         """
 
@@ -77,6 +83,8 @@ class MetropolisLocal(AbstractSampler):
                         If None, sweep_size is equal to the number of degrees of freedom (n_visible).
             batch_size: The batch size to be used when calling log_val on the given Machine.
                         If None, batch_size is equal to the number Markov chains (n_chains).
+            dtype: The datatype used to store the values of log_val along the chains
+                   (only used by the python backend, for non-C++ machines).
 
 
          Examples:
@@ -112,6 +120,7 @@ class MetropolisLocal(AbstractSampler):
                 n_chains,
                 sweep_size,
                 batch_size,
+                dtype,
             )
         super().__init__(machine, n_chains)
 
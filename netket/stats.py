@@ -42,3 +42,114 @@ def mean(a, axis=None, dtype=None, out=None):
     out /= float(_n_nodes)
 
     return out
+
+
+class MeanFuture:
+    """
+    Handle to a mean over MPI processes which is computed with a non-blocking
+    reduction, returned by `mean_async` and `mean_batched`. The reduction
+    progresses while the caller performs independent work, and its result is
+    obtained with `result`.
+    """
+
+    def __init__(self, buffer, request=None, finalize=None):
+        self._buffer = buffer
+        self._request = request
+        self._finalize = finalize
+        self._result = None
+        self._ready = False
+
+    def done(self):
+        """
+        Returns True if the reduction has completed, without blocking.
+        """
+        return self._ready or self._request is None or self._request.Test()
+
+    def result(self):
+        """
+        Waits for the reduction to complete and returns the mean.
+        """
+        if not self._ready:
+            if self._request is not None:
+                self._request.Wait()
+            self._buffer /= float(_n_nodes)
+            self._result = self._finalize(self._buffer)
+            self._ready = True
+        return self._result
+
+
+def _start_reduction(buffer, finalize):
+    # Nothing to communicate on a single process
+    if _n_nodes == 1:
+        return MeanFuture(buffer, None, finalize)
+
+    request = _MPI_comm.Iallreduce(MPI.IN_PLACE, buffer, op=MPI.SUM)
+    return MeanFuture(buffer, request, finalize)
+
+
+def mean_async(a, axis=None, dtype=None, out=None):
+    """
+    Starts computing the arithmetic mean along the specified axis and over MPI
+    processes, like `mean`, but returns immediately a `MeanFuture` whose
+    `result()` is the mean. The reduction over MPI processes is performed with
+    a non-blocking `Iallreduce`, hence it can be overlapped with other work.
+
+    `a` can be reused as soon as this function returns, while `out` must not
+    be accessed until `result()` has been called.
+    """
+    out = _np.mean(a, axis=axis, dtype=dtype, out=out)
+
+    if isinstance(out, _np.ndarray):
+        if out.flags.c_contiguous:
+            return _start_reduction(out.reshape(-1), lambda buffer: out)
+
+        def copy_back(buffer):
+            out[...] = buffer.reshape(out.shape)
+            return out
+
+        return _start_reduction(out.flatten(), copy_back)
+
+    # The mean of the flattened array is a scalar
+    buffer = _np.array([out])
+    return _start_reduction(buffer, lambda buffer: buffer[0])
+
+
+def mean_batched(arrays, axis=None, dtype=None, blocking=True):
+    """
+    Computes the arithmetic means of several arrays along the specified axis and
+    over MPI processes, packing all the local means in a single message. This
+    reduces the latency of many small reductions on a large number of
+    processes.
+
+    Args:
+        arrays: A sequence of arrays.
+        axis: Axis or axes along which the means are computed, for all the arrays.
+              The default is to compute the mean of the flattened arrays.
+        dtype: Type to use in computing the means.
+        blocking: If False, returns a `MeanFuture` whose `result()` is the list
+              of means, instead of waiting for the reduction.
+
+    Returns:
+        The list of the means, or a `MeanFuture` if `blocking` is False.
+    """
+    means = [_np.mean(a, axis=axis, dtype=dtype) for a in arrays]
+
+    buffer = _np.concatenate(
+        [_np.ravel(m).astype(_np.result_type(*means), copy=False) for m in means]
+    )
+
+    def finalize(buffer):
+        results = []
+        offset = 0
+        for m in means:
+            size = _np.size(m)
+            result = buffer[offset : offset + size]
+            if not _np.iscomplexobj(m):
+                result = result.real
+            result = result.astype(_np.result_type(m), copy=False)
+            results.append(result.reshape(_np.shape(m))[()])
+            offset += size
+        return results
+
+    future = _start_reduction(buffer, finalize)
+    return future.result() if blocking else future
@@ -1,5 +1,7 @@
 import sys
 
+import numpy as _np
+
 import netket as _nk
 
 
@@ -72,21 +74,146 @@ def make_optimizer_fn(arg, ma):
 
 
 def tree_map(fun, tree):
-
+    """
+    Applies `fun` to all the leaves of a pytree, i.e. a nested structure of dicts,
+    lists and tuples, and returns a pytree with the same structure. Any other object
+    except None is a leaf.
+    """
     if tree is None:
-        result = None
+        return None
+    elif isinstance(tree, dict):
+        return {key: tree_map(fun, val) for key, val in tree.items()}
+    elif isinstance(tree, (list, tuple)):
+        return type(tree)(tree_map(fun, val) for val in tree)
+    else:
+        return fun(tree)
 
-    elif "_C_netket" in str(type(tree)):
-        result = fun(tree)
 
-    elif type(tree) == list:
-        result = []
-        for val in tree:
-            result.append(fun, tree_map(val))
+class _Leaf:
+    def __repr__(self):
+        return "*"
+
+
+_LEAF = _Leaf()
+
+
+def tree_flatten(tree):
+    """
+    Returns the list of the leaves of a pytree, in a deterministic order, and the
+    structure of the tree, from which it can be rebuilt with `tree_unflatten`.
+    """
+    leaves = []
+
+    def collect(leaf):
+        leaves.append(leaf)
+        return _LEAF
+
+    return leaves, tree_map(collect, tree)
 
-    else:
-        result = {}
-        for key in tree:
-            result[key] = tree_map(fun, tree[key])
 
-    return result
+def tree_unflatten(treedef, leaves):
+    """
+    Builds a pytree with the structure returned by `tree_flatten` from a list of
+    leaves.
+    """
+    leaves = iter(leaves)
+    return tree_map(lambda _: next(leaves), treedef)
+
+
+_STATS_DTYPE = _np.dtype(
+    [
+        ("Mean", _np.float64),
+        ("Sigma", _np.float64),
+        ("Variance", _np.float64),
+        ("R", _np.float64),
+        ("TauCorr", _np.float64),
+    ]
+)
+
+
+class ObservableRegistry:
+    """
+    The flattened list of the observables estimated by a driver during `run`. It is
+    built once, so that at every step the observables which are due are estimated
+    with a single call to the driver, and their statistics are stored in the
+    preallocated structured array `records`, with one row per leaf.
+
+    Args:
+        observables: A dictionary of pytrees of operators. An entry given as
+            `name: (operators, every)` is only estimated every `every` steps.
+    """
+
+    def __init__(self, observables):
+        self._leaves = []
+        self._entries = []
+        for name, value in observables.items():
+            if (
+                isinstance(value, tuple)
+                and len(value) == 2
+                and isinstance(value[1], int)
+            ):
+                tree, every = value
+            else:
+                tree, every = value, 1
+            if every < 1:
+                raise ValueError(
+                    "Invalid estimation interval for {}: every={}".format(name, every)
+                )
+            leaves, treedef = tree_flatten(tree)
+            start = len(self._leaves)
+            self._leaves.extend(leaves)
+            self._entries.append((name, treedef, start, len(self._leaves), every))
+
+        self._last_step = [None] * len(self._entries)
+        self._due = []
+        self.records = _np.zeros(len(self._leaves), dtype=_STATS_DTYPE)
+
+    def __len__(self):
+        return len(self._leaves)
+
+    @property
+    def leaves(self):
+        """The list of all the operators."""
+        return self._leaves
+
+    def estimate(self, driver, step):
+        """
+        Estimates with `driver` the observables which are due at the given step, and
+        stores their statistics in `records`.
+        """
+        self._due = []
+        indices = []
+        for i, entry in enumerate(self._entries):
+            last = self._last_step[i]
+            if last is None or step - last >= entry[4]:
+                self._due.append(entry)
+                self._last_step[i] = step
+                indices.extend(range(entry[2], entry[3]))
+
+        if len(indices) == 0:
+            return
+
+        stats = driver._estimate_stats_many([self._leaves[i] for i in indices])
+        records = self.records
+        for i, st in zip(indices, stats):
+            records[i] = (
+                st.mean.real,
+                st.error_of_mean,
+                st.variance,
+                st.R,
+                st.tau_corr,
+            )
+
+    def log_data(self):
+        """
+        Returns the statistics of the observables estimated by the last call to
+        `estimate`, as a dictionary of pytrees with the format of the logs.
+        """
+        fields = _STATS_DTYPE.names
+        data = {}
+        for name, treedef, start, stop, _ in self._due:
+            rows = self.records[start:stop].tolist()
+            data[name] = tree_unflatten(
+                treedef, [dict(zip(fields, row)) for row in rows]
+            )
+        return data